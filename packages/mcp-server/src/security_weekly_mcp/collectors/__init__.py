@@ -0,0 +1 @@
+"""外部資料來源收集模組"""
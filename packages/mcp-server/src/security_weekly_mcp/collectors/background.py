@@ -0,0 +1,246 @@
+"""背景收集器
+
+隨 MCP Server 啟動的背景任務（需以 SECURITY_WEEKLY_BACKGROUND=1 啟用），
+依各來源觀測到的更新頻率輪詢 RSS 來源，並在 CISA KEV 鏡像超過存活時間時更新；
+NVD 鏡像完成首次同步後也會定期增量同步。鏡像與來源共用同一份到期排程，
+未到期時排程迴圈不會碰觸鏡像，鏡像的讀寫都在工作執行緒中進行。
+抓取結果保存在記憶體（解析後的文章）與磁碟（Feed 快取），
+讓新聞工具可以直接由本地資料回應，不必每次等待網路。
+
+來源列表在每次排程時重新取得，sources.yaml 熱重載後新增或重新啟用的來源
+會開始輪詢，停用或移除的來源則停止輪詢並捨棄其快照。
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from ..http_client import get_http_client
+from ..storage.feed_cache import get_feed_cache
+from ..storage.kev_mirror import get_kev_mirror
+from ..storage.nvd_mirror import get_nvd_mirror
+from .nvd import NvdClient
+
+# 是否隨 Server 啟動背景收集器
+BACKGROUND_ENABLED = os.environ.get("SECURITY_WEEKLY_BACKGROUND", "0") == "1"
+
+# 輪詢間隔（秒）：取文章發布間隔中位數的一半，限制在上下限之間
+DEFAULT_INTERVAL = 30 * 60
+MIN_INTERVAL = 10 * 60
+MAX_INTERVAL = 6 * 60 * 60
+# 排程迴圈最長休眠（秒）
+MAX_SLEEP = 60.0
+# NVD 鏡像檢查是否需要同步的間隔（秒）；鏡像更新失敗時也在此間隔後重試
+MIRROR_CHECK_INTERVAL = MIN_INTERVAL
+
+
+def poll_interval(entries: list[dict]) -> float:
+    """依文章發布時間推算輪詢間隔（秒）
+
+    取相鄰文章發布間隔的中位數的一半；有日期的文章不足兩篇時使用預設值。
+    """
+    published = sorted(
+        (datetime.fromisoformat(e["published"]) for e in entries if e.get("published")),
+        reverse=True,
+    )
+    gaps = [(a - b).total_seconds() for a, b in zip(published, published[1:]) if a > b]
+    if not gaps:
+        return DEFAULT_INTERVAL
+    return min(MAX_INTERVAL, max(MIN_INTERVAL, statistics.median(gaps) / 2))
+
+
+class BackgroundCollector:
+    """背景輪詢 RSS 來源並保存最新文章"""
+
+    def __init__(
+        self,
+        sources: Callable[[], list[dict]],
+        refresh: Callable[[dict], Awaitable[list[dict] | None]],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化背景收集器
+
+        Args:
+            sources: 取得目前要輪詢的 RSS 來源設定（每次排程時呼叫）
+            refresh: 抓取單一來源，成功時回傳解析後的全部文章，失敗回傳 None
+            clock: 排程用時間來源（可替換以便測試）
+        """
+        self._sources = sources
+        self._last_sources: list[dict] = []
+        self.refresh = refresh
+        self.clock = clock
+        # 來源名稱 → {entries, fetched_at, interval, last_error}
+        self.store: dict[str, dict] = {}
+        self._next_due: dict[str, float] = {}
+        # 鏡像名稱（kev、nvd）→ 下次更新時間
+        self._mirror_due: dict[str, float] = {"kev": 0.0, "nvd": 0.0}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def sources(self) -> list[dict]:
+        """目前要輪詢的來源（設定載入失敗時沿用上次的列表）"""
+        try:
+            self._last_sources = list(self._sources())
+        except ValueError:
+            pass
+        return self._last_sources
+
+    def _sync_sources(self) -> list[dict]:
+        """取得最新來源列表，捨棄已停用來源的排程與快照，新來源先由磁碟快取載入"""
+        sources = self.sources
+        names = {s.get("name") for s in sources}
+        for name in [n for n in self.store.keys() | self._next_due.keys() if n not in names]:
+            self.store.pop(name, None)
+            self._next_due.pop(name, None)
+        for source in sources:
+            if source.get("name") not in self.store:
+                self.load(source)
+        return sources
+
+    @property
+    def running(self) -> bool:
+        """背景任務是否執行中"""
+        return self._task is not None and not self._task.done()
+
+    def get(self, source_name: str) -> dict | None:
+        """取得來源的最新快照（尚未抓取時回傳 None）"""
+        snapshot = self.store.get(source_name)
+        if snapshot is None or snapshot.get("entries") is None:
+            return None
+        return snapshot
+
+    def load(self, source: dict) -> bool:
+        """由磁碟 Feed 快取載入來源快照
+
+        Returns:
+            是否載入成功
+        """
+        cached = get_feed_cache().get(source.get("url", ""))
+        if cached is None or cached.get("partial"):
+            # 串流提前停止的紀錄只有部分文章，不作為快照
+            return False
+        name = source.get("name")
+        current = self.store.get(name)
+        if current and current.get("fetched_at", "") >= cached["fetched_at"]:
+            return True
+        self._update(name, cached["entries"], cached["fetched_at"])
+        return True
+
+    def _update(self, name: str, entries: list[dict], fetched_at: str):
+        interval = poll_interval(entries)
+        self.store[name] = {
+            "entries": entries,
+            "fetched_at": fetched_at,
+            "interval": interval,
+            "last_error": None,
+        }
+        # 由磁碟載入的舊快照扣除已經過的時間
+        age = (datetime.now() - datetime.fromisoformat(fetched_at)).total_seconds()
+        self._next_due[name] = self.clock() + max(0.0, interval - age)
+
+    async def refresh_source(self, source: dict):
+        """抓取單一來源並更新快照"""
+        name = source.get("name")
+        try:
+            entries = await self.refresh(source)
+        except Exception as e:
+            entries = None
+            error = f"{type(e).__name__}: {e}"
+        else:
+            error = None if entries is not None else "抓取失敗"
+
+        if entries is not None:
+            self._update(name, entries, datetime.now().isoformat())
+            return
+        snapshot = self.store.setdefault(name, {"entries": None, "interval": DEFAULT_INTERVAL})
+        snapshot["last_error"] = error
+        self._next_due[name] = self.clock() + MIN_INTERVAL
+
+    async def refresh_kev(self):
+        """更新 KEV 鏡像，並排定存活時間到期時再更新"""
+        mirror = get_kev_mirror()
+        try:
+            await mirror.refresh(get_http_client())
+        except Exception:
+            # 稍後再試，工具呼叫時仍可沿用舊鏡像
+            self._mirror_due["kev"] = self.clock() + MIRROR_CHECK_INTERVAL
+            return
+        self._mirror_due["kev"] = self.clock() + mirror.seconds_until_stale()
+
+    async def sync_nvd(self):
+        """NVD 鏡像到期時增量同步，並排定下次檢查"""
+        nvd_mirror = get_nvd_mirror()
+        try:
+            if await asyncio.to_thread(nvd_mirror.is_due):
+                await nvd_mirror.sync(NvdClient(get_http_client()))
+        except Exception:
+            # 同步時間未更新，下次檢查時從同一起點重試
+            pass
+        self._mirror_due["nvd"] = self.clock() + MIRROR_CHECK_INTERVAL
+
+    async def run_once(self):
+        """抓取所有到期的來源，並更新到期的 KEV / NVD 鏡像"""
+        sources = self._sync_sources()
+        now = self.clock()
+        due = [s for s in sources if self._next_due.get(s.get("name"), 0) <= now]
+        await asyncio.gather(*(self.refresh_source(s) for s in due))
+        if self._mirror_due["kev"] <= now:
+            await self.refresh_kev()
+        if self._mirror_due["nvd"] <= now:
+            await self.sync_nvd()
+
+    def seconds_until_next(self) -> float:
+        """距離下一個來源或鏡像到期的秒數"""
+        return max(0.0, min([*self._next_due.values(), *self._mirror_due.values()]) - self.clock())
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(min(MAX_SLEEP, max(1.0, self.seconds_until_next())))
+
+    def start(self):
+        """載入磁碟快取並啟動背景任務"""
+        self._sync_sources()
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止背景任務"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# 執行中的背景收集器（未啟用時為 None）
+_collector: BackgroundCollector | None = None
+
+
+def get_background_collector() -> BackgroundCollector | None:
+    """取得執行中的背景收集器"""
+    if _collector is not None and _collector.running:
+        return _collector
+    return None
+
+
+def start_background_collector(
+    sources: Callable[[], list[dict]], refresh: Callable[[dict], Awaitable[list[dict] | None]]
+) -> BackgroundCollector:
+    """建立並啟動背景收集器（需在事件迴圈中呼叫）"""
+    global _collector
+    if _collector is not None and _collector.running:
+        return _collector
+    _collector = BackgroundCollector(sources, refresh)
+    _collector.start()
+    return _collector
+
+
+async def stop_background_collector():
+    """停止背景收集器"""
+    global _collector
+    if _collector is not None:
+        await _collector.stop()
+        _collector = None
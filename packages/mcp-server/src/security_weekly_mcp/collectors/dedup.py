@@ -0,0 +1,207 @@
+"""跨來源重複文章合併
+
+同一則新聞常同時出現在多個來源。收集完成後：
+1. 標準化 URL（移除追蹤參數、fragment、www 前綴等），相同 URL 視為重複
+2. 以 MinHash 簽章估計標題與摘要開頭的 Jaccard 相似度，
+   搭配 LSH 分段（banding）只比較落在同一桶的候選，整體維持線性時間
+3. 每個重複群組保留一篇代表文章，其餘來源列為 alternates
+"""
+
+import hashlib
+import random
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 追蹤參數（完整名稱或前綴）
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "mc_cid",
+    "mc_eid",
+    "_hsenc",
+    "_hsmi",
+    "mkt_tok",
+    "ncid",
+    "cmpid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# MinHash 參數：32 個雜湊 = 8 段 × 每段 4 個，門檻約 (1/8)^(1/4) ≈ 0.59
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.5
+MAX_BUCKET_COMPARISONS = 8
+
+# 簽章只取摘要開頭的字詞數
+SUMMARY_TOKENS = 30
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20260215)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.-][a-z0-9]+)*|[一-鿿]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+_STOPWORDS = {
+    "the", "and", "for", "with", "from", "that", "this", "are", "was", "were", "has",
+    "have", "its", "into", "over", "new", "after", "says", "via", "how", "why", "what",
+}  # fmt: skip
+
+
+def canonicalize_url(url: str) -> str:
+    """標準化文章 URL 以便比對"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def _tokens(text: str) -> list[str]:
+    """斷詞：英數字詞（去除停用詞）與中文字元二元組"""
+    tokens = []
+    for token in _TOKEN_RE.findall(_TAG_RE.sub(" ", text).lower()):
+        if token[0] >= "一":
+            tokens.extend(token[i : i + 2] for i in range(max(1, len(token) - 1)))
+        elif len(token) > 2 and token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _shingles(article: dict) -> set[str]:
+    title_tokens = _tokens(article.get("title", ""))
+    summary_tokens = _tokens(article.get("summary", ""))[:SUMMARY_TOKENS]
+    return set(title_tokens) | set(summary_tokens)
+
+
+def minhash(shingles: set[str]) -> tuple[int, ...]:
+    """計算 MinHash 簽章"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """以簽章估計 Jaccard 相似度"""
+    return sum(x == y for x, y in zip(sig_a, sig_b, strict=True)) / NUM_PERM
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        self.parent[self.find(a)] = self.find(b)
+
+
+def collapse_duplicates(
+    articles_by_source: dict[str, list[dict]], source_priority: dict[str, int] | None = None
+) -> tuple[dict[str, list[dict]], int]:
+    """合併跨來源的重複文章
+
+    Args:
+        articles_by_source: 來源名稱 → 文章列表
+        source_priority: 來源名稱 → 優先級分數（決定代表文章，越高越優先）
+
+    Returns:
+        (合併後的來源 → 文章列表, 被合併掉的文章數)。
+        代表文章附上 alternates（其他來源的標題與連結）。
+    """
+    source_priority = source_priority or {}
+    flat: list[tuple[str, dict]] = [
+        (source, article)
+        for source, articles in articles_by_source.items()
+        for article in articles
+        if "error" not in article
+    ]
+    uf = _UnionFind(len(flat))
+
+    # 1. 相同標準化 URL
+    by_url: dict[str, int] = {}
+    for i, (_, article) in enumerate(flat):
+        url = canonicalize_url(article.get("link", ""))
+        if url:
+            if url in by_url:
+                uf.union(i, by_url[url])
+            else:
+                by_url[url] = i
+
+    # 2. MinHash + LSH 找出跨來源近似重複
+    signatures: list[tuple[int, ...] | None] = []
+    buckets: dict[tuple, list[int]] = {}
+    for i, (_, article) in enumerate(flat):
+        shingles = _shingles(article)
+        if len(shingles) < 3:
+            signatures.append(None)
+            continue
+        sig = minhash(shingles)
+        signatures.append(sig)
+        for band in range(BANDS):
+            key = (band, sig[band * ROWS : (band + 1) * ROWS])
+            buckets.setdefault(key, []).append(i)
+
+    for members in buckets.values():
+        for pos in range(1, len(members)):
+            i = members[pos]
+            # 每篇最多與同桶中前幾篇比較，避免熱門桶退化為平方時間
+            for j in members[max(0, pos - MAX_BUCKET_COMPARISONS) : pos]:
+                if flat[i][0] == flat[j][0] or uf.find(i) == uf.find(j):
+                    continue
+                if similarity(signatures[i], signatures[j]) >= SIMILARITY_THRESHOLD:
+                    uf.union(i, j)
+                    break
+
+    # 3. 每個群組選出代表文章
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(flat)):
+        clusters.setdefault(uf.find(i), []).append(i)
+
+    dropped: set[int] = set()
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        representative = min(
+            members,
+            key=lambda i: (
+                -source_priority.get(flat[i][0], 0),
+                flat[i][1].get("published") or "9999",
+                i,
+            ),
+        )
+        flat[representative][1]["alternates"] = [
+            {
+                "source": flat[i][0],
+                "title": flat[i][1].get("title", ""),
+                "link": flat[i][1].get("link", ""),
+            }
+            for i in members
+            if i != representative
+        ]
+        dropped.update(i for i in members if i != representative)
+
+    dropped_ids = {id(flat[i][1]) for i in dropped}
+    collapsed = {
+        source: [a for a in articles if id(a) not in dropped_ids]
+        for source, articles in articles_by_source.items()
+    }
+    return collapsed, len(dropped)
@@ -0,0 +1,311 @@
+"""RSS/Atom 解析與過濾
+
+feedparser 為 CPU 密集的同步函式，直接在協程內呼叫會阻塞整個
+MCP Server 事件迴圈。這裡的函式皆為可序列化的模組層級函式，
+可交給執行緒池或行程池執行，回傳精簡的文章紀錄。
+
+另提供串流解析模式（stream_entries）：邊下載邊以 XMLPullParser 解析，
+取得足夠的文章或超過回顧天數後即停止下載；格式錯誤時退回 feedparser。
+
+工作池類型與數量可由環境變數調整：
+    SECURITY_WEEKLY_PARSE_POOL     thread（預設）或 process
+    SECURITY_WEEKLY_PARSE_WORKERS  工作者數量（預設 min(4, CPU 數)）
+"""
+
+import asyncio
+import multiprocessing
+import os
+import xml.etree.ElementTree as ET
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import feedparser
+
+from .keywords import compile_keywords
+
+# 工作池（單例快取）
+_executor: Executor | None = None
+
+
+def parse_feed_entries(content: str | bytes) -> list[dict]:
+    """解析 RSS/Atom 原文為精簡的文章紀錄（可序列化，供快取保存）"""
+    feed = feedparser.parse(content)
+    entries = []
+    for entry in feed.entries:
+        # 解析發布時間
+        published = None
+        if hasattr(entry, "published_parsed") and entry.published_parsed:
+            published = datetime(*entry.published_parsed[:6])
+        elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
+            published = datetime(*entry.updated_parsed[:6])
+
+        # FeedBurner 轉址連結改用原始網址
+        link = entry.get("feedburner_origlink") or entry.get("link", "")
+        entries.append(
+            {
+                "id": entry.get("id") or link,
+                "title": entry.get("title", ""),
+                "link": link,
+                "published": published.isoformat() if published else None,
+                "summary": entry.get("summary", ""),
+            }
+        )
+    return entries
+
+
+def filter_entries(
+    entries: list[dict],
+    days: int,
+    limit: int,
+    keywords: list[str] | None = None,
+    watermark: dict | None = None,
+    until: datetime | None = None,
+) -> list[dict]:
+    """依時間與關鍵字過濾文章
+
+    Args:
+        watermark: 來源水位（last_guid、last_published）；提供時只回傳比水位更新的文章，
+            並在文章中附上 guid。新文章超過 limit 則時回傳緊接在水位之後、最舊的 limit 則
+            （仍依 feed 順序），水位推進到其中最新的一則，其餘較新的文章留待下次收集，
+            不會因截斷而遺漏
+        until: 發布時間上限（收集指定期間時使用）；晚於此時間的文章在套用 limit 前即排除
+    """
+    cutoff_date = datetime.now() - timedelta(days=days)
+    matcher = compile_keywords(keywords) if keywords else None
+    last_guid = watermark.get("last_guid") if watermark else None
+    last_published = watermark.get("last_published") if watermark else None
+    articles = []
+
+    # 抓多一點再過濾；水位模式需掃描到水位為止，指定上限時需略過較新的文章
+    scan_all = watermark is not None or until is not None
+    for entry in entries if scan_all else entries[: limit * 2]:
+        published = entry.get("published")
+        guid = entry.get("id") or entry.get("link", "")
+
+        # 水位過濾：遇到上次最新的文章即停止（feed 由新到舊排列）
+        if watermark is not None:
+            if last_guid and guid == last_guid:
+                break
+            if published and last_published and published <= last_published:
+                continue
+
+        # 時間過濾
+        if published and datetime.fromisoformat(published) < cutoff_date:
+            continue
+        if until is not None and published and datetime.fromisoformat(published) > until:
+            continue
+
+        # 關鍵字過濾（單次掃描找出所有命中的關鍵字）
+        matched = None
+        if matcher:
+            matched = matcher.find(entry.get("title", "") + " " + entry.get("summary", ""))
+            if not matched:
+                continue
+
+        article = {
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "published": published,
+            "summary": entry.get("summary", "")[:500],  # 摘要截斷
+        }
+        if matched:
+            article["matched_keywords"] = matched
+        if watermark is not None:
+            article["guid"] = guid
+        articles.append(article)
+
+        if watermark is None and len(articles) >= limit:
+            break
+
+    if watermark is not None and len(articles) > limit:
+        # 取最舊的 limit 則（無日期時以 feed 中較後面者為舊），維持 feed 順序
+        oldest = sorted(range(len(articles)), key=lambda i: (articles[i]["published"] or "", -i))[
+            :limit
+        ]
+        articles = [articles[i] for i in sorted(oldest)]
+    return articles
+
+
+def parse_and_filter(
+    content: str | bytes,
+    days: int,
+    limit: int,
+    keywords: list[str] | None = None,
+    watermark: dict | None = None,
+    until: datetime | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """解析並過濾（單次往返工作池）
+
+    Returns:
+        (全部文章紀錄, 過濾後的文章)
+    """
+    entries = parse_feed_entries(content)
+    return entries, filter_entries(entries, days, limit, keywords, watermark, until)
+
+
+# 串流解析：RSS <item>、RSS 1.0 <item>、Atom <entry>
+_ENTRY_TAGS = {"item", "entry"}
+# 發布時間欄位（依優先順序，與 feedparser 的 published → updated 一致）
+_DATE_FIELDS = ("pubDate", "published", "date", "issued", "updated", "modified")
+
+
+# FeedBurner 原始連結元素（<feedburner:origLink>）
+_FEEDBURNER_ORIGLINK = "{http://rssnamespace.org/feedburner/ext/1.0}origLink"
+
+
+def _local_name(tag: str) -> str:
+    """去除 XML 命名空間前綴"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_date(value: str) -> datetime | None:
+    """解析 RFC 822 或 ISO 8601 日期為 UTC naive datetime"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(UTC).replace(tzinfo=None)
+    return parsed
+
+
+def _element_to_entry(elem: ET.Element) -> dict:
+    """將 <item>/<entry> 元素轉為文章紀錄"""
+    fields: dict[str, str] = {}
+    for child in elem:
+        name = _local_name(child.tag)
+        text = "".join(child.itertext()).strip()
+        if child.tag == _FEEDBURNER_ORIGLINK:
+            fields.setdefault("origlink", text)
+        elif name == "link":
+            href = child.get("href")
+            if href is None:
+                fields.setdefault("link", text)
+            elif child.get("rel", "alternate") == "alternate":
+                fields.setdefault("link", href)
+        elif name in ("description", "summary"):
+            fields.setdefault("summary", text)
+        elif name in ("guid", "id", "title", "content", "encoded", *_DATE_FIELDS):
+            fields.setdefault(name, text)
+
+    published = None
+    for name in _DATE_FIELDS:
+        if fields.get(name):
+            published = _parse_date(fields[name])
+            if published:
+                break
+
+    # FeedBurner 轉址連結改用原始網址（與 parse_feed_entries 一致）
+    link = fields.get("origlink") or fields.get("link", "")
+    return {
+        "id": fields.get("guid") or fields.get("id") or link,
+        "title": fields.get("title", ""),
+        "link": link,
+        "published": published.isoformat() if published else None,
+        "summary": fields.get("summary") or fields.get("content") or fields.get("encoded", ""),
+    }
+
+
+class StreamingFeedParser:
+    """增量 RSS/Atom 解析器（每餵入一段資料即回傳新完成的文章）"""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("end",))
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        """餵入一段資料
+
+        Raises:
+            ET.ParseError: XML 格式錯誤
+        """
+        self._parser.feed(chunk)
+        entries = []
+        for _, elem in self._parser.read_events():
+            if _local_name(elem.tag) in _ENTRY_TAGS:
+                entries.append(_element_to_entry(elem))
+                elem.clear()  # 釋放已處理的元素
+        return entries
+
+
+async def stream_entries(
+    chunks: AsyncIterator[bytes], days: int, limit: int
+) -> tuple[list[dict] | None, bytes | None]:
+    """邊下載邊解析，足夠時提前停止
+
+    停止條件（與 filter_entries 只檢視前 limit * 2 則一致）：
+    - 已取得 limit * 2 則文章
+    - 遇到早於回顧天數的文章，且目前為止文章依時間遞減排列
+
+    Returns:
+        (提前停止時的文章紀錄, None)；
+        若讀完整份文件或 XML 格式錯誤，回傳 (None, 完整原文) 交由 feedparser 處理
+    """
+    parser = StreamingFeedParser()
+    cutoff_date = datetime.now() - timedelta(days=days)
+    received: list[bytes] = []
+    entries: list[dict] = []
+    last_published = None
+    ordered = True
+
+    async for chunk in chunks:
+        received.append(chunk)
+        try:
+            new_entries = parser.feed(chunk)
+        except ET.ParseError:
+            # 格式錯誤：讀完剩餘內容，退回 feedparser
+            async for rest in chunks:
+                received.append(rest)
+            return None, b"".join(received)
+
+        for entry in new_entries:
+            entries.append(entry)
+            published = datetime.fromisoformat(entry["published"]) if entry["published"] else None
+            if published:
+                if last_published and published > last_published:
+                    ordered = False
+                last_published = published
+            if len(entries) >= limit * 2:
+                return entries, None
+            if ordered and published and published < cutoff_date:
+                return entries, None
+
+    return None, b"".join(received)
+
+
+def get_parse_executor() -> Executor:
+    """取得解析工作池（單例快取）"""
+    global _executor
+    if _executor is None:
+        workers = int(os.environ.get("SECURITY_WEEKLY_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+        if os.environ.get("SECURITY_WEEKLY_PARSE_POOL", "thread") == "process":
+            # 使用 spawn 避免在已有執行緒（HTTP 連線池）的行程中 fork
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed-parse")
+    return _executor
+
+
+def shutdown_parse_executor():
+    """關閉解析工作池（Server 關閉時呼叫）"""
+    global _executor
+    executor = _executor
+    _executor = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_parse_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """在解析工作池中執行函式，不阻塞事件迴圈"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_executor(), func, *args)
@@ -0,0 +1,167 @@
+"""GitHub Security Advisories (GHSA) 收集器
+
+依 Link 標頭的 cursor 逐頁抓取已審核的 GHSA（每頁 100 筆，最多 MAX_PAGES 頁），
+所有請求經過並行上限控制（GitHub 建議避免對 REST API 並行請求）。
+第一頁以 ETag 送出條件式請求：收到 304 表示自上次抓取後沒有新的公告，
+直接沿用快取中已正規化的全部結果，不必再逐頁抓取。
+"""
+
+import asyncio
+import os
+from datetime import datetime
+
+import httpx
+
+from ..storage.feed_cache import FeedCache
+
+GHSA_API_URL = "https://api.github.com/advisories"
+
+# 每頁筆數（API 上限）與最多抓取頁數
+PAGE_SIZE = 100
+MAX_PAGES = 10
+
+# 同時進行的 GHSA 請求上限
+MAX_CONCURRENT_REQUESTS = 2
+
+# 並行上限（依事件迴圈共用）
+_semaphores: dict[int, asyncio.Semaphore] = {}
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    """取得共用的 GHSA 請求並行上限"""
+    key = id(asyncio.get_running_loop())
+    if key not in _semaphores:
+        _semaphores.clear()  # 事件迴圈變更時捨棄舊的 Semaphore
+        _semaphores[key] = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return _semaphores[key]
+
+
+def _headers() -> dict[str, str]:
+    """GitHub REST API 標頭（有 GITHUB_TOKEN 時附加認證以提高速率上限）"""
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _cvss(advisory: dict) -> tuple[float, str]:
+    """取得 CVSS 分數與向量（優先 cvss_v3，其次舊版 cvss 欄位）"""
+    severities = advisory.get("cvss_severities") or {}
+    for cvss in (severities.get("cvss_v3"), advisory.get("cvss")):
+        if cvss and cvss.get("score"):
+            return float(cvss["score"]), cvss.get("vector_string") or ""
+    return 0.0, ""
+
+
+def _affected_product(vulnerability: dict) -> str:
+    """組合受影響套件與版本範圍，例如「npm example < 1.2.3」"""
+    package = vulnerability["package"]
+    parts = (
+        package.get("ecosystem") or "",
+        package.get("name") or "",
+        vulnerability.get("vulnerable_version_range") or "",
+    )
+    return " ".join(part for part in parts if part)
+
+
+def normalize_advisory(advisory: dict) -> dict:
+    """將 GHSA 項目轉為漏洞紀錄（與 NVD 紀錄欄位一致）
+
+    GHSA 以套件而非 CPE 描述受影響範圍：affected_products 為「生態系 套件 版本範圍」，
+    cpes 固定為空串列。
+    """
+    cvss_score, cvss_vector = _cvss(advisory)
+    ghsa_id = advisory.get("ghsa_id", "")
+    vulnerabilities = [v for v in advisory.get("vulnerabilities") or [] if v.get("package")]
+    packages = [
+        f"{v['package'].get('ecosystem', '')}:{v['package'].get('name', '')}"
+        for v in vulnerabilities
+    ]
+    return {
+        "cve_id": advisory.get("cve_id") or "",
+        "ghsa_id": ghsa_id,
+        "cvss": cvss_score,
+        "cvss_vector": cvss_vector,
+        "description": (advisory.get("summary") or advisory.get("description") or "")[:500],
+        "published": advisory.get("published_at") or "",
+        "last_modified": advisory.get("updated_at") or "",
+        "affected_products": [_affected_product(v) for v in vulnerabilities],
+        "cpes": [],
+        "packages": packages,
+        "url": advisory.get("html_url") or f"https://github.com/advisories/{ghsa_id}",
+    }
+
+
+async def _get(client: httpx.AsyncClient, url: str, headers: dict[str, str]) -> httpx.Response:
+    async with get_semaphore():
+        return await client.get(url, headers=headers, timeout=30.0)
+
+
+async def fetch_advisories(
+    client: httpx.AsyncClient,
+    since: datetime,
+    per_page: int = PAGE_SIZE,
+    max_pages: int = MAX_PAGES,
+    cache: FeedCache | None = None,
+    base_url: str = GHSA_API_URL,
+    until: datetime | None = None,
+) -> list[dict]:
+    """抓取指定時間後發布的已審核 GHSA，回傳正規化後的漏洞紀錄
+
+    Args:
+        client: HTTP 客戶端
+        since: 發布時間下限
+        per_page: 每頁筆數
+        max_pages: 最多抓取頁數
+        cache: 條件式請求快取（None 表示不使用）
+        base_url: API 網址
+        until: 發布時間上限（含當日；None 表示不限）
+
+    Raises:
+        httpx.HTTPError: 網路或 HTTP 錯誤
+    """
+    params = {
+        "type": "reviewed",
+        "published": (
+            f"{since.strftime('%Y-%m-%d')}..{until.strftime('%Y-%m-%d')}"
+            if until
+            else f">={since.strftime('%Y-%m-%d')}"
+        ),
+        "sort": "published",
+        "direction": "desc",
+        "per_page": per_page,
+    }
+    first_url = str(httpx.URL(base_url, params=params))
+    cached = cache.get(first_url) if cache else None
+
+    response = await _get(
+        client, first_url, {**_headers(), **FeedCache.conditional_headers(cached)}
+    )
+    if response.status_code == 304 and cached is not None:
+        cache.touch(cached)
+        return cached["entries"]
+    response.raise_for_status()
+    first = response
+
+    advisories = []
+    for page in range(max_pages):
+        advisories.extend(normalize_advisory(a) for a in response.json())
+        next_url = response.links.get("next", {}).get("url")
+        if not next_url or page + 1 >= max_pages:
+            break
+        response = await _get(client, next_url, _headers())
+        response.raise_for_status()
+
+    if cache is not None:
+        cache.put(
+            first_url,
+            first.content,
+            advisories,
+            etag=first.headers.get("ETag"),
+            last_modified=first.headers.get("Last-Modified"),
+        )
+    return advisories
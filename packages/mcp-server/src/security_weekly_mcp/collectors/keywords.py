@@ -0,0 +1,90 @@
+"""多關鍵字比對（Aho-Corasick 自動機）
+
+將關鍵字清單編譯為 Aho-Corasick 自動機，每則文章只需掃描文字一次，
+即可找出所有命中的關鍵字，成本與關鍵字數量無關。
+同一組關鍵字的自動機會被快取重複使用。
+"""
+
+from collections import deque
+from functools import lru_cache
+
+
+class KeywordMatcher:
+    """不分大小寫的多關鍵字子字串比對器"""
+
+    def __init__(self, keywords: list[str]):
+        """編譯關鍵字
+
+        Args:
+            keywords: 關鍵字列表（空字串會被忽略）
+        """
+        self.keywords: list[str] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+
+        seen = set()
+        for keyword in keywords:
+            pattern = keyword.casefold()
+            if not pattern.strip() or pattern in seen:
+                continue
+            seen.add(pattern)
+            self._add(pattern, len(self.keywords))
+            self.keywords.append(keyword)
+        self._build_failure_links()
+
+    def __bool__(self) -> bool:
+        return bool(self.keywords)
+
+    def _add(self, pattern: str, index: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def find(self, text: str) -> list[str]:
+        """找出文字中命中的關鍵字（依關鍵字清單順序，不重複）"""
+        goto, fail, output = self._goto, self._fail, self._output
+        hits: set[int] = set()
+        state = 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+                if len(hits) == len(self.keywords):
+                    break
+        return [self.keywords[i] for i in sorted(hits)]
+
+
+@lru_cache(maxsize=64)
+def _compile(keywords: tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(list(keywords))
+
+
+def compile_keywords(keywords: list[str] | tuple[str, ...]) -> KeywordMatcher:
+    """取得關鍵字比對器（同一組關鍵字會重複使用已編譯的自動機）"""
+    return _compile(tuple(keywords))
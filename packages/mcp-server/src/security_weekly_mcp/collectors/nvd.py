@@ -0,0 +1,336 @@
+"""NVD CVE 2.0 API 分頁收集器
+
+先讀取第一頁取得 totalResults，再以 startIndex 並行抓取其餘分頁，
+所有請求經過滑動視窗速率限制（符合 NVD 公開／API Key 的滾動 30 秒上限），
+遇到 403/429/503 以加上隨機抖動的指數退避重試，並在分頁回傳時逐筆串流輸出。
+
+受影響產品取自 configurations 中標示為 vulnerable 的 CPE 2.3 字串；
+同一批 CVE 常共用大量相同的 CPE，解析結果以 LRU 快取共用。
+正規化以每 NORMALIZE_BATCH_SIZE 筆為一批在工作執行緒進行，
+大型分頁的解析不會長時間占住事件迴圈、拖慢其他分頁的抓取。
+"""
+
+import asyncio
+import functools
+import os
+import random
+import re
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+
+import httpx
+
+from .rate_limit import SlidingWindowLimiter
+
+NVD_API_URL = "https://services.nvd.nist.gov/rest/json/cves/2.0"
+
+# NVD 單頁上限與單次查詢日期範圍上限
+MAX_RESULTS_PER_PAGE = 2000
+MAX_DATE_RANGE = timedelta(days=120)
+
+# NVD 速率限制：每 30 秒 5 次（公開）／50 次（API Key）
+PUBLIC_RATE_LIMIT = 5
+API_KEY_RATE_LIMIT = 50
+RATE_LIMIT_PERIOD = 30.0
+
+# 需要重試的狀態碼（NVD 超過速率時回傳 403）
+RETRY_STATUS_CODES = {403, 429, 503}
+
+# 每筆 CVE 最多保留的受影響產品數
+MAX_AFFECTED_PRODUCTS = 20
+# 每批正規化的 CVE 數
+NORMALIZE_BATCH_SIZE = 500
+# CPE 解析結果的快取筆數
+CPE_CACHE_SIZE = 8192
+
+# CPE 2.3 欄位分隔（反斜線跳脫的冒號不分隔）
+_CPE_SPLIT = re.compile(r"(?<!\\):")
+
+# CVSS v3 嚴重程度區間（下限, 上限）
+SEVERITY_RANGES = {
+    "CRITICAL": (9.0, 10.0),
+    "HIGH": (7.0, 8.9),
+    "MEDIUM": (4.0, 6.9),
+    "LOW": (0.1, 3.9),
+}
+
+# 速率限制器（同一事件迴圈內依是否有 API Key 共用）
+_limiters: dict[bool, SlidingWindowLimiter] = {}
+# 建立限制器時的事件迴圈
+_limiters_loop: int | None = None
+
+
+def get_rate_limiter(api_key: str | None) -> SlidingWindowLimiter:
+    """取得共用的 NVD 速率限制器（事件迴圈變更時才捨棄舊的限制器）"""
+    global _limiters_loop
+    loop_id = id(asyncio.get_running_loop())
+    if loop_id != _limiters_loop:
+        _limiters.clear()
+        _limiters_loop = loop_id
+    key = bool(api_key)
+    if key not in _limiters:
+        limit = API_KEY_RATE_LIMIT if api_key else PUBLIC_RATE_LIMIT
+        _limiters[key] = SlidingWindowLimiter(limit, RATE_LIMIT_PERIOD)
+    return _limiters[key]
+
+
+def severities_for(min_cvss: float) -> list[str]:
+    """取得分數區間與 [min_cvss, 10] 重疊的嚴重程度"""
+    return [name for name, (_, high) in SEVERITY_RANGES.items() if high >= min_cvss]
+
+
+def date_windows(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """將日期範圍切成符合 NVD 上限（120 天）的區段"""
+    windows = []
+    cursor = start
+    while cursor < end:
+        window_end = min(cursor + MAX_DATE_RANGE, end)
+        windows.append((cursor, window_end))
+        cursor = window_end
+    return windows or [(start, end)]
+
+
+class NvdClient:
+    """NVD CVE API 客戶端"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        api_key: str | None = None,
+        base_url: str = NVD_API_URL,
+        results_per_page: int = MAX_RESULTS_PER_PAGE,
+        limiter: SlidingWindowLimiter | None = None,
+        max_retries: int = 3,
+        backoff: float = 2.0,
+    ):
+        """初始化 NVD 客戶端
+
+        Args:
+            client: HTTP 客戶端
+            api_key: NVD API Key；未提供時從環境變數 NVD_API_KEY 讀取
+            base_url: API 網址（測試可指向本地替身伺服器）
+            results_per_page: 每頁筆數
+            limiter: 速率限制器；未提供時依 API Key 使用共用限制器
+            max_retries: 403/429/503 的最大重試次數
+            backoff: 退避基準秒數（第 n 次重試隨機等待 backoff * 2^n 的 50%～100%，
+                避免並行分頁同時重試）
+        """
+        self.client = client
+        self.api_key = api_key if api_key is not None else os.environ.get("NVD_API_KEY")
+        self.base_url = base_url
+        self.results_per_page = results_per_page
+        self.limiter = limiter or get_rate_limiter(self.api_key)
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    async def get_page(self, params: dict, start_index: int) -> dict:
+        """抓取單一分頁（含速率限制與重試）
+
+        Raises:
+            httpx.HTTPError: 重試用盡或其他 HTTP 錯誤
+        """
+        headers = {"Accept": "application/json"}
+        if self.api_key:
+            headers["apiKey"] = self.api_key
+        page_params = {
+            **params,
+            "startIndex": start_index,
+            "resultsPerPage": self.results_per_page,
+        }
+
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            response = await self.client.get(
+                self.base_url, params=page_params, headers=headers, timeout=60.0
+            )
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                delay = self.backoff * 2**attempt
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+                attempt += 1
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def iter_query(self, params: dict) -> AsyncIterator[dict]:
+        """逐筆串流單一查詢的所有分頁結果
+
+        先抓第一頁取得 totalResults，再並行抓取其餘分頁，依完成順序輸出。
+        """
+        first = await self.get_page(params, 0)
+        for item in first.get("vulnerabilities", []):
+            yield item
+
+        total = first.get("totalResults", 0)
+        per_page = first.get("resultsPerPage") or self.results_per_page
+        tasks = [
+            asyncio.create_task(self.get_page(params, start))
+            for start in range(per_page, total, per_page)
+        ]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                page = await next_page
+                for item in page.get("vulnerabilities", []):
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_cves(
+        self,
+        start: datetime,
+        end: datetime,
+        severities: list[str] | None = None,
+        extra_params: dict | None = None,
+        date_field: str = "pub",
+    ) -> AsyncIterator[dict]:
+        """逐筆串流日期範圍內的 CVE
+
+        日期範圍超過 120 天會自動切段；多個嚴重程度各自查詢後合併，
+        所有查詢並行進行並共用速率限制器。
+
+        Args:
+            start: 起始時間
+            end: 結束時間
+            severities: CVSS v3 嚴重程度列表；None 表示不限
+            extra_params: 其他查詢參數
+            date_field: 日期欄位，pub（發布）或 lastMod（最後修改，用於增量同步）
+        """
+        queries = []
+        for window_start, window_end in date_windows(start, end):
+            base = {
+                f"{date_field}StartDate": window_start.strftime("%Y-%m-%dT%H:%M:%S.000"),
+                f"{date_field}EndDate": window_end.strftime("%Y-%m-%dT%H:%M:%S.999"),
+                **(extra_params or {}),
+            }
+            for severity in severities or [None]:
+                queries.append({**base, "cvssV3Severity": severity} if severity else base)
+
+        async for item in merge_streams([self.iter_query(q) for q in queries]):
+            yield item
+
+
+async def merge_streams(streams: list[AsyncIterator[dict]]) -> AsyncIterator[dict]:
+    """合併多個非同步串流，依到達順序輸出"""
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def drain(stream: AsyncIterator[dict]):
+        try:
+            async for item in stream:
+                await queue.put(item)
+            await queue.put(done)
+        except Exception as e:
+            await queue.put(e)
+
+    tasks = [asyncio.create_task(drain(s)) for s in streams]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def normalize_vendor(name: str) -> str:
+    """將廠商或產品名稱轉為比對鍵（小寫並移除空白、底線與連字號）
+
+    CPE 名稱的分隔方式不一致（paloaltonetworks、palo_alto_networks），
+    索引與查詢兩端都使用此比對鍵，例如 Palo Alto Networks → paloaltonetworks。
+    """
+    return re.sub(r"[\s_-]+", "", name.lower())
+
+
+@functools.lru_cache(maxsize=CPE_CACHE_SIZE)
+def parse_cpe(criteria: str) -> tuple[str, str] | None:
+    """解析 CPE 2.3 字串，回傳 (廠商, 產品)；格式錯誤或為萬用字元時回傳 None
+
+    例：cpe:2.3:o:fortinet:fortios:7.2.0:*:*:*:*:*:*:* → ("fortinet", "fortios")
+    """
+    parts = _CPE_SPLIT.split(criteria, maxsplit=5)
+    if len(parts) < 5 or parts[0] != "cpe" or parts[1] != "2.3":
+        return None
+    vendor, product = (p.replace("\\", "").lower() for p in parts[3:5])
+    if vendor in ("", "*", "-") or product in ("", "*", "-"):
+        return None
+    return vendor, product
+
+
+def affected_cpes(cve: dict) -> list[tuple[str, str]]:
+    """取出 configurations 中受影響的 (廠商, 產品)，依出現順序去重"""
+    found: dict[tuple[str, str], None] = {}
+    for config in cve.get("configurations") or []:
+        for node in config.get("nodes") or []:
+            for match in node.get("cpeMatch") or []:
+                if not match.get("vulnerable", True):
+                    continue
+                parsed = parse_cpe(match.get("criteria", ""))
+                if parsed:
+                    found[parsed] = None
+    return list(found)
+
+
+def normalize_cve(item: dict) -> dict:
+    """將 NVD API 項目轉為漏洞紀錄"""
+    cve = item.get("cve", {})
+    cve_id = cve.get("id", "")
+
+    # 取得 CVSS 分數
+    cvss_score = 0.0
+    cvss_vector = ""
+    metrics = cve.get("metrics", {})
+    for key in ("cvssMetricV31", "cvssMetricV30"):
+        if metrics.get(key):
+            cvss_data = metrics[key][0].get("cvssData", {})
+            cvss_score = cvss_data.get("baseScore", 0.0)
+            cvss_vector = cvss_data.get("vectorString", "")
+            break
+
+    # 取得描述
+    description = ""
+    for desc in cve.get("descriptions", []):
+        if desc.get("lang") == "en":
+            description = desc.get("value", "")
+            break
+
+    cpes = affected_cpes(cve)[:MAX_AFFECTED_PRODUCTS]
+
+    return {
+        "cve_id": cve_id,
+        "cvss": cvss_score,
+        "cvss_vector": cvss_vector,
+        "description": description[:500],
+        "published": cve.get("published", ""),
+        "last_modified": cve.get("lastModified", ""),
+        "affected_products": [f"{vendor} {product}".replace("_", " ") for vendor, product in cpes],
+        "cpes": [f"{vendor}:{product}" for vendor, product in cpes],
+        "url": f"https://nvd.nist.gov/vuln/detail/{cve_id}",
+    }
+
+
+def normalize_cves(items: list[dict]) -> list[dict]:
+    """批次正規化 NVD API 項目"""
+    return [normalize_cve(item) for item in items]
+
+
+async def iter_normalized(
+    items: AsyncIterator[dict], batch_size: int = NORMALIZE_BATCH_SIZE
+) -> AsyncIterator[list[dict]]:
+    """將 NVD 項目串流分批，於工作執行緒正規化後逐批輸出"""
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield await asyncio.to_thread(normalize_cves, batch)
+            batch = []
+    if batch:
+        yield await asyncio.to_thread(normalize_cves, batch)
@@ -0,0 +1,68 @@
+"""api 類型來源的漏洞提供者
+
+sources.yaml 中 type: api 的來源各對應一個提供者（如 NVD、CISA KEV、GHSA）。
+提供者以 register 註冊，fetch_vulnerabilities 依註冊順序並行執行
+所有未在 sources.yaml 停用的提供者；新增 api 來源只需實作抓取函式並註冊。
+
+抓取函式接收查詢參數 dict（min_cvss、days、limit、force_refresh），
+回傳與 NVD 紀錄欄位一致的漏洞列表，失敗時回傳 [{"error": ...}]。
+"""
+
+from collections.abc import Awaitable, Callable
+
+ProviderFetch = Callable[[dict], Awaitable[list[dict]]]
+
+
+class ApiProvider:
+    """漏洞提供者"""
+
+    def __init__(self, kind: str, source: str, fetch: ProviderFetch):
+        """初始化提供者
+
+        Args:
+            kind: 結果分組名稱（如 nvd、kev、ghsa）
+            source: sources.yaml 中對應的來源名稱
+            fetch: 抓取函式
+        """
+        self.kind = kind
+        self.source = source
+        self.fetch = fetch
+
+
+# 已註冊的提供者（依註冊順序排程）
+_providers: dict[str, ApiProvider] = {}
+
+
+def register(kind: str, source: str, fetch: ProviderFetch) -> ApiProvider:
+    """註冊提供者（相同 kind 會取代先前的註冊）"""
+    provider = _providers[kind] = ApiProvider(kind, source, fetch)
+    return provider
+
+
+def get_providers() -> list[ApiProvider]:
+    """取得所有已註冊的提供者"""
+    return list(_providers.values())
+
+
+def merge_by_cve(primary: list[dict], secondary: list[dict], fields: tuple[str, ...]) -> int:
+    """將 secondary 中與 primary 同 CVE 的紀錄併入 primary
+
+    相符紀錄的 fields 欄位複製到 primary 紀錄，並自 secondary 移除
+    （原地修改）；無 CVE 或找不到對應的紀錄保留在 secondary。
+
+    Returns:
+        合併的筆數
+    """
+    by_cve = {v["cve_id"]: v for v in primary if v.get("cve_id")}
+    remaining = []
+    for vuln in secondary:
+        target = by_cve.get(vuln.get("cve_id"))
+        if target is None:
+            remaining.append(vuln)
+            continue
+        for field in fields:
+            if field in vuln:
+                target[field] = vuln[field]
+    merged = len(secondary) - len(remaining)
+    secondary[:] = remaining
+    return merged
@@ -0,0 +1,41 @@
+"""非同步滑動視窗速率限制器"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+
+
+class SlidingWindowLimiter:
+    """滑動視窗速率限制器
+
+    記錄最近 limit 次請求的送出時間，任意連續 period 秒內最多放行 limit 次。
+    例如 NVD 公開速率「每 30 秒（滾動視窗）5 次」對應 limit=5、period=30。
+    與一開始即裝滿又持續補充的 Token Bucket 不同，不會在首個週期放行超過 limit 次。
+    """
+
+    def __init__(self, limit: int, period: float, clock: Callable[[], float] = time.monotonic):
+        """初始化速率限制器
+
+        Args:
+            limit: 每個視窗允許的請求數
+            period: 視窗秒數
+            clock: 時鐘函式（測試用）
+        """
+        self.limit = limit
+        self.period = period
+        self._clock = clock
+        self._sent: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取得一次請求額度，視窗已滿時等待最早的請求移出視窗"""
+        async with self._lock:
+            while True:
+                now = self._clock()
+                while self._sent and self._sent[0] <= now - self.period:
+                    self._sent.popleft()
+                if len(self._sent) < self.limit:
+                    self._sent.append(now)
+                    return
+                await asyncio.sleep(self._sent[0] + self.period - now)
@@ -0,0 +1,503 @@
+"""週報原始資料快照
+
+將一週收集到的新聞、漏洞與搜尋建議保存為 output/raw/YYYY-WNN.jsonl.gz，
+供 load_weekly_data / list_weekly_data 讀取。
+
+快照內容：
+    metadata: week、collected_at、period、stats、timing
+    news: 來源名稱 → 文章列表
+    vulnerabilities: nvd / kev / ghsa → 漏洞列表
+    suggested_searches: suggest_searches 的結果
+
+檔案為 gzip 壓縮的 JSON Lines，每行一筆精簡紀錄，可逐行串流讀取：
+    {"metadata": {...}}                    第一行
+    {"s": "news", "k": "來源", "i": {...}}  分組項目（s 區塊、k 分組、i 項目；空分組省略 i）
+    {"s": "suggested_searches", "i": {...}}
+舊版未壓縮的 YYYY-WNN.json 仍可讀取，下次收集該週時轉為新格式。
+
+select_items 逐行篩選區塊、來源與欄位並分頁，不需載入整份快照；
+分頁位置以 encode_cursor 產生的不透明 cursor 傳遞。
+iter_snapshot_json 雖逐行讀取，但工具回傳的全文仍須組成完整字串，
+因此只用於內容未壓縮大小（metadata 的 content_bytes）不超過
+FULL_TEXT_MAX_BYTES 的快照，較大的快照改回傳第一頁。
+
+同一週重複收集時與既有快照合併（文章依標準化 URL、漏洞依 ID），
+內容未變更則不重寫檔案。合併依分組串流進行：快照中的分組依名稱排序，
+merge_records 逐組讀取既有快照並與本次資料合併，一次只保留一個分組；
+write_snapshot 逐筆壓縮寫入同目錄的暫存檔後再替換，寫入時的記憶體用量
+不隨快照大小成長。metadata 需要合併後的統計，因此先以 scan_merge 掃描一次。
+"""
+
+import base64
+import binascii
+import gzip
+import itertools
+import json
+import re
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+from pathlib import Path
+
+from ..storage.files import atomic_open
+from .dedup import canonicalize_url
+
+# 週數格式（ISO 週，如 2026-W07）
+WEEK_PATTERN = re.compile(r"^(\d{4})-W(\d{2})$")
+
+# 快照的資料區塊
+CONTENT_KEYS = ("news", "vulnerabilities", "suggested_searches")
+# 依來源 / 類型分組的區塊
+GROUPED_KEYS = ("news", "vulnerabilities")
+
+# 快照副檔名（新版壓縮格式與舊版 JSON）
+SNAPSHOT_SUFFIX = ".jsonl.gz"
+LEGACY_SUFFIX = ".json"
+
+# 分頁預設與上限筆數
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# 未分頁載入時可回傳全文的內容未壓縮大小上限（超過時改回傳第一頁）
+FULL_TEXT_MAX_BYTES = 1024 * 1024
+# 串流計算未壓縮大小時的讀取區塊
+READ_CHUNK_SIZE = 64 * 1024
+
+# 快照損毀或格式不符時的讀取錯誤
+SNAPSHOT_ERRORS = (OSError, EOFError, StopIteration, KeyError, ValueError)
+
+
+def week_id(day: date) -> str:
+    """取得日期所屬的 ISO 週數"""
+    iso = day.isocalendar()
+    return f"{iso.year}-W{iso.week:02d}"
+
+
+def default_week(today: date | None = None) -> str:
+    """預設收集週數：昨天所屬的週（週一執行時即為上一週）"""
+    return week_id((today or date.today()) - timedelta(days=1))
+
+
+def week_period(week: str) -> tuple[date, date]:
+    """取得 ISO 週的起訖日期（週一至週日）
+
+    Raises:
+        ValueError: 週數格式錯誤
+    """
+    match = WEEK_PATTERN.match(week)
+    if not match:
+        raise ValueError(f"週數格式錯誤：{week}（應為 YYYY-WNN）")
+    try:
+        start = date.fromisocalendar(int(match.group(1)), int(match.group(2)), 1)
+    except ValueError:
+        raise ValueError(f"週數超出範圍：{week}") from None
+    return start, start + timedelta(days=6)
+
+
+def in_period(value: str | None, start: date, end: date) -> bool:
+    """日期字串是否落在期間內（無日期者視為符合）"""
+    if not value:
+        return True
+    return start.isoformat() <= value[:10] <= end.isoformat()
+
+
+def _article_key(article: dict) -> str:
+    return canonicalize_url(article.get("link", "")) or article.get("title", "")
+
+
+def _vuln_key(vuln: dict) -> str:
+    return vuln.get("cve_id") or vuln.get("ghsa_id") or ""
+
+
+def _merge_by_key(existing: list[dict], new: list[dict], key, sort_field: str) -> list[dict]:
+    """依鍵合併兩個列表（新資料覆蓋舊資料），依日期欄位由新到舊排序"""
+    merged = {key(item): item for item in existing}
+    for item in new:
+        if "error" not in item:
+            merged[key(item)] = item
+    return sorted(merged.values(), key=lambda item: item.get(sort_field) or "", reverse=True)
+
+
+def _merge_rules(section: str, key: str):
+    """分組的合併鍵與排序欄位"""
+    if section == "news":
+        return _article_key, "published"
+    return _vuln_key, "date_added" if key == "kev" else "published"
+
+
+def _merged_groups(existing: Path | None, collected: dict) -> Iterator[tuple]:
+    """逐組合併既有快照與本次收集的資料
+
+    依區塊順序產生 (區塊, 分組, 既有項目, 合併後項目)：
+    - 分組依名稱排序，既有快照的分組也已排序，因此可邊讀邊合併
+    - 既有快照沒有的分組，既有項目為 None
+    - 分組區塊沒有任何分組時產生 (區塊, None, None, None)
+    - 最後產生 ("suggested_searches", None, 既有內容, 合併後內容)
+    """
+    old = _iter_groups(existing)
+    try:
+        pending = next(old, None)
+        for section in GROUPED_KEYS:
+            new_groups = collected.get(section) or {}
+            new_keys = sorted(new_groups)
+            count = 0
+            while True:
+                old_key = pending[1] if pending and pending[0] == section else None
+                if old_key is None and not new_keys:
+                    break
+                if old_key is not None and (not new_keys or old_key <= new_keys[0]):
+                    key, old_items = old_key, pending[2]
+                    pending = next(old, None)
+                    if new_keys and new_keys[0] == key:
+                        new_keys.pop(0)
+                else:
+                    key, old_items = new_keys.pop(0), None
+                merged = _merge_by_key(
+                    old_items or [], new_groups.get(key, []), *_merge_rules(section, key)
+                )
+                count += 1
+                yield section, key, old_items, merged
+            if not count:
+                yield section, None, None, None
+
+        while pending and pending[0] != "suggested_searches":
+            pending = next(old, None)
+        old_searches = pending[2] if pending else None
+        merged = collected.get("suggested_searches") or old_searches or {}
+        yield "suggested_searches", None, old_searches, merged
+    finally:
+        old.close()
+
+
+def _group_records(section: str, key: str | None, items) -> Iterator[dict]:
+    """單一分組（或非分組區塊）的快照紀錄"""
+    if section not in GROUPED_KEYS:
+        yield {"s": section, "i": items}
+    elif key is None:
+        yield {"s": section}
+    elif not items:
+        yield {"s": section, "k": key}
+    else:
+        for item in items:
+            yield {"s": section, "k": key, "i": item}
+
+
+def merge_records(existing: Path | None, collected: dict) -> Iterator[dict]:
+    """串流合併既有快照與本次收集的資料，逐筆產生快照紀錄
+
+    新資料覆蓋同鍵的舊資料，各分組依日期由新到舊排序；一次只載入一個分組。
+    """
+    for section, key, _, merged in _merged_groups(existing, collected):
+        yield from _group_records(section, key, merged)
+
+
+def scan_merge(existing: Path | None, collected: dict) -> dict:
+    """掃描合併結果（不保留內容）
+
+    Returns:
+        stats（文章、來源、各類漏洞與搜尋建議數）、content_bytes（內容未壓縮位元組數）、
+        changed（合併後內容是否與既有快照不同）
+    """
+    news_counts = []
+    vuln_counts: dict[str, int] = {}
+    searches: dict = {}
+    size = 0
+    changed = False
+    for section, key, old, merged in _merged_groups(existing, collected):
+        size += sum(_record_size(r) for r in _group_records(section, key, merged))
+        if section in GROUPED_KEYS and key is None:
+            continue
+        changed = changed or old != merged
+        if section == "news":
+            news_counts.append(len(merged))
+        elif section == "vulnerabilities":
+            vuln_counts[key] = len(merged)
+        else:
+            searches = merged
+    stats = {
+        "total_articles": sum(news_counts),
+        "news_sources": sum(1 for count in news_counts if count),
+        "nvd_vulnerabilities": vuln_counts.get("nvd", 0),
+        "kev_vulnerabilities": vuln_counts.get("kev", 0),
+        "ghsa_vulnerabilities": vuln_counts.get("ghsa", 0),
+        "suggested_searches": len(searches.get("web_searches", [])),
+    }
+    return {"stats": stats, "content_bytes": size, "changed": changed}
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _record_size(record: dict) -> int:
+    """紀錄在快照中的未壓縮位元組數（含換行）"""
+    return len(_dumps(record).encode("utf-8")) + 1
+
+
+def snapshot_path(raw_dir: Path, week: str) -> Path:
+    """週數對應的快照路徑（新版格式）"""
+    return raw_dir / f"{week}{SNAPSHOT_SUFFIX}"
+
+
+def week_of(path: Path) -> str:
+    """由快照檔名取得週數"""
+    return path.name.removesuffix(SNAPSHOT_SUFFIX).removesuffix(LEGACY_SUFFIX)
+
+
+def find_snapshot(raw_dir: Path, week: str) -> Path | None:
+    """尋找週數的快照檔（優先新版格式）"""
+    for path in (snapshot_path(raw_dir, week), raw_dir / f"{week}{LEGACY_SUFFIX}"):
+        if path.exists():
+            return path
+    return None
+
+
+def list_snapshots(raw_dir: Path) -> list[Path]:
+    """列出所有快照檔（依週數由新到舊，同一週只取新版格式）"""
+    by_week: dict[str, Path] = {}
+    for path in [*raw_dir.glob(f"*{LEGACY_SUFFIX}"), *raw_dir.glob(f"*{SNAPSHOT_SUFFIX}")]:
+        if WEEK_PATTERN.match(week_of(path)):
+            by_week[week_of(path)] = path
+    return [by_week[week] for week in sorted(by_week, reverse=True)]
+
+
+def iter_records(path: Path) -> Iterator[dict]:
+    """逐筆讀取快照紀錄（第一筆為 metadata）"""
+    if path.name.endswith(SNAPSHOT_SUFFIX):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+        return
+
+    # 舊版格式需整份解析
+    data = json.loads(path.read_text(encoding="utf-8"))
+    yield {"metadata": data.get("metadata", {})}
+    yield from _content_records(data)
+
+
+def _content_records(content: dict) -> Iterator[dict]:
+    for section in GROUPED_KEYS:
+        groups = content.get(section) or {}
+        if not groups:
+            yield from _group_records(section, None, None)
+        # 分組依名稱排序，merge_records 才能邊讀邊合併
+        for key in sorted(groups):
+            yield from _group_records(section, key, groups[key])
+    yield from _group_records("suggested_searches", None, content.get("suggested_searches") or {})
+
+
+def _iter_groups(path: Path | None) -> Iterator[tuple]:
+    """逐組讀取快照內容
+
+    分組區塊產生 (區塊, 分組, 項目列表)，其他區塊產生 (區塊, None, 內容)。
+    舊版 JSON 本來就需整份解析，分組改依名稱排序以便與新資料合併。
+    """
+    if path is None:
+        return
+    if not path.name.endswith(SNAPSHOT_SUFFIX):
+        snapshot = load_snapshot(path)
+        if snapshot is None:
+            raise ValueError(f"無法讀取快照：{path.name}")
+        for section in GROUPED_KEYS:
+            for key in sorted(snapshot[section]):
+                yield section, key, snapshot[section][key]
+        yield "suggested_searches", None, snapshot.get("suggested_searches", {})
+        return
+
+    records = iter_records(path)
+    try:
+        next(records)
+        for (section, key), group in itertools.groupby(records, key=lambda r: (r["s"], r.get("k"))):
+            items = [r["i"] for r in group if "i" in r]
+            if section not in GROUPED_KEYS:
+                yield section, None, items[-1] if items else {}
+            elif key is not None:
+                yield section, key, items
+    finally:
+        records.close()
+
+
+def content_size(path: Path) -> int:
+    """快照內容（metadata 以外）的未壓縮位元組數（串流計算）"""
+    if not path.name.endswith(SNAPSHOT_SUFFIX):
+        return path.stat().st_size
+    with gzip.open(path, "rb") as f:
+        f.readline()
+        return sum(len(chunk) for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""))
+
+
+def read_metadata(path: Path) -> dict:
+    """只讀取快照的 metadata（新版格式僅解壓第一行）"""
+    return next(iter_records(path)).get("metadata", {})
+
+
+def summarize_metadata(metadata: dict, path: Path) -> dict:
+    """清單用的快照摘要欄位"""
+    return {
+        "week": metadata.get("week", week_of(path)),
+        "period": metadata.get("period", {}),
+        "collected_at": metadata.get("collected_at", "unknown"),
+        "stats": metadata.get("stats", {}),
+        "content_bytes": metadata.get("content_bytes"),
+    }
+
+
+def summarize_snapshot(path: Path) -> dict:
+    """讀取快照 metadata 並產生清單摘要（metadata 沒有 content_bytes 時串流計算）"""
+    summary = summarize_metadata(read_metadata(path), path)
+    if summary["content_bytes"] is None:
+        summary["content_bytes"] = content_size(path)
+    return summary
+
+
+def load_snapshot(path: Path | None) -> dict | None:
+    """讀取完整快照（不存在或損毀時回傳 None）"""
+    if path is None:
+        return None
+    try:
+        records = iter_records(path)
+        snapshot = {"metadata": next(records).get("metadata", {})}
+        snapshot.update({section: {} for section in GROUPED_KEYS})
+        for record in records:
+            section = record["s"]
+            if section not in GROUPED_KEYS:
+                snapshot[section] = record.get("i", {})
+            elif "k" in record:
+                items = snapshot[section].setdefault(record["k"], [])
+                if "i" in record:
+                    items.append(record["i"])
+        return snapshot
+    except SNAPSHOT_ERRORS:
+        return None
+
+
+def select_items(
+    path: Path,
+    sections: list[str] | None = None,
+    sources: list[str] | None = None,
+    fields: list[str] | None = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> tuple[dict, bool]:
+    """串流選取快照的部分內容
+
+    Args:
+        path: 快照路徑
+        sections: 要選取的區塊（預設全部）
+        sources: 分組名稱（新聞來源或 nvd / kev / ghsa），不限則為 None
+        fields: 項目只保留的欄位（不限則為 None）
+        offset: 略過的項目數
+        limit: 最多回傳的項目數
+
+    Returns:
+        (依區塊、分組排列的內容, 是否還有後續項目)
+
+    Raises:
+        ValueError: 區塊名稱錯誤
+    """
+    unknown = set(sections or []) - set(CONTENT_KEYS)
+    if unknown:
+        raise ValueError(f"未知的區塊：{', '.join(sorted(unknown))}")
+    wanted = set(sections or CONTENT_KEYS)
+    groups = set(sources) if sources else None
+
+    page: dict = {}
+    index = 0
+    records = iter_records(path)
+    try:
+        next(records)
+        for record in records:
+            section = record["s"]
+            if section not in wanted or "i" not in record:
+                continue
+            if section in GROUPED_KEYS and groups is not None and record["k"] not in groups:
+                continue
+            index += 1
+            if index <= offset:
+                continue
+            if index > offset + limit:
+                return page, True
+
+            item = record["i"]
+            if section not in GROUPED_KEYS:
+                page[section] = item
+                continue
+            if fields:
+                item = {field: item[field] for field in fields if field in item}
+            page.setdefault(section, {}).setdefault(record["k"], []).append(item)
+        return page, False
+    finally:
+        records.close()
+
+
+def encode_cursor(state: dict) -> str:
+    """將分頁狀態編碼為不透明 cursor"""
+    return base64.urlsafe_b64encode(_dumps(state).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """解碼 cursor
+
+    Raises:
+        ValueError: cursor 格式錯誤
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (UnicodeError, binascii.Error, json.JSONDecodeError):
+        raise ValueError("cursor 格式錯誤") from None
+    if not isinstance(state, dict) or "week" not in state:
+        raise ValueError("cursor 格式錯誤")
+    return state
+
+
+def write_snapshot(path: Path, metadata: dict, content: dict | Iterable[dict]):
+    """以壓縮 JSON Lines 原子寫入快照（固定 gzip 時間戳，相同內容產生相同檔案）
+
+    Args:
+        path: 快照路徑
+        metadata: 第一行的 metadata
+        content: 快照內容，或 merge_records 產生的紀錄（逐筆寫入同目錄的暫存檔後替換）
+    """
+    records = _content_records(content) if isinstance(content, dict) else content
+    with atomic_open(path) as f, gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+        gz.write((_dumps({"metadata": metadata}) + "\n").encode("utf-8"))
+        for record in records:
+            gz.write((_dumps(record) + "\n").encode("utf-8"))
+
+
+def iter_snapshot_json(path: Path) -> Iterator[str]:
+    """逐段產生快照的 JSON 文字（每個項目一行），不需先載入整份快照
+
+    呼叫端若將結果串接為單一字串，記憶體用量仍與快照大小成正比。
+    """
+    records = iter_records(path)
+    yield '{"metadata": ' + _dumps(next(records).get("metadata", {}))
+
+    section = key = None
+    first_key = first_item = True
+    for record in records:
+        if record["s"] != section:
+            if key is not None:
+                yield "\n]"
+            if section in GROUPED_KEYS:
+                yield "\n}"
+            section, key = record["s"], None
+            if section not in GROUPED_KEYS:
+                yield f",\n{_dumps(section)}: " + _dumps(record.get("i", {}))
+                continue
+            yield f",\n{_dumps(section)}: {{"
+            first_key = True
+        if "k" not in record:
+            continue
+        if record["k"] != key:
+            if key is not None:
+                yield "\n]"
+            yield ("" if first_key else ",") + f"\n{_dumps(record['k'])}: ["
+            key, first_key, first_item = record["k"], False, True
+        if "i" in record:
+            yield ("" if first_item else ",") + "\n" + _dumps(record["i"])
+            first_item = False
+
+    if key is not None:
+        yield "\n]"
+    if section in GROUPED_KEYS:
+        yield "\n}"
+    yield "\n}"
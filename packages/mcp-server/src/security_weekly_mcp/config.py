@@ -0,0 +1,291 @@
+"""設定檔載入
+
+YAML 設定檔（sources.yaml、search_templates.yaml）在每次取用時以
+mtime 與大小檢查是否變更（僅一次 stat），變更時才重新解析。
+新內容先經驗證與建立衍生索引，成功後才替換；驗證失敗時沿用
+舊設定並記錄錯誤，直到檔案再次變更。
+
+搜尋模板載入時即預先解析每個查詢所需的變數，
+產生建議時只需比對變數是否齊全，不必以例外處理缺少的變數。
+"""
+
+import re
+import string
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+class ConfigFile:
+    """檔案變更時自動重新載入的 YAML 設定檔"""
+
+    def __init__(self, path: Path, build: Callable[[dict | None], Any]):
+        """初始化設定檔
+
+        Args:
+            path: YAML 檔案路徑
+            build: 驗證並轉換解析結果（檔案不存在時傳入 None），驗證失敗時拋出 ValueError
+        """
+        self.path = path
+        self.build = build
+        self.last_error: str | None = None
+        self._signature: tuple[int, int] | None = None
+        self._value: Any = None
+        self._loaded = False
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> Any:
+        """取得目前設定（檔案變更時重新載入）
+
+        Raises:
+            ValueError: 首次載入即驗證失敗
+        """
+        signature = self._stat()
+        if self._loaded and signature == self._signature:
+            return self._value
+
+        import yaml
+
+        try:
+            data = yaml.safe_load(self.path.read_text(encoding="utf-8")) if signature else None
+            value = self.build(data)
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            self.last_error = f"{self.path.name}: {e}"
+            if not self._loaded:
+                raise ValueError(f"設定檔載入失敗：{self.last_error}") from e
+            # 沿用舊設定，檔案再次變更前不重試
+            self._signature = signature
+            return self._value
+
+        self._value = value
+        self._signature = signature
+        self._loaded = True
+        self.last_error = None
+        return value
+
+
+def normalize_source_name(name: str) -> str:
+    """標準化來源名稱以便比對"""
+    return name.lower().replace(" ", "").replace("_", "").replace("-", "")
+
+
+# 可用於選擇來源的標籤（如 category:advisory、language:zh-TW）
+SELECTOR_KEYS = ("category", "language", "priority", "type")
+# 子字串比對結果的快取筆數
+MATCH_CACHE_SIZE = 1024
+
+
+class SourceIndex:
+    """來源名稱索引
+
+    建立時預先計算標準化名稱、別名與標籤，查詢時依序：
+    1. 選擇器（category:news；以逗號串接多個條件時取交集）
+    2. 名稱或別名完全相符
+    3. 雙向子字串比對（結果依查詢快取）
+    """
+
+    def __init__(self, sources: list[dict]):
+        self.sources = sources
+        # 標準化名稱 / 別名 → 來源索引
+        self._exact: dict[str, list[int]] = {}
+        # (標籤, 標準化值) → 來源索引
+        self._tags: dict[tuple[str, str], list[int]] = {}
+        self._names: list[tuple[int, str]] = []
+        self._matches: dict[str, list[int]] = {}
+
+        for i, source in enumerate(sources):
+            name = normalize_source_name(source["name"])
+            self._names.append((i, name))
+            for key in dict.fromkeys(
+                [name, *map(normalize_source_name, source.get("aliases", []))]
+            ):
+                self._exact.setdefault(key, []).append(i)
+                if key != name:
+                    self._names.append((i, key))
+            for tag in SELECTOR_KEYS:
+                if source.get(tag):
+                    key = (tag, normalize_source_name(str(source[tag])))
+                    self._tags.setdefault(key, []).append(i)
+
+    def _select(self, query: str) -> list[int] | None:
+        """解析選擇器（不是選擇器時回傳 None）"""
+        selected = None
+        for condition in query.split(","):
+            tag, sep, value = condition.partition(":")
+            tag = tag.strip().lower()
+            if not sep or tag not in SELECTOR_KEYS:
+                return None
+            indices = self._tags.get((tag, normalize_source_name(value.strip())), [])
+            selected = indices if selected is None else [i for i in selected if i in indices]
+        return selected
+
+    def _lookup(self, query: str) -> list[int]:
+        selected = self._select(query)
+        if selected is not None:
+            return selected
+        normalized = normalize_source_name(query)
+        if not normalized:
+            return []
+        if normalized in self._exact:
+            return self._exact[normalized]
+        if normalized not in self._matches:
+            if len(self._matches) >= MATCH_CACHE_SIZE:
+                self._matches.clear()
+            self._matches[normalized] = list(
+                dict.fromkeys(
+                    i for i, name in self._names if normalized in name or name in normalized
+                )
+            )
+        return self._matches[normalized]
+
+    def resolve(self, queries: list[str]) -> list[dict]:
+        """解析多個查詢，回傳不重複的來源（依查詢順序，同一查詢內依設定檔順序）"""
+        indices: dict[int, None] = {}
+        for query in queries:
+            indices.update(dict.fromkeys(self._lookup(query)))
+        return [self.sources[i] for i in indices]
+
+
+class SourcesConfig:
+    """已驗證的來源設定與衍生索引"""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.sources: list[dict] = data.get("sources") or []
+        self.priorities: dict[str, float] = data.get("priorities") or {}
+        # 來源名稱 → 優先級權重
+        self.weights = {s["name"]: self.priorities.get(s.get("priority"), 0) for s in self.sources}
+        # 來源名稱 → 來源設定
+        self.by_name = {s["name"]: s for s in self.sources}
+        # 啟用中的 RSS 來源，依優先級由高至低（同級維持設定檔順序）
+        self.rss_sources = sorted(
+            (s for s in self.sources if s.get("type") == "rss" and s.get("status") != "disabled"),
+            key=lambda s: self.weights[s["name"]],
+            reverse=True,
+        )
+        self.rss_index = SourceIndex(self.rss_sources)
+
+
+def build_sources_config(data: dict | None) -> SourcesConfig:
+    """驗證 sources.yaml 並建立索引
+
+    Raises:
+        ValueError: 設定格式錯誤
+    """
+    if data is None:
+        return SourcesConfig({"sources": []})
+    if not isinstance(data, dict):
+        raise ValueError("最上層必須是對應表")
+
+    priorities = data.get("priorities") or {}
+    if not isinstance(priorities, dict) or not all(
+        isinstance(v, int | float) for v in priorities.values()
+    ):
+        raise ValueError("priorities 必須是名稱對應數值")
+
+    sources = data.get("sources") or []
+    if not isinstance(sources, list):
+        raise ValueError("sources 必須是列表")
+    names = set()
+    for index, source in enumerate(sources):
+        if not isinstance(source, dict) or not isinstance(source.get("name"), str):
+            raise ValueError(f"sources[{index}] 缺少 name")
+        name = source["name"]
+        if name in names:
+            raise ValueError(f"來源名稱重複：{name}")
+        names.add(name)
+        if source.get("type") == "rss" and source.get("status") != "disabled":
+            if not source.get("url"):
+                raise ValueError(f"RSS 來源缺少 url：{name}")
+        if source.get("priority") is not None and source["priority"] not in priorities:
+            raise ValueError(f"未定義的優先級：{name} ({source['priority']})")
+        aliases = source.get("aliases", [])
+        if not isinstance(aliases, list) or not all(isinstance(a, str) for a in aliases):
+            raise ValueError(f"aliases 必須是字串列表：{name}")
+    return SourcesConfig(data)
+
+
+def template_fields(template: str) -> frozenset[str]:
+    """取出查詢模板所需的變數名稱
+
+    Raises:
+        ValueError: 模板格式錯誤或使用位置參數
+    """
+    names = set()
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"模板格式錯誤：{template}") from e
+    for _, field, spec, _ in parsed:
+        if field is None:
+            continue
+        root = re.split(r"[.\[]", field, maxsplit=1)[0]
+        if not root or root.isdigit():
+            raise ValueError(f"模板不可使用位置參數：{template}")
+        names.add(root)
+        if spec:
+            names |= template_fields(spec)
+    return frozenset(names)
+
+
+class CompiledQuery:
+    """預先解析所需變數的查詢模板"""
+
+    __slots__ = ("template", "fields", "options")
+
+    def __init__(self, options: dict):
+        self.options = options
+        self.template: str = options.get("query", "")
+        self.fields = template_fields(self.template)
+
+    def render(self, variables: dict) -> str | None:
+        """代入變數（缺少所需變數時回傳 None）"""
+        if not self.fields <= variables.keys():
+            return None
+        return self.template.format_map(variables)
+
+
+class SearchTemplates:
+    """已驗證並預先編譯的搜尋模板"""
+
+    def __init__(self, data: dict):
+        self.data = data
+        # 分類 → 編譯後的查詢
+        self.queries: dict[str, list[CompiledQuery]] = {
+            key: [CompiledQuery(q) for q in section["queries"]]
+            for key, section in data.items()
+            if isinstance(section, dict) and section.get("queries")
+        }
+        self.fetch_targets: list[dict] = (data.get("fetch_targets") or {}).get("urls") or []
+
+
+def build_search_templates(data: dict | None) -> SearchTemplates:
+    """驗證 search_templates.yaml 並編譯查詢模板
+
+    Raises:
+        ValueError: 設定格式錯誤
+    """
+    if data is None:
+        return SearchTemplates({})
+    if not isinstance(data, dict):
+        raise ValueError("最上層必須是對應表")
+    for key, section in data.items():
+        if section is not None and not isinstance(section, dict | list):
+            raise ValueError(f"{key} 格式錯誤")
+        queries = section.get("queries") if isinstance(section, dict) else None
+        if queries is None:
+            continue
+        if not isinstance(queries, list) or not all(
+            isinstance(q, dict) and isinstance(q.get("query"), str) for q in queries
+        ):
+            raise ValueError(f"{key}.queries 每個項目都需要 query 字串")
+    fetch_targets = data.get("fetch_targets") or {}
+    if not isinstance(fetch_targets, dict) or not isinstance(fetch_targets.get("urls") or [], list):
+        raise ValueError("fetch_targets.urls 必須是列表")
+    return SearchTemplates(data)
@@ -0,0 +1,100 @@
+"""共用 HTTP 連線池
+
+整個 Server 行程共用一個長駐的 httpx.AsyncClient，
+讓新聞來源、漏洞 API 與通知模組共享連線池、keep-alive 與 HTTP/2 多工
+（例如多個 feeds.feedburner.com 來源共用同一條連線）。
+"""
+
+import asyncio
+import os
+
+import httpx
+
+# 連線池設定（可由環境變數調整）
+MAX_CONNECTIONS = int(os.environ.get("SECURITY_WEEKLY_HTTP_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("SECURITY_WEEKLY_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.environ.get("SECURITY_WEEKLY_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.environ.get("SECURITY_WEEKLY_HTTP2", "1") != "0"
+
+# 預設逾時（個別請求可再以 timeout= 覆寫）
+DEFAULT_TIMEOUT = 30.0
+
+# 共用客戶端（單例快取）
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+# 關閉中的舊客戶端工作（保留參照，避免完成前被回收）
+_closing: set[asyncio.Task] = set()
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """建立新的 HTTP 客戶端（依模組設定的連線池參數）"""
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        limits=limits,
+        timeout=DEFAULT_TIMEOUT,
+        follow_redirects=True,
+    )
+
+
+async def _aclose_quietly(client: httpx.AsyncClient):
+    """關閉客戶端，忽略舊事件迴圈已關閉造成的錯誤"""
+    try:
+        await client.aclose()
+    except RuntimeError:
+        # 舊迴圈已關閉，連線無法在原迴圈上正常關閉；客戶端仍會標示為已關閉，
+        # 殘留的 socket 隨物件回收關閉
+        pass
+
+
+def _close_stale_client(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None):
+    """關閉綁定於先前事件迴圈的客戶端
+
+    舊迴圈仍在其他執行緒運作時排入該迴圈關閉，否則由目前的迴圈在背景關閉。
+    """
+    if client.is_closed:
+        return
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        return
+    task = asyncio.get_running_loop().create_task(_aclose_quietly(client))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """取得共用 HTTP 客戶端（單例快取）
+
+    連線池綁定於事件迴圈，若目前的事件迴圈與建立時不同
+    （例如腳本多次呼叫 asyncio.run），會關閉舊客戶端並重建。
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client_loop is not loop:
+        _close_stale_client(_client, _client_loop)
+        _client = None
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        _client_loop = loop
+    return _client
+
+
+async def aclose_http_client():
+    """關閉共用 HTTP 客戶端（Server 關閉時呼叫）"""
+    global _client, _client_loop
+    client = _client
+    _client = None
+    _client_loop = None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def reset_http_client():
+    """重設共用 HTTP 客戶端（用於測試）"""
+    global _client, _client_loop
+    _client = None
+    _client_loop = None
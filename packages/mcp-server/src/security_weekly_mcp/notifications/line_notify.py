@@ -8,6 +8,8 @@ from typing import Any
 
 import httpx
 
+from ..http_client import get_http_client
+
 LINE_NOTIFY_API = "https://notify-api.line.me/api/notify"
 
 
@@ -51,19 +53,19 @@ class LineNotify:
         data = {"message": message}
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(LINE_NOTIFY_API, headers=headers, data=data)
-
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 401:
-                    raise LineNotifyError("LINE Notify token 無效或已過期")
-                elif response.status_code == 400:
-                    raise LineNotifyError(f"請求格式錯誤: {response.text}")
-                else:
-                    raise LineNotifyError(
-                        f"LINE Notify API 錯誤 ({response.status_code}): {response.text}"
-                    )
+            client = get_http_client()
+            response = await client.post(LINE_NOTIFY_API, headers=headers, data=data, timeout=30.0)
+
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 401:
+                raise LineNotifyError("LINE Notify token 無效或已過期")
+            elif response.status_code == 400:
+                raise LineNotifyError(f"請求格式錯誤: {response.text}")
+            else:
+                raise LineNotifyError(
+                    f"LINE Notify API 錯誤 ({response.status_code}): {response.text}"
+                )
 
         except httpx.TimeoutException:
             raise LineNotifyError("LINE Notify API 連線逾時 (30s)")
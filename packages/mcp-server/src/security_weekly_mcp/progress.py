@@ -0,0 +1,28 @@
+"""MCP 進度通知
+
+長時間執行的工具可透過 report_progress 回報進度。
+僅在呼叫端於請求中提供 progressToken 時送出通知，
+在請求以外（如 CLI、測試）呼叫則不做任何事。
+"""
+
+from mcp.server.lowlevel.server import request_ctx
+
+
+async def report_progress(progress: float, total: float | None = None, message: str | None = None):
+    """送出目前請求的進度通知
+
+    Args:
+        progress: 目前進度
+        total: 總量（未知時為 None）
+        message: 進度說明
+    """
+    try:
+        ctx = request_ctx.get()
+    except LookupError:
+        return
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return
+    await ctx.session.send_progress_notification(
+        token, progress, total, message, related_request_id=str(ctx.request_id)
+    )
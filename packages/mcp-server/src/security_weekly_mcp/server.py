@@ -4,12 +4,16 @@ Security Weekly TW - 資安週報與術語庫 MCP Server
 提供術語庫查詢、新聞收集、PDF 週報產生等功能
 """
 
+from types import ModuleType
 from typing import Any
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
+from .collectors.background import BACKGROUND_ENABLED, stop_background_collector
+from .collectors.feeds import shutdown_parse_executor
+from .http_client import aclose_http_client
 from .tools import glossary, news, report
 
 app = Server("security-weekly-tw")
@@ -17,34 +21,71 @@ app = Server("security-weekly-tw")
 # 工具模組列表
 TOOL_MODULES = [glossary, news, report]
 
+# 工具註冊表：工具名稱 → (工具定義, 所屬模組)，啟動時建立一次
+_registry: dict[str, tuple[Tool, ModuleType]] | None = None
+
+
+async def build_registry() -> dict[str, tuple[Tool, ModuleType]]:
+    """從所有工具模組建立工具註冊表
+
+    Raises:
+        ValueError: 不同模組註冊了相同的工具名稱
+    """
+    registry: dict[str, tuple[Tool, ModuleType]] = {}
+    for module in TOOL_MODULES:
+        for tool in await module.list_tools():
+            if tool.name in registry:
+                owner = registry[tool.name][1].__name__
+                raise ValueError(f"工具名稱重複：{tool.name}（{owner} 與 {module.__name__}）")
+            registry[tool.name] = (tool, module)
+    return registry
+
+
+async def get_registry() -> dict[str, tuple[Tool, ModuleType]]:
+    """取得工具註冊表（單例快取）"""
+    global _registry
+    if _registry is None:
+        _registry = await build_registry()
+    return _registry
+
+
+def reset_registry():
+    """重設工具註冊表（用於測試）"""
+    global _registry
+    _registry = None
+
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """列出所有可用工具"""
-    tools = []
-    for module in TOOL_MODULES:
-        module_tools = await module.list_tools()
-        tools.extend(module_tools)
-    return tools
+    registry = await get_registry()
+    return [tool for tool, _ in registry.values()]
 
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     """呼叫指定工具"""
-    # 根據工具名稱找到對應模組
-    for module in TOOL_MODULES:
-        module_tools = await module.list_tools()
-        tool_names = [t.name for t in module_tools]
-        if name in tool_names:
-            return await module.call_tool(name, arguments)
+    registry = await get_registry()
+    entry = registry.get(name)
+    if entry is None:
+        return [TextContent(type="text", text=f"未知工具：{name}")]
 
-    return [TextContent(type="text", text=f"未知工具：{name}")]
+    _, module = entry
+    return await module.call_tool(name, arguments)
 
 
 async def main():
     """啟動 MCP Server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    await get_registry()
+    if BACKGROUND_ENABLED:
+        news.start_background_collector()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        await stop_background_collector()
+        await aclose_http_client()
+        shutdown_parse_executor()
 
 
 if __name__ == "__main__":
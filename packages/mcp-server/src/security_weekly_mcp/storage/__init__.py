@@ -0,0 +1,5 @@
+"""本地資料儲存模組（快取、鏡像與封存）"""
+
+from .files import atomic_open, atomic_write_bytes, atomic_write_text, get_cache_dir, get_raw_dir
+
+__all__ = ["atomic_open", "atomic_write_bytes", "atomic_write_text", "get_cache_dir", "get_raw_dir"]
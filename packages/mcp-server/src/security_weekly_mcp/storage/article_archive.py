@@ -0,0 +1,204 @@
+"""文章封存（SQLite + FTS5 全文索引）
+
+每次 fetch_security_news 收集到的文章都寫入本地 SQLite 封存，
+以（標準化 URL, 來源）為鍵去重，並對標題與摘要建立 FTS5 索引，
+讓 search_articles 不需重新抓取即可在毫秒內查詢歷史文章。
+
+資料庫使用 WAL 模式，收集（寫入）與查詢（讀取）可同時進行。
+每次操作各自開啟連線，可由 asyncio.to_thread 在工作執行緒中呼叫。
+FTS5 使用 trigram 斷詞以支援中文子字串查詢；
+少於 3 個字元的查詢詞（如「台灣」）改以 LIKE 比對。
+"""
+
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from ..collectors.dedup import canonicalize_url
+from .files import get_cache_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    canonical_url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    link TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    published TEXT,
+    fetched_at TEXT NOT NULL,
+    UNIQUE (canonical_url, source)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published
+    ON articles (coalesce(published, fetched_at));
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content='articles', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+END;
+"""
+
+# 搜尋結果的預設與最大筆數
+DEFAULT_ARTICLE_LIMIT = 20
+MAX_ARTICLE_LIMIT = 500
+
+# trigram 斷詞的最短查詢詞長度
+_MIN_FTS_TERM = 3
+
+_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+class ArticleArchive:
+    """SQLite 文章封存"""
+
+    def __init__(self, path: Path):
+        """初始化文章封存
+
+        Args:
+            path: SQLite 資料庫路徑
+        """
+        self.path = path
+        self._initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        """開啟資料庫連線（WAL 模式）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+    def add_articles(self, source: str, articles: list[dict]) -> int:
+        """寫入（或更新）一個來源的文章
+
+        Returns:
+            實際新增或內容有變更的文章數（已封存且內容相同者不計）
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                canonicalize_url(a.get("link", "")) or f"{source}:{a.get('title', '')}",
+                source,
+                a.get("title", ""),
+                a.get("link", ""),
+                a.get("summary", ""),
+                a.get("published"),
+                now,
+            )
+            for a in articles
+            if "error" not in a
+        ]
+        if not rows:
+            return 0
+        conn = self.connect()
+        try:
+            with conn:
+                cursor = conn.executemany(
+                    """
+                    INSERT INTO articles
+                        (canonical_url, source, title, link, summary, published, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (canonical_url, source) DO UPDATE SET
+                        title = excluded.title,
+                        link = excluded.link,
+                        summary = excluded.summary,
+                        published = coalesce(excluded.published, articles.published)
+                    WHERE articles.title != excluded.title
+                       OR articles.summary != excluded.summary
+                       OR articles.published IS NOT excluded.published
+                    """,
+                    rows,
+                )
+        finally:
+            conn.close()
+        # rowcount 只計入陳述式本身的變更，不含 FTS 觸發器
+        return cursor.rowcount
+
+    def search(
+        self,
+        query: str,
+        days: int | None = None,
+        sources: list[str] | None = None,
+        limit: int = DEFAULT_ARTICLE_LIMIT,
+        sort: str = "date",
+    ) -> list[dict]:
+        """全文搜尋封存文章
+
+        Args:
+            query: 查詢字串，多個詞以空白分隔（皆須符合），可用雙引號包住片語
+            days: 只搜尋最近 N 天的文章
+            sources: 限定來源名稱
+            limit: 最大回傳數量（限制在 1 至 MAX_ARTICLE_LIMIT 之間）
+            sort: date（新到舊）或 relevance（BM25 相關度）
+        """
+        terms = [m.group(1) or m.group(2) for m in _TERM_RE.finditer(query)]
+        fts_terms = [t for t in terms if len(t) >= _MIN_FTS_TERM]
+        like_terms = [t for t in terms if len(t) < _MIN_FTS_TERM]
+
+        sql = ["SELECT a.source, a.title, a.link, a.summary, a.published FROM articles a"]
+        where: list[str] = []
+        params: list = []
+        if fts_terms:
+            sql.append("JOIN articles_fts ON articles_fts.rowid = a.id")
+            where.append("articles_fts MATCH ?")
+            params.append(" ".join('"' + t.replace('"', '""') + '"' for t in fts_terms))
+        for term in like_terms:
+            where.append("(a.title LIKE ? OR a.summary LIKE ?)")
+            params.extend([f"%{term}%"] * 2)
+        if days is not None:
+            where.append("coalesce(a.published, a.fetched_at) >= ?")
+            params.append((datetime.now() - timedelta(days=days)).isoformat())
+        if sources:
+            where.append(f"a.source IN ({','.join('?' * len(sources))})")
+            params.extend(sources)
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        if sort == "relevance" and fts_terms:
+            sql.append("ORDER BY bm25(articles_fts)")
+        else:
+            sql.append("ORDER BY coalesce(a.published, a.fetched_at) DESC")
+        sql.append("LIMIT ?")
+        params.append(min(MAX_ARTICLE_LIMIT, max(1, limit)))
+
+        conn = self.connect()
+        try:
+            rows = conn.execute(" ".join(sql), params).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        """封存文章總數"""
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT count(*) FROM articles").fetchone()[0]
+        finally:
+            conn.close()
+
+
+# 文章封存（單例快取，快取目錄變更時重建）
+_archive: ArticleArchive | None = None
+
+
+def get_article_archive() -> ArticleArchive:
+    """取得文章封存實例"""
+    global _archive
+    path = get_cache_dir() / "articles.sqlite3"
+    if _archive is None or _archive.path != path:
+        _archive = ArticleArchive(path)
+    return _archive
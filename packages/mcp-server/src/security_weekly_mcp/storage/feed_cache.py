@@ -0,0 +1,188 @@
+"""RSS Feed 條件式請求快取
+
+以 URL 為鍵，將 feed 原文、ETag、Last-Modified 與解析後的文章
+保存於本地磁碟。後續抓取時送出 If-None-Match / If-Modified-Since，
+收到 304 即直接沿用已解析的文章，省下頻寬與解析成本。
+
+串流模式提前停止下載時沒有完整原文，只保存驗證標頭與已取得的文章
+（標記 partial 及當時的回顧天數與筆數），條件相同或較小的請求仍可使用 304。
+
+目錄結構（位於快取根目錄下的 feeds/；api 類型來源使用 api/）：
+    <key>.json   中繼資料與解析後的文章
+    <key>.body   feed 原文（partial 紀錄沒有原文）
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from .files import atomic_write_bytes, atomic_write_text, get_cache_dir
+
+
+def _url_key(url: str) -> str:
+    """將 URL 轉為檔名安全的快取鍵"""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def body_digest(body: bytes) -> str:
+    """計算 feed 原文雜湊（用於判斷內容是否變更）"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class FeedCache:
+    """RSS Feed 磁碟快取"""
+
+    def __init__(self, cache_dir: Path):
+        """初始化 Feed 快取
+
+        Args:
+            cache_dir: 快取目錄
+        """
+        self.cache_dir = cache_dir
+
+    def _meta_path(self, url: str) -> Path:
+        return self.cache_dir / f"{_url_key(url)}.json"
+
+    def _body_path(self, url: str) -> Path:
+        return self.cache_dir / f"{_url_key(url)}.body"
+
+    def get(self, url: str) -> dict | None:
+        """取得快取紀錄
+
+        Returns:
+            包含 url、etag、last_modified、body_sha256、fetched_at、entries 的字典；
+            無快取或快取損毀時回傳 None
+        """
+        meta_path = self._meta_path(url)
+        if not meta_path.exists():
+            return None
+        try:
+            record = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if record.get("url") != url:
+            return None
+        return record
+
+    def get_body(self, url: str) -> bytes | None:
+        """取得快取的 feed 原文"""
+        body_path = self._body_path(url)
+        if not body_path.exists():
+            return None
+        return body_path.read_bytes()
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        entries: list[dict],
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> dict:
+        """寫入快取紀錄
+
+        Args:
+            url: Feed URL
+            body: Feed 原文
+            entries: 解析後的文章列表
+            etag: 回應的 ETag 標頭
+            last_modified: 回應的 Last-Modified 標頭
+
+        Returns:
+            寫入的快取紀錄
+        """
+        record = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_sha256": body_digest(body),
+            "fetched_at": datetime.now().isoformat(),
+            "entries": entries,
+        }
+        atomic_write_bytes(self._body_path(url), body)
+        atomic_write_text(self._meta_path(url), json.dumps(record, ensure_ascii=False))
+        return record
+
+    def put_partial(
+        self,
+        url: str,
+        entries: list[dict],
+        days: int,
+        limit: int,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> dict:
+        """寫入提前停止下載的快取紀錄（只有驗證標頭與已取得的文章，沒有原文）
+
+        Args:
+            entries: 停止前解析到的文章
+            days: 停止時使用的回顧天數
+            limit: 停止時使用的文章數上限
+
+        Returns:
+            寫入的快取紀錄
+        """
+        record = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_sha256": None,
+            "partial": {"days": days, "limit": limit},
+            "fetched_at": datetime.now().isoformat(),
+            "entries": entries,
+        }
+        # 舊原文已與驗證標頭不一致
+        self._body_path(url).unlink(missing_ok=True)
+        atomic_write_text(self._meta_path(url), json.dumps(record, ensure_ascii=False))
+        return record
+
+    def touch(self, record: dict, validators: dict[str, str | None] | None = None):
+        """更新快取紀錄的檢查時間，不重寫 feed 原文
+
+        收到 304，或以 200 回應但原文雜湊相同時呼叫。
+
+        Args:
+            validators: 回應的 etag / last_modified（200 回應時以新標頭取代）
+        """
+        record["fetched_at"] = datetime.now().isoformat()
+        if validators is not None:
+            record.update(validators)
+        atomic_write_text(self._meta_path(record["url"]), json.dumps(record, ensure_ascii=False))
+
+    @staticmethod
+    def conditional_headers(record: dict | None) -> dict[str, str]:
+        """根據快取紀錄產生條件式請求標頭"""
+        headers = {}
+        if record:
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+
+# Feed 快取（單例快取，快取目錄變更時重建）
+_feed_cache: FeedCache | None = None
+
+
+def get_feed_cache() -> FeedCache:
+    """取得 Feed 快取實例"""
+    global _feed_cache
+    cache_dir = get_cache_dir() / "feeds"
+    if _feed_cache is None or _feed_cache.cache_dir != cache_dir:
+        _feed_cache = FeedCache(cache_dir)
+    return _feed_cache
+
+
+# API 回應快取（單例快取，快取目錄變更時重建）
+_api_cache: FeedCache | None = None
+
+
+def get_api_cache() -> FeedCache:
+    """取得 api 類型來源的條件式請求快取實例"""
+    global _api_cache
+    cache_dir = get_cache_dir() / "api"
+    if _api_cache is None or _api_cache.cache_dir != cache_dir:
+        _api_cache = FeedCache(cache_dir)
+    return _api_cache
@@ -0,0 +1,54 @@
+"""儲存目錄與原子寫入工具"""
+
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent.parent
+
+# 預設快取目錄（可由 SECURITY_WEEKLY_CACHE_DIR 環境變數覆寫）
+DEFAULT_CACHE_DIR = PROJECT_ROOT / "output" / "cache"
+
+# 週報原始資料目錄（output/raw/YYYY-WNN.json，提交至 repo 保存）
+DEFAULT_RAW_DIR = PROJECT_ROOT / "output" / "raw"
+
+
+def get_cache_dir() -> Path:
+    """取得本地快取根目錄"""
+    override = os.environ.get("SECURITY_WEEKLY_CACHE_DIR")
+    return Path(override) if override else DEFAULT_CACHE_DIR
+
+
+def get_raw_dir() -> Path:
+    """取得週報原始資料目錄（可由 SECURITY_WEEKLY_RAW_DIR 環境變數覆寫）"""
+    override = os.environ.get("SECURITY_WEEKLY_RAW_DIR")
+    return Path(override) if override else DEFAULT_RAW_DIR
+
+
+@contextmanager
+def atomic_open(path: Path) -> Iterator[BinaryIO]:
+    """開啟同目錄的暫存檔供串流寫入，區塊正常結束時替換目標檔案（中斷時不留下半個檔案）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """原子寫入檔案（先寫暫存檔再替換，避免中斷時留下半個檔案）"""
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+def atomic_write_text(path: Path, text: str):
+    """原子寫入文字檔（UTF-8）"""
+    atomic_write_bytes(path, text.encode("utf-8"))
@@ -0,0 +1,200 @@
+"""CISA KEV 本地鏡像
+
+將 CISA Known Exploited Vulnerabilities 目錄保存於本地，
+依 dateAdded 排序並建立 CVE ID 索引：
+- 日期區間查詢：bisect 找出起點後直接切片
+- 「此 CVE 是否在 KEV」：字典查詢
+
+更新時以 ETag / Last-Modified 條件式請求，並在存活時間內不重新連線；
+有新資料時只合併新增或變更的項目。
+"""
+
+import asyncio
+import bisect
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from .files import atomic_write_text, get_cache_dir
+
+KEV_URL = "https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json"
+
+# 鏡像存活時間：期間內不重新檢查遠端
+REFRESH_INTERVAL = timedelta(hours=6)
+
+
+class KevMirror:
+    """CISA KEV 本地鏡像"""
+
+    def __init__(self, cache_dir: Path):
+        """初始化 KEV 鏡像
+
+        Args:
+            cache_dir: 鏡像目錄
+        """
+        self.cache_dir = cache_dir
+        self.path = cache_dir / "catalog.json"
+        self.meta: dict = {}
+        self._entries: list[dict] = []  # 依 dateAdded 遞增排序
+        self._dates: list[str] = []  # 與 _entries 對應的 dateAdded（YYYY-MM-DD）
+        self._by_cve: dict[str, dict] = {}
+        self._loaded = False
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._entries)
+
+    def load(self):
+        """從磁碟載入鏡像（僅第一次呼叫時讀檔）"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        self.meta = data.get("meta", {})
+        self._rebuild(data.get("vulnerabilities", []))
+
+    def _rebuild(self, vulnerabilities: list[dict]):
+        """重建排序與索引"""
+        entries = [v for v in vulnerabilities if v.get("cveID") and v.get("dateAdded")]
+        entries.sort(key=lambda v: v["dateAdded"])
+        self._entries = entries
+        self._dates = [v["dateAdded"] for v in entries]
+        self._by_cve = {v["cveID"]: v for v in entries}
+
+    def _save(self, data: dict):
+        atomic_write_text(self.path, json.dumps(data, ensure_ascii=False))
+
+    def merge(self, vulnerabilities: list[dict]) -> dict[str, int]:
+        """合併新的 KEV 目錄
+
+        只新增的情況下以 insort 插入；有項目被移除或 dateAdded 變動時才整體重建。
+
+        Returns:
+            合併統計（added、updated、removed）
+        """
+        self.load()
+        incoming = {v["cveID"]: v for v in vulnerabilities if v.get("cveID") and v.get("dateAdded")}
+        added = [v for cve, v in incoming.items() if cve not in self._by_cve]
+        removed = [cve for cve in self._by_cve if cve not in incoming]
+        updated = [
+            v for cve, v in incoming.items() if cve in self._by_cve and self._by_cve[cve] != v
+        ]
+        stats = {"added": len(added), "updated": len(updated), "removed": len(removed)}
+
+        needs_rebuild = bool(removed) or any(
+            self._by_cve[v["cveID"]]["dateAdded"] != v["dateAdded"] for v in updated
+        )
+        if needs_rebuild:
+            self._rebuild(list(incoming.values()))
+            return stats
+
+        for v in updated:
+            self._by_cve[v["cveID"]].clear()
+            self._by_cve[v["cveID"]].update(v)
+        for v in sorted(added, key=lambda v: v["dateAdded"]):
+            index = bisect.bisect_right(self._dates, v["dateAdded"])
+            self._dates.insert(index, v["dateAdded"])
+            self._entries.insert(index, v)
+            self._by_cve[v["cveID"]] = v
+        return stats
+
+    def is_stale(self) -> bool:
+        """鏡像是否超過存活時間"""
+        self.load()
+        refreshed_at = self.meta.get("refreshed_at")
+        if not refreshed_at or not self._entries:
+            return True
+        return datetime.now() - datetime.fromisoformat(refreshed_at) > REFRESH_INTERVAL
+
+    def seconds_until_stale(self) -> float:
+        """距離鏡像超過存活時間的秒數（已過期或尚無資料時為 0）"""
+        if self.is_stale():
+            return 0.0
+        refreshed_at = datetime.fromisoformat(self.meta["refreshed_at"])
+        return max(0.0, (refreshed_at + REFRESH_INTERVAL - datetime.now()).total_seconds())
+
+    async def refresh(self, client: httpx.AsyncClient, force: bool = False) -> dict[str, int]:
+        """從 CISA 更新鏡像
+
+        Args:
+            client: HTTP 客戶端
+            force: 忽略存活時間強制檢查遠端
+
+        Returns:
+            合併統計；未檢查或未變更時各項為 0
+
+        Raises:
+            httpx.HTTPError: 網路或 HTTP 錯誤
+            json.JSONDecodeError: 回傳非 JSON 格式
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        if not force and not self.is_stale():
+            return stats
+
+        headers = {}
+        if self._entries:
+            if self.meta.get("etag"):
+                headers["If-None-Match"] = self.meta["etag"]
+            if self.meta.get("last_modified"):
+                headers["If-Modified-Since"] = self.meta["last_modified"]
+
+        response = await client.get(KEV_URL, headers=headers, timeout=30.0)
+        if response.status_code != 304:
+            response.raise_for_status()
+            data = response.json()
+            stats = self.merge(data.get("vulnerabilities", []))
+            self.meta.update(
+                {
+                    "catalog_version": data.get("catalogVersion"),
+                    "date_released": data.get("dateReleased"),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+            )
+
+        self.meta["refreshed_at"] = datetime.now().isoformat()
+        # 以當下的副本在工作執行緒中序列化並寫檔，不佔用事件迴圈
+        data = {"meta": dict(self.meta), "vulnerabilities": list(self._entries)}
+        await asyncio.to_thread(self._save, data)
+        return stats
+
+    def since(self, start_date: str, end_date: str | None = None) -> list[dict]:
+        """查詢 dateAdded 落在 (start_date, end_date] 的項目（依日期遞增）
+
+        Args:
+            start_date: 起始日期（YYYY-MM-DD，不含）
+            end_date: 結束日期（YYYY-MM-DD，含）；None 表示至今
+        """
+        self.load()
+        lo = bisect.bisect_right(self._dates, start_date)
+        hi = len(self._dates) if end_date is None else bisect.bisect_right(self._dates, end_date)
+        return self._entries[lo:hi]
+
+    def get(self, cve_id: str) -> dict | None:
+        """以 CVE ID 取得 KEV 項目"""
+        self.load()
+        return self._by_cve.get(cve_id)
+
+    def __contains__(self, cve_id: str) -> bool:
+        self.load()
+        return cve_id in self._by_cve
+
+
+# KEV 鏡像（單例快取，快取目錄變更時重建）
+_kev_mirror: KevMirror | None = None
+
+
+def get_kev_mirror() -> KevMirror:
+    """取得 KEV 鏡像實例"""
+    global _kev_mirror
+    cache_dir = get_cache_dir() / "kev"
+    if _kev_mirror is None or _kev_mirror.cache_dir != cache_dir:
+        _kev_mirror = KevMirror(cache_dir)
+    return _kev_mirror
@@ -0,0 +1,129 @@
+"""目錄清單（manifest）
+
+為 output/raw、output/reports 等目錄保存每個檔案的摘要欄位與內容雜湊，
+以檔案的 mtime 與大小驗證是否仍有效。列出檔案時只需 stat，
+不必重新解析每份完整文件；檔案變更或新增時才重新擷取。
+
+清單存放於快取目錄的 manifests/<名稱>.json。
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+from .files import atomic_write_text, get_cache_dir
+
+
+def file_digest(path: Path) -> str:
+    """計算檔案 SHA-256（串流讀取）"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class Manifest:
+    """目錄檔案摘要清單"""
+
+    def __init__(self, path: Path, directory: Path):
+        """初始化清單
+
+        Args:
+            path: 清單 JSON 檔案路徑
+            directory: 清單涵蓋的目錄
+        """
+        self.path = path
+        self.directory = directory
+        self._entries: dict[str, dict] | None = None
+        self._dirty = False
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            # 目錄不同（例如改用其他輸出目錄）時重建
+            same_dir = data.get("directory") == str(self.directory)
+            self._entries = data.get("files", {}) if same_dir else {}
+        return self._entries
+
+    def lookup(self, file: Path) -> dict | None:
+        """取得仍有效的檔案摘要（mtime 或大小不符時回傳 None）"""
+        entry = self._load().get(file.name)
+        if entry is None:
+            return None
+        try:
+            stat = file.stat()
+        except OSError:
+            return None
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        return entry
+
+    def record(self, file: Path, fields: dict, digest: str | None = None) -> dict:
+        """記錄檔案摘要（寫入檔案後呼叫；需再呼叫 save）"""
+        stat = file.stat()
+        entry = {
+            **fields,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest or file_digest(file),
+        }
+        self._load()[file.name] = entry
+        self._dirty = True
+        return entry
+
+    def refresh(self, files: list[Path], extract: Callable[[Path], dict]) -> list[dict]:
+        """取得多個檔案的摘要，失效或缺少的項目以 extract 重新擷取
+
+        擷取失敗的檔案回傳 {"error": ...} 且不寫入清單，下次再試。
+
+        Returns:
+            與 files 順序相同的摘要列表
+        """
+        results = []
+        for file in files:
+            entry = self.lookup(file)
+            if entry is None:
+                try:
+                    entry = self.record(file, extract(file))
+                except Exception:
+                    entry = {"error": "無法解析檔案"}
+            results.append(entry)
+        self.save()
+        return results
+
+    def retain(self, files: list[Path]):
+        """移除清單中已不存在於 files 的項目"""
+        entries = self._load()
+        names = {file.name for file in files}
+        for name in [name for name in entries if name not in names]:
+            del entries[name]
+            self._dirty = True
+        self.save()
+
+    def save(self):
+        """有變更時寫入磁碟"""
+        if not self._dirty:
+            return
+        data = {"directory": str(self.directory), "files": self._load()}
+        atomic_write_text(self.path, json.dumps(data, ensure_ascii=False, indent=2))
+        self._dirty = False
+
+
+# 各目錄的清單（單例快取，快取目錄或目標目錄變更時重建）
+_manifests: dict[str, Manifest] = {}
+
+
+def get_manifest(name: str, directory: Path) -> Manifest:
+    """取得目錄清單實例
+
+    Args:
+        name: 清單名稱（如 raw、reports）
+        directory: 清單涵蓋的目錄
+    """
+    path = get_cache_dir() / "manifests" / f"{name}.json"
+    manifest = _manifests.get(name)
+    if manifest is None or manifest.path != path or manifest.directory != directory:
+        manifest = _manifests[name] = Manifest(path, directory)
+    return manifest
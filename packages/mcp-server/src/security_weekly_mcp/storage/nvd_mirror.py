@@ -0,0 +1,410 @@
+"""NVD 本地鏡像（SQLite）
+
+以 CVE ID 為主鍵保存正規化後的 NVD 紀錄，供 get_cve 離線查詢：
+- 首次同步依發布日期逐一載入 120 天區段（bulk load），每完成一個區段即記錄進度，
+  中途失敗時下次從最後完成的區段接續
+- 之後以 lastModStartDate 只抓取上次同步後修改過的 CVE（delta sync）
+- fetch_vulnerabilities 查到的 CVE 也會順帶寫入
+
+與 ArticleArchive 相同，每次操作各自開啟連線（WAL 模式），
+可由 asyncio.to_thread 在工作執行緒中呼叫，不佔用事件迴圈。
+查詢使用主鍵索引；多筆查詢以 IN 分批（每批 BATCH_SIZE 筆）一次取回。
+
+cve_products 為廠商 → 產品 → CVE 的反向索引（主鍵即索引），
+「某廠商本季的重大漏洞」只需走索引，不必掃描整個鏡像。
+CVE 更新時一併重建其索引列；廠商與產品以 normalize_vendor 的比對鍵保存。
+
+資料庫版本記錄於 PRAGMA user_version，版本較舊時開啟即由已保存的紀錄重建索引。
+早期鏡像的紀錄沒有 cpes 欄位而無法重建，此時標記為索引不完整，
+直到以 sync_nvd_mirror.py --full 重新批次載入為止。
+"""
+
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from ..collectors.nvd import NvdClient, date_windows, iter_normalized, normalize_vendor
+from .files import get_cache_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cves (
+    cve_id TEXT PRIMARY KEY,
+    published TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    cvss REAL NOT NULL DEFAULT 0,
+    record TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cve_products (
+    vendor TEXT NOT NULL,
+    product TEXT NOT NULL,
+    cve_id TEXT NOT NULL,
+    PRIMARY KEY (vendor, product, cve_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cve_products_cve ON cve_products (cve_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# 資料庫版本（1：cve_products 改用 normalize_vendor 比對鍵）
+SCHEMA_VERSION = 1
+
+# CVE ID 格式
+CVE_PATTERN = re.compile(r"^CVE-\d{4}-\d{4,}$")
+
+# 首次同步的起始發布日期（NVD 最早的 CVE）
+BULK_START = datetime(1999, 1, 1)
+# 增量同步間隔（背景收集器使用）
+SYNC_INTERVAL = timedelta(hours=2)
+
+# 批次寫入與查詢筆數
+BATCH_SIZE = 500
+# 依廠商查詢的預設與最大筆數
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 500
+
+
+def normalize_cve_id(value: str) -> str | None:
+    """標準化 CVE ID（格式錯誤時回傳 None）"""
+    cve_id = value.strip().upper()
+    return cve_id if CVE_PATTERN.match(cve_id) else None
+
+
+def _product_rows(records) -> list[tuple[str, str, str]]:
+    """由紀錄的 cpes（廠商:產品）產生 cve_products 索引列"""
+    rows = []
+    for r in records:
+        for cpe in r.get("cpes", []):
+            if ":" in cpe:
+                vendor, product = cpe.split(":", 1)
+                rows.append((normalize_vendor(vendor), normalize_vendor(product), r["cve_id"]))
+    return rows
+
+
+def _utcnow() -> datetime:
+    # NVD API 的日期參數為 UTC
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class NvdMirror:
+    """NVD SQLite 鏡像"""
+
+    def __init__(self, path: Path):
+        """初始化 NVD 鏡像
+
+        Args:
+            path: SQLite 資料庫路徑
+        """
+        self.path = path
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        """開啟資料庫連線（WAL 模式，首次開啟時建立資料表並視需要重建索引）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                        self._rebuild_products(conn)
+                    self._initialized = True
+        return conn
+
+    def _rebuild_products(self, conn: sqlite3.Connection):
+        """由已保存的紀錄重建廠商索引並更新資料庫版本
+
+        沒有 cpes 欄位的紀錄（早期鏡像）無法重建，標記索引不完整。
+        """
+        incomplete = False
+        with conn:
+            conn.execute("DELETE FROM cve_products")
+            rows = conn.execute("SELECT record FROM cves")
+            while batch := rows.fetchmany(BATCH_SIZE):
+                records = [json.loads(record) for (record,) in batch]
+                incomplete = incomplete or any("cpes" not in r for r in records)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO cve_products (vendor, product, cve_id) VALUES (?, ?, ?)",
+                    _product_rows(records),
+                )
+            if incomplete:
+                self._set_state(conn, "index_incomplete", "1")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def upsert(self, records: list[dict]) -> int:
+        """寫入（或更新）正規化後的 CVE 紀錄，並同步更新廠商索引
+
+        鏡像中已有較新（last_modified 較晚）或內容相同的紀錄時略過。
+
+        Returns:
+            實際新增或更新的筆數
+        """
+        records = [r for r in records if r.get("cve_id")]
+        if not records:
+            return 0
+        conn = self.connect()
+        changed = []
+        try:
+            with conn:
+                for r in records:
+                    cursor = conn.execute(
+                        """
+                        INSERT INTO cves (cve_id, published, last_modified, cvss, record)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (cve_id) DO UPDATE SET
+                            published = excluded.published,
+                            last_modified = excluded.last_modified,
+                            cvss = excluded.cvss,
+                            record = excluded.record
+                        WHERE excluded.last_modified >= cves.last_modified
+                          AND excluded.record != cves.record
+                        """,
+                        (
+                            r["cve_id"],
+                            r.get("published", ""),
+                            r.get("last_modified", ""),
+                            r.get("cvss", 0.0),
+                            json.dumps(r, ensure_ascii=False, separators=(",", ":")),
+                        ),
+                    )
+                    if cursor.rowcount:
+                        changed.append(r)
+                conn.executemany(
+                    "DELETE FROM cve_products WHERE cve_id = ?", [(r["cve_id"],) for r in changed]
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO cve_products (vendor, product, cve_id) VALUES (?, ?, ?)",
+                    _product_rows(changed),
+                )
+        finally:
+            conn.close()
+        return len(changed)
+
+    def get(self, cve_id: str) -> dict | None:
+        """查詢單一 CVE"""
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT record FROM cves WHERE cve_id = ?", (cve_id,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, cve_ids: list[str]) -> dict[str, dict]:
+        """批次查詢多個 CVE
+
+        Returns:
+            CVE ID → 紀錄（鏡像中沒有的 ID 不會出現）
+        """
+        found = {}
+        unique = list(dict.fromkeys(cve_ids))
+        conn = self.connect()
+        try:
+            for i in range(0, len(unique), BATCH_SIZE):
+                batch = unique[i : i + BATCH_SIZE]
+                rows = conn.execute(
+                    "SELECT cve_id, record FROM cves "
+                    f"WHERE cve_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+                found.update((cve_id, json.loads(record)) for cve_id, record in rows)
+        finally:
+            conn.close()
+        return found
+
+    def search(
+        self,
+        vendor: str,
+        product: str | None = None,
+        min_cvss: float = 0.0,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[dict]:
+        """依廠商（與產品）查詢 CVE，依 CVSS 與發布時間由高至低排序
+
+        Args:
+            vendor: 廠商名稱（如 Fortinet、Palo Alto Networks、paloaltonetworks）
+            product: 產品名稱（None 表示不限）
+            min_cvss: 最低 CVSS 分數
+            since: 發布時間下限（ISO 日期，含）
+            until: 發布時間上限（ISO 日期，含當日）
+            limit: 最多回傳筆數
+        """
+        conditions = ["p.vendor = ?", "c.cvss >= ?"]
+        params: list = [normalize_vendor(vendor), min_cvss]
+        if product:
+            conditions.append("p.product = ?")
+            params.append(normalize_vendor(product))
+        if since:
+            conditions.append("c.published >= ?")
+            params.append(since)
+        if until:
+            # published 為 ISO 時間字串，以 until 當日結束為上限
+            conditions.append("c.published < ?")
+            params.append(f"{until}\uffff")
+        conn = self.connect()
+        try:
+            rows = conn.execute(
+                f"""
+                SELECT DISTINCT c.cve_id, c.cvss, c.published, c.record
+                FROM cve_products p JOIN cves c ON c.cve_id = p.cve_id
+                WHERE {" AND ".join(conditions)}
+                ORDER BY c.cvss DESC, c.published DESC
+                LIMIT ?
+                """,
+                [*params, min(limit, MAX_SEARCH_LIMIT)],
+            ).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(record) for *_, record in rows]
+
+    def count(self) -> int:
+        """鏡像中的 CVE 數"""
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT count(*) FROM cves").fetchone()[0]
+        finally:
+            conn.close()
+
+    def _get_state(self, key: str) -> str | None:
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_state(conn: sqlite3.Connection, key: str, value: str):
+        conn.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _update_state(self, values: dict[str, str | None]):
+        """寫入同步狀態（值為 None 時刪除該鍵）"""
+        conn = self.connect()
+        try:
+            with conn:
+                for key, value in values.items():
+                    if value is None:
+                        conn.execute("DELETE FROM sync_state WHERE key = ?", (key,))
+                    else:
+                        self._set_state(conn, key, value)
+        finally:
+            conn.close()
+
+    @property
+    def last_sync(self) -> str | None:
+        """上次同步完成時的同步起點（UTC ISO 時間），未同步過為 None"""
+        return self._get_state("last_sync")
+
+    @property
+    def index_incomplete(self) -> bool:
+        """廠商索引是否缺少早期鏡像的紀錄（需以 --full 重新批次載入）"""
+        return self._get_state("index_incomplete") is not None
+
+    def status(self) -> dict:
+        """鏡像狀態摘要"""
+        return {
+            "count": self.count(),
+            "last_sync": self.last_sync,
+            "index_incomplete": self.index_incomplete,
+        }
+
+    def is_due(self) -> bool:
+        """已完成首次同步且距上次同步超過 SYNC_INTERVAL"""
+        last_sync = self.last_sync
+        if last_sync is None:
+            return False
+        return _utcnow() - datetime.fromisoformat(last_sync) > SYNC_INTERVAL
+
+    async def _store(self, items: AsyncIterator[dict]) -> int:
+        stored = 0
+        async for batch in iter_normalized(items, BATCH_SIZE):
+            stored += await asyncio.to_thread(self.upsert, batch)
+        return stored
+
+    async def sync(
+        self, client: NvdClient, full: bool = False, start: datetime = BULK_START
+    ) -> dict:
+        """同步鏡像
+
+        未同步過（或 full=True）時依發布日期逐一載入 start 之後的 120 天區段，
+        每完成一個區段即記錄進度；批次載入中途失敗時，下次（未指定 full）
+        從最後完成的區段接續，不必重新從 start 開始。
+        已同步過則只抓取上次同步後修改過的 CVE，全部分頁成功後才更新同步時間，
+        中途失敗時下次會從同一起點重試。資料庫讀寫都在工作執行緒進行。
+
+        Args:
+            client: NVD 客戶端
+            full: 強制從 start 重新批次載入
+            start: 批次載入的起始發布日期
+
+        Returns:
+            同步統計（mode、stored、count；stored 為實際新增或更新的筆數）
+
+        Raises:
+            httpx.HTTPError: 網路或 HTTP 錯誤
+        """
+        started = _utcnow()
+        state = await asyncio.to_thread(self._sync_state)
+        if not full and state["last_sync"] is not None:
+            items = client.iter_cves(
+                datetime.fromisoformat(state["last_sync"]), started, date_field="lastMod"
+            )
+            stored = await self._store(items)
+            await asyncio.to_thread(self._update_state, {"last_sync": started.isoformat()})
+            return {"mode": "delta", "stored": stored, "count": await asyncio.to_thread(self.count)}
+
+        if full or state["bulk_started"] is None:
+            # 批次載入的開始時間作為之後增量同步的起點，涵蓋載入期間的修改
+            bulk_started, resume = started.isoformat(), start
+            await asyncio.to_thread(
+                self._update_state, {"bulk_started": bulk_started, "bulk_progress": None}
+            )
+        else:
+            bulk_started = state["bulk_started"]
+            resume = datetime.fromisoformat(state["bulk_progress"] or start.isoformat())
+
+        stored = 0
+        for window_start, window_end in date_windows(resume, started):
+            stored += await self._store(client.iter_cves(window_start, window_end))
+            await asyncio.to_thread(self._update_state, {"bulk_progress": window_end.isoformat()})
+        # 重新批次載入後所有紀錄皆含 cpes，索引已完整
+        await asyncio.to_thread(
+            self._update_state,
+            {
+                "last_sync": bulk_started,
+                "bulk_started": None,
+                "bulk_progress": None,
+                "index_incomplete": None,
+            },
+        )
+        return {"mode": "bulk", "stored": stored, "count": await asyncio.to_thread(self.count)}
+
+    def _sync_state(self) -> dict[str, str | None]:
+        return {key: self._get_state(key) for key in ("last_sync", "bulk_started", "bulk_progress")}
+
+
+# NVD 鏡像（單例快取，快取目錄變更時重建）
+_mirror: NvdMirror | None = None
+
+
+def get_nvd_mirror() -> NvdMirror:
+    """取得 NVD 鏡像實例"""
+    global _mirror
+    path = get_cache_dir() / "nvd.sqlite3"
+    if _mirror is None or _mirror.path != path:
+        _mirror = NvdMirror(path)
+    return _mirror
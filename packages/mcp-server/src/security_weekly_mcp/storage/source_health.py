@@ -0,0 +1,202 @@
+"""來源健康狀態
+
+記錄每個來源的回應時間與成功/失敗次數（跨執行保存），提供：
+- 依觀測到的 p95 延遲計算各來源的逾時時間
+- 斷路器：連續失敗達門檻後暫停抓取，冷卻時間過後只放行一個試探請求（半開）
+"""
+
+import json
+import math
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .files import atomic_write_text, get_cache_dir
+
+# 預設逾時（秒），樣本不足時使用
+DEFAULT_TIMEOUT = 30.0
+# 自適應逾時上下限（秒）
+MIN_TIMEOUT = 5.0
+MAX_TIMEOUT = 30.0
+# 逾時 = p95 × 倍數
+TIMEOUT_MULTIPLIER = 3.0
+# 計算 p95 所需的最少成功樣本數
+MIN_SAMPLES = 5
+# 每個來源保留的延遲樣本數
+MAX_SAMPLES = 50
+
+# 連續失敗幾次後斷路
+FAILURE_THRESHOLD = 3
+# 冷卻時間（秒），每次重新斷路加倍，最長 MAX_COOLDOWN
+BASE_COOLDOWN = 15 * 60
+MAX_COOLDOWN = 6 * 60 * 60
+# 半開試探請求的佔用時限（秒），逾時未回報結果（如遭取消）即可再放行下一個
+PROBE_TIMEOUT = 2 * MAX_TIMEOUT
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    """最近秩法百分位數"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class SourceHealth:
+    """來源健康狀態儲存"""
+
+    def __init__(self, path: Path, clock: Callable[[], float] = time.time):
+        """初始化健康狀態儲存
+
+        Args:
+            path: JSON 檔案路徑
+            clock: 時間來源（可替換以便測試）
+        """
+        self.path = path
+        self.clock = clock
+        self._data: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                self._data = {}
+        return self._data
+
+    def _stats(self, source: str) -> dict:
+        return self._load().setdefault(
+            source,
+            {
+                "latencies_ms": [],
+                "successes": 0,
+                "failures": 0,
+                "consecutive_failures": 0,
+                "trips": 0,
+                "open_until": None,
+                "probe_started": None,
+                "last_error": None,
+                "last_success": None,
+                "last_failure": None,
+            },
+        )
+
+    def timeout_for(self, source: str) -> float:
+        """依 p95 延遲計算逾時（秒）"""
+        stats = self._load().get(source)
+        if not stats or len(stats["latencies_ms"]) < MIN_SAMPLES:
+            return DEFAULT_TIMEOUT
+        p95 = _percentile(stats["latencies_ms"], 95) / 1000
+        return round(min(MAX_TIMEOUT, max(MIN_TIMEOUT, p95 * TIMEOUT_MULTIPLIER)), 1)
+
+    def _is_open(self, stats: dict) -> bool:
+        """斷路中（冷卻未結束，或冷卻結束但已有試探請求進行中）"""
+        if stats["open_until"] is None:
+            return False
+        now = self.clock()
+        if now < stats["open_until"]:
+            return True
+        probe_started = stats.get("probe_started")
+        return probe_started is not None and now < probe_started + PROBE_TIMEOUT
+
+    def allow(self, source: str) -> bool:
+        """斷路器是否允許抓取
+
+        冷卻結束後進入半開狀態：只放行第一個呼叫者作為試探請求，
+        其他呼叫者在試探請求回報成功或失敗前一律拒絕。
+        """
+        stats = self._load().get(source)
+        if not stats or stats["open_until"] is None:
+            return True
+        if self._is_open(stats):
+            return False
+        stats["probe_started"] = self.clock()
+        return True
+
+    def retry_after(self, source: str) -> float:
+        """距離斷路器冷卻結束（或進行中的試探請求逾時）的秒數"""
+        stats = self._load().get(source)
+        if not stats or stats["open_until"] is None:
+            return 0.0
+        until = stats["open_until"]
+        if stats.get("probe_started") is not None:
+            until = max(until, stats["probe_started"] + PROBE_TIMEOUT)
+        return max(0.0, round(until - self.clock(), 1))
+
+    def record_success(self, source: str, elapsed_ms: float | None):
+        """記錄成功抓取並關閉斷路器
+
+        Args:
+            elapsed_ms: 完整下載回應內容的耗時；304 或提前停止等未下載完整內容者傳入 None，
+                不列入延遲樣本，以免壓低 p95 而讓完整下載逾時
+        """
+        stats = self._stats(source)
+        if elapsed_ms is not None:
+            stats["latencies_ms"] = (stats["latencies_ms"] + [round(elapsed_ms)])[-MAX_SAMPLES:]
+        stats["successes"] += 1
+        stats["consecutive_failures"] = 0
+        stats["trips"] = 0
+        stats["open_until"] = None
+        stats["probe_started"] = None
+        stats["last_success"] = self.clock()
+
+    def record_failure(self, source: str, error: str):
+        """記錄失敗；連續失敗達門檻（或試探請求失敗）時斷路"""
+        stats = self._stats(source)
+        stats["failures"] += 1
+        stats["consecutive_failures"] += 1
+        stats["last_error"] = error
+        stats["last_failure"] = self.clock()
+        stats["probe_started"] = None
+        if stats["consecutive_failures"] >= FAILURE_THRESHOLD:
+            stats["trips"] += 1
+            cooldown = min(MAX_COOLDOWN, BASE_COOLDOWN * 2 ** (stats["trips"] - 1))
+            stats["open_until"] = self.clock() + cooldown
+
+    def summary(self, source: str) -> dict | None:
+        """來源健康摘要（無紀錄時回傳 None）"""
+        stats = self._load().get(source)
+        if not stats:
+            return None
+
+        latencies = stats["latencies_ms"]
+        total = stats["successes"] + stats["failures"]
+        if self._is_open(stats):
+            state = "open"
+        elif stats["consecutive_failures"]:
+            state = "degraded"
+        else:
+            state = "healthy"
+
+        result = {
+            "state": state,
+            "success_rate": round(stats["successes"] / total, 3) if total else None,
+            "p50_ms": _percentile(latencies, 50) if latencies else None,
+            "p95_ms": _percentile(latencies, 95) if latencies else None,
+            "timeout_s": self.timeout_for(source),
+            "consecutive_failures": stats["consecutive_failures"],
+            "last_error": stats["last_error"],
+        }
+        if state == "open":
+            result["retry_after_s"] = self.retry_after(source)
+        return result
+
+    def sources(self) -> list[str]:
+        """有健康紀錄的來源名稱"""
+        return sorted(self._load())
+
+    def save(self):
+        """寫入磁碟"""
+        atomic_write_text(self.path, json.dumps(self._load(), ensure_ascii=False, indent=2))
+
+
+# 健康狀態儲存（單例快取，快取目錄變更時重建）
+_health: SourceHealth | None = None
+
+
+def get_source_health() -> SourceHealth:
+    """取得來源健康狀態儲存實例"""
+    global _health
+    path = get_cache_dir() / "source_health.json"
+    if _health is None or _health.path != path:
+        _health = SourceHealth(path)
+    return _health
@@ -0,0 +1,110 @@
+"""來源收集水位（watermark）
+
+記錄每個來源上次收集到的最新文章（GUID 與發布時間），
+讓排程收集可以只處理上次之後的新文章。
+
+水位只推進到實際回傳的文章；以關鍵字、天數或期間過濾時被略過的文章，
+對其他過濾條件而言可能仍是新文章，因此每組過濾條件各自保存水位（見 watermark_key）。
+"""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+from .files import atomic_write_text, get_cache_dir
+
+# fetch_security_news 的預設回顧天數（預設條件的水位鍵即為來源名稱）
+DEFAULT_DAYS = 7
+
+
+def watermark_key(
+    source: str,
+    days: int = DEFAULT_DAYS,
+    keywords: list[str] | None = None,
+    period: tuple[date, date] | None = None,
+) -> str:
+    """水位鍵：來源名稱加上過濾條件
+
+    預設條件（DEFAULT_DAYS 天、無關鍵字、無期間）直接使用來源名稱；
+    指定期間時以期間取代天數（天數由期間開始日回推，每天都會變動）。
+    """
+    scope = []
+    if period is not None:
+        scope.append(f"period={period[0].isoformat()}..{period[1].isoformat()}")
+    elif days != DEFAULT_DAYS:
+        scope.append(f"days={days}")
+    if keywords:
+        scope.append("keywords=" + ",".join(sorted({k.casefold() for k in keywords})))
+    return f"{source}?{'&'.join(scope)}" if scope else source
+
+
+class WatermarkStore:
+    """來源水位儲存"""
+
+    def __init__(self, path: Path):
+        """初始化水位儲存
+
+        Args:
+            path: JSON 檔案路徑
+        """
+        self.path = path
+        self._data: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                self._data = {}
+        return self._data
+
+    def get(self, source: str) -> dict | None:
+        """取得來源水位（last_guid、last_published、updated_at）
+
+        Args:
+            source: 水位鍵（來源名稱，或 watermark_key 加上過濾條件的鍵）
+        """
+        return self._load().get(source)
+
+    def advance(self, source: str, articles: list[dict]) -> bool:
+        """以本次回傳的文章推進水位（不寫檔，需呼叫 save）
+
+        Args:
+            source: 水位鍵（需與讀取水位時相同的過濾條件）
+            articles: 本次回傳的文章；水位推進到其中最新的一則
+
+        Returns:
+            水位是否變更
+        """
+        candidates = [a for a in articles if "error" not in a]
+        if not candidates:
+            return False
+        newest = max(candidates, key=lambda a: a.get("published") or "")
+        previous = self.get(source) or {}
+        last_published = newest.get("published") or previous.get("last_published")
+        if previous and (previous.get("last_published") or "") > (last_published or ""):
+            return False
+
+        self._load()[source] = {
+            "last_guid": newest.get("guid") or newest.get("link"),
+            "last_published": last_published,
+            "updated_at": datetime.now().isoformat(),
+        }
+        return True
+
+    def save(self):
+        """寫入磁碟"""
+        atomic_write_text(self.path, json.dumps(self._load(), ensure_ascii=False, indent=2))
+
+
+# 水位儲存（單例快取，快取目錄變更時重建）
+_store: WatermarkStore | None = None
+
+
+def get_watermark_store() -> WatermarkStore:
+    """取得水位儲存實例"""
+    global _store
+    path = get_cache_dir() / "watermarks.json"
+    if _store is None or _store.path != path:
+        _store = WatermarkStore(path)
+    return _store
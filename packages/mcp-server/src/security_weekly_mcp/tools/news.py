@@ -1,17 +1,85 @@
 """新聞收集 MCP 工具"""
 
+import asyncio
+import functools
 import json
-from datetime import datetime, timedelta
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any
 
-import feedparser
 import httpx
 from mcp.types import TextContent, Tool
 
+from ..collectors import background, providers, weekly
+from ..collectors.dedup import collapse_duplicates
+from ..collectors.feeds import (
+    filter_entries,
+    parse_and_filter,
+    run_in_parse_pool,
+    stream_entries,
+)
+from ..collectors.ghsa import fetch_advisories
+from ..collectors.nvd import NvdClient, iter_normalized, normalize_cve, severities_for
+from ..config import (
+    ConfigFile,
+    SearchTemplates,
+    SourceIndex,
+    SourcesConfig,
+    build_search_templates,
+    build_sources_config,
+)
+from ..http_client import get_http_client
+from ..progress import report_progress
+from ..storage.article_archive import (
+    DEFAULT_ARTICLE_LIMIT,
+    MAX_ARTICLE_LIMIT,
+    get_article_archive,
+)
+from ..storage.feed_cache import body_digest, get_api_cache, get_feed_cache
+from ..storage.files import get_raw_dir
+from ..storage.kev_mirror import get_kev_mirror
+from ..storage.manifest import get_manifest
+from ..storage.nvd_mirror import (
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    get_nvd_mirror,
+    normalize_cve_id,
+)
+from ..storage.source_health import DEFAULT_TIMEOUT, get_source_health
+from ..storage.watermarks import get_watermark_store, watermark_key
+
 # 配置檔案路徑
 CONFIG_DIR = Path(__file__).parent.parent.parent.parent.parent.parent / "config"
 
+# fetch_vulnerabilities 預設整體時限（秒）
+VULN_DEADLINE = 120.0
+
+# get_cve 單次查詢上限與鏡像缺漏時的線上查詢上限
+MAX_CVE_LOOKUP = 1000
+MAX_LIVE_LOOKUPS = 10
+
+# suggest_searches 結果快取筆數
+SUGGESTION_CACHE_SIZE = 256
+
+# load_weekly_data 改為分頁 JSON 的參數
+PAGE_ARGUMENTS = ("sections", "sources", "fields", "offset", "limit")
+
+# 指定收集期間的參數（提供時取代 days，先依期間篩選再套用 limit）
+PERIOD_PROPERTIES = {
+    "period_start": {
+        "type": "string",
+        "description": "收集期間開始日期（YYYY-MM-DD，需與 period_end 同時提供，取代 days）",
+    },
+    "period_end": {
+        "type": "string",
+        "description": "收集期間結束日期（YYYY-MM-DD，含當日）",
+    },
+}
+
 
 async def list_tools() -> list[Tool]:
     """列出新聞收集相關工具"""
@@ -25,25 +93,53 @@ async def list_tools() -> list[Tool]:
                     "sources": {
                         "type": "array",
                         "items": {"type": "string"},
-                        "description": "來源名稱列表（如 thehackernews, bleepingcomputer, ithome）。留空則使用所有來源。",
+                        "description": (
+                            "來源名稱或別名列表（如 thehackernews, ithome），"
+                            "也可使用 category:advisory、language:zh-TW 等選擇器"
+                            "（逗號串接表示同時符合）。留空則使用所有來源。"
+                        ),
                     },
                     "days": {"type": "integer", "description": "回顧天數", "default": 7},
                     "keywords": {
                         "type": "array",
                         "items": {"type": "string"},
-                        "description": "關鍵字過濾（符合任一即可）",
+                        "description": "關鍵字過濾（符合任一即可，結果附上 matched_keywords）",
                     },
                     "limit": {
                         "type": "integer",
                         "description": "每個來源的最大文章數",
                         "default": 10,
                     },
+                    "dedup": {
+                        "type": "boolean",
+                        "description": "合併跨來源的重複文章（代表文章附上 alternates）",
+                        "default": True,
+                    },
+                    "since_last_run": {
+                        "type": "boolean",
+                        "description": (
+                            "增量模式：只回傳各來源上次收集之後的新文章（仍受 days 與 limit 限制）。"
+                            "每組 days / keywords / 期間各自保存水位。新文章多於 limit 時回傳緊接水位之後、"
+                            "最舊的 limit 則，較新的留待下次呼叫；回傳數等於 limit 的來源可能仍有新文章"
+                        ),
+                        "default": False,
+                    },
+                    "deadline": {
+                        "type": "number",
+                        "description": "整體收集時限（秒），逾時回傳已完成的來源，未完成者列於 _pending",
+                    },
+                    "force_refresh": {
+                        "type": "boolean",
+                        "description": "忽略背景收集器的本地資料，直接連線抓取",
+                        "default": False,
+                    },
+                    **PERIOD_PROPERTIES,
                 },
             },
         ),
         Tool(
             name="fetch_vulnerabilities",
-            description="收集近期高風險漏洞（NVD + CISA KEV）",
+            description="收集近期高風險漏洞（NVD + CISA KEV + GitHub Security Advisories，並行收集）",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -54,15 +150,145 @@ async def list_tools() -> list[Tool]:
                         "description": "是否包含 CISA KEV（已知被利用漏洞）",
                         "default": True,
                     },
+                    "include_ghsa": {
+                        "type": "boolean",
+                        "description": "是否包含 GitHub Security Advisories",
+                        "default": True,
+                    },
                     "limit": {"type": "integer", "description": "最大回傳數量", "default": 20},
+                    "deadline": {
+                        "type": "number",
+                        "description": "整體收集時限（秒），逾時回傳已完成的部分結果",
+                        "default": VULN_DEADLINE,
+                    },
+                    "force_refresh": {
+                        "type": "boolean",
+                        "description": "強制重新下載 CISA KEV 目錄（預設僅在鏡像過期時更新）",
+                        "default": False,
+                    },
+                    **PERIOD_PROPERTIES,
+                },
+            },
+        ),
+        Tool(
+            name="get_cve",
+            description=(
+                "由本地 NVD 鏡像查詢 CVE 詳細資料（可一次查詢多筆，離線可用）。"
+                "鏡像以 scripts/sync_nvd_mirror.py 建立並增量同步"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cve_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": f"CVE ID 列表（最多 {MAX_CVE_LOOKUP} 筆）",
+                    },
+                    "fetch_missing": {
+                        "type": "boolean",
+                        "description": (
+                            f"鏡像中沒有的 CVE 改向 NVD API 查詢並寫入鏡像（最多 {MAX_LIVE_LOOKUPS} 筆）"
+                        ),
+                        "default": False,
+                    },
+                },
+                "required": ["cve_ids"],
+            },
+        ),
+        Tool(
+            name="search_cves",
+            description=(
+                "依廠商（與產品）查詢本地 NVD 鏡像中的 CVE，可限定 CVSS 與發布日期，"
+                "例如 Fortinet 本季 CVSS ≥ 9.0 的漏洞"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "vendor": {
+                        "type": "string",
+                        "description": "廠商名稱（如 Fortinet、Palo Alto Networks）",
+                    },
+                    "product": {
+                        "type": "string",
+                        "description": "產品名稱（如 FortiOS，可選）",
+                    },
+                    "min_cvss": {
+                        "type": "number",
+                        "description": "最低 CVSS 分數",
+                        "default": 0.0,
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "發布日期下限（YYYY-MM-DD，可選）",
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "發布日期上限（YYYY-MM-DD，可選）",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"最多回傳筆數（上限 {MAX_SEARCH_LIMIT}）",
+                        "default": DEFAULT_SEARCH_LIMIT,
+                    },
+                },
+                "required": ["vendor"],
+            },
+        ),
+        Tool(
+            name="search_articles",
+            description="全文搜尋已收集的歷史文章（本地封存，不需重新抓取）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "搜尋關鍵字，多個詞以空白分隔（皆須符合），片語以雙引號包住",
+                    },
+                    "days": {"type": "integer", "description": "只搜尋最近 N 天的文章"},
+                    "sources": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "限定來源名稱",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"最大回傳數量（最多 {MAX_ARTICLE_LIMIT}）",
+                        "default": DEFAULT_ARTICLE_LIMIT,
+                    },
+                    "sort": {
+                        "type": "string",
+                        "enum": ["date", "relevance"],
+                        "description": "排序方式（date：新到舊，relevance：相關度）",
+                        "default": "date",
+                    },
                 },
+                "required": ["query"],
             },
         ),
         Tool(
             name="list_news_sources",
-            description="列出可用的新聞來源",
+            description="列出可用的新聞來源（含健康狀態）",
             inputSchema={"type": "object", "properties": {}},
         ),
+        Tool(
+            name="get_source_health",
+            description="查詢 RSS 來源健康狀態（延遲 p50/p95、成功率、自適應逾時、斷路器狀態）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "sources": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "來源名稱列表，留空則列出所有有紀錄的來源",
+                    },
+                    "unhealthy_only": {
+                        "type": "boolean",
+                        "description": "只列出非 healthy 的來源",
+                        "default": False,
+                    },
+                },
+            },
+        ),
         Tool(
             name="suggest_searches",
             description="產生 WebSearch/WebFetch 搜尋建議，用於補充 RSS 無法取得的資安新聞。支援歷史時間範圍搜尋。",
@@ -104,14 +330,50 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="load_weekly_data",
-            description="載入已保存的週報原始資料（由 GitHub Actions 每週自動收集）",
+            description=(
+                "載入已保存的週報原始資料（由 GitHub Actions 每週自動收集）。"
+                "指定 sections / sources / fields / offset / limit 時改為分頁 JSON，"
+                "以回傳的 next_cursor 取得下一頁"
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
                     "week": {
                         "type": "string",
                         "description": "週數（格式：YYYY-WNN，如 2026-W07）。留空則載入最新一週。",
-                    }
+                    },
+                    "sections": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(weekly.CONTENT_KEYS)},
+                        "description": "只載入指定區塊",
+                    },
+                    "sources": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": (
+                            "只載入指定新聞來源或漏洞類型（nvd、kev、ghsa），"
+                            "來源名稱比對方式同 fetch_security_news"
+                        ),
+                    },
+                    "fields": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "文章 / 漏洞只保留的欄位（如 title、link、cve_id）",
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "略過的項目數",
+                        "default": 0,
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"每頁項目數（最多 {weekly.MAX_PAGE_SIZE}）",
+                        "default": weekly.DEFAULT_PAGE_SIZE,
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "上一頁回傳的 next_cursor（沿用當時的篩選條件）",
+                    },
                 },
             },
         ),
@@ -120,81 +382,164 @@ async def list_tools() -> list[Tool]:
             description="列出所有已保存的週報原始資料",
             inputSchema={"type": "object", "properties": {}},
         ),
+        Tool(
+            name="collect_weekly_data",
+            description="並行收集一週的新聞、漏洞與搜尋建議，寫入 output/raw/YYYY-WNN.json（重複執行會合併既有資料）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "week": {
+                        "type": "string",
+                        "description": "週數（格式：YYYY-WNN）。留空則為昨天所屬的週。",
+                    },
+                    "min_cvss": {"type": "number", "description": "最低 CVSS 分數", "default": 7.0},
+                    "limit": {
+                        "type": "integer",
+                        "description": "每個新聞來源及每個漏洞來源的最大數量",
+                        "default": 50,
+                    },
+                },
+            },
+        ),
     ]
 
 
-# 設定檔快取
-_sources_cache = None
-_templates_cache = None
-
-
-def _load_sources_config() -> dict:
-    """載入來源設定（快取）"""
-    global _sources_cache
-    if _sources_cache is None:
-        import yaml
+# 設定檔（檔案變更時自動重新載入）
+_sources_file: ConfigFile | None = None
+_templates_file: ConfigFile | None = None
 
-        sources_file = CONFIG_DIR / "sources.yaml"
-        if sources_file.exists():
-            _sources_cache = yaml.safe_load(sources_file.read_text(encoding="utf-8"))
-        else:
-            _sources_cache = {"sources": []}
-    return _sources_cache
 
+def _load_sources_config() -> SourcesConfig:
+    """載入來源設定（sources.yaml 變更時重新載入）"""
+    global _sources_file
+    path = CONFIG_DIR / "sources.yaml"
+    if _sources_file is None or _sources_file.path != path:
+        _sources_file = ConfigFile(path, build_sources_config)
+    return _sources_file.get()
 
-def _load_search_templates() -> dict:
-    """載入搜尋模板設定（快取）"""
-    global _templates_cache
-    if _templates_cache is None:
-        import yaml
 
-        templates_file = CONFIG_DIR / "search_templates.yaml"
-        if templates_file.exists():
-            _templates_cache = yaml.safe_load(templates_file.read_text(encoding="utf-8"))
-        else:
-            _templates_cache = {}
-    return _templates_cache
+def _load_search_templates() -> SearchTemplates:
+    """載入搜尋模板設定（search_templates.yaml 變更時重新載入）"""
+    global _templates_file
+    path = CONFIG_DIR / "search_templates.yaml"
+    if _templates_file is None or _templates_file.path != path:
+        _templates_file = ConfigFile(path, build_search_templates)
+    return _templates_file.get()
 
 
 def reset_config_cache():
     """重設設定檔快取（用於測試）"""
-    global _sources_cache, _templates_cache
-    _sources_cache = None
-    _templates_cache = None
-
-
-def _normalize_source_name(name: str) -> str:
-    """標準化來源名稱以便比對"""
-    return name.lower().replace(" ", "").replace("_", "").replace("-", "")
+    global _sources_file, _templates_file
+    _sources_file = None
+    _templates_file = None
+    _render_suggestions.cache_clear()
+
+
+def _parse_period(arguments: dict[str, Any]) -> tuple[date, date] | None:
+    """解析 period_start / period_end（未提供時回傳 None）
+
+    Raises:
+        ValueError: 只提供其中一個、日期格式錯誤或開始晚於結束
+    """
+    start, end = arguments.get("period_start"), arguments.get("period_end")
+    if not start and not end:
+        return None
+    if not (start and end):
+        raise ValueError("period_start 與 period_end 需同時提供")
+    try:
+        period = date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError as e:
+        raise ValueError("日期格式錯誤，請使用 YYYY-MM-DD") from e
+    if period[0] > period[1]:
+        raise ValueError("period_start 不可晚於 period_end")
+    return period
 
 
-def _match_source(query: str, sources: list[dict]) -> list[dict]:
-    """根據查詢字串比對來源"""
-    query_normalized = _normalize_source_name(query)
-    matched = []
-    for source in sources:
-        source_normalized = _normalize_source_name(source["name"])
-        if query_normalized in source_normalized or source_normalized in query_normalized:
-            matched.append(source)
-    return matched
+def _period_bounds(period: tuple[date, date]) -> tuple[datetime, datetime, int]:
+    """期間的起訖時間（開始日 00:00 至結束日 23:59:59）與自今日回推的天數"""
+    start = datetime(period[0].year, period[0].month, period[0].day)
+    end = datetime(period[1].year, period[1].month, period[1].day, 23, 59, 59)
+    return start, end, max(1, (date.today() - period[0]).days + 1)
 
 
 async def _fetch_rss(
-    url: str, days: int, limit: int, keywords: list[str] | None = None
+    url: str,
+    days: int,
+    limit: int,
+    keywords: list[str] | None = None,
+    stream: bool = False,
+    watermark: dict | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    until: datetime | None = None,
+    fetch_info: dict | None = None,
 ) -> list[dict]:
-    """從 RSS 來源抓取文章"""
+    """從 RSS 來源抓取文章（使用 ETag / Last-Modified 條件式請求快取）
+
+    Args:
+        stream: 串流解析模式，取得足夠文章或超過回顧天數即停止下載（適用於大型公告 feed；
+            提供 watermark 時不提前停止）
+        watermark: 來源水位，提供時只回傳比水位更新的文章
+        timeout: 整體下載時限（秒）
+        until: 發布時間上限，晚於此時間的文章不列入（提供時不提前停止串流）
+        fetch_info: 提供時寫入 full_body（是否下載了完整回應內容；304 與提前停止者為 False）
+    """
+    if fetch_info is not None:
+        fetch_info["full_body"] = False
     # 設定 User-Agent 以避免被某些網站封鎖 (如 BleepingComputer)
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "application/rss+xml, application/xml, text/xml, */*",
     }
+    # 水位模式需讀到水位為止，不提前停止，以免截斷時漏掉水位之後的文章
+    early_stop = stream and watermark is None and until is None
+    cache = get_feed_cache()
+    cached = cache.get(url)
+    covered = cached.get("partial") if cached else None
+    if covered and not (early_stop and days <= covered["days"] and limit <= covered["limit"]):
+        # 提前停止時保存的文章不足以回應本次請求，不送出條件式請求
+        cached = None
+    headers.update(cache.conditional_headers(cached))
+
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=headers, follow_redirects=True)
+        client = get_http_client()
+        async with (
+            asyncio.timeout(timeout),
+            client.stream("GET", url, headers=headers, timeout=timeout) as response,
+        ):
+            if response.status_code == 304 and cached is not None:
+                # 內容未變更，沿用已解析的文章
+                cache.touch(cached)
+                return filter_entries(cached["entries"], days, limit, keywords, watermark, until)
+
             response.raise_for_status()
-            feed = feedparser.parse(response.text)
-    except httpx.TimeoutException:
-        return [{"error": "RSS 抓取超時 (30s)"}]
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            if early_stop:
+                partial, body = await stream_entries(response.aiter_bytes(), days, limit)
+                if partial is not None:
+                    # 已取得足夠文章，不下載剩餘內容；只保存驗證標頭與這批文章，
+                    # 下次條件相同或較小的請求仍可收到 304
+                    cache.put_partial(url, partial, days, limit, **validators)
+                    return filter_entries(partial, days, limit, keywords, watermark, until)
+            else:
+                body = await response.aread()
+        if fetch_info is not None:
+            fetch_info["full_body"] = True
+
+        if cached is not None and cached.get("body_sha256") == body_digest(body):
+            # 伺服器不支援條件式請求，但內容相同，免重新解析也不重寫原文
+            articles = filter_entries(cached["entries"], days, limit, keywords, watermark, until)
+            cache.touch(cached, validators)
+        else:
+            # 解析與過濾交給工作池，避免阻塞事件迴圈
+            entries, articles = await run_in_parse_pool(
+                parse_and_filter, body, days, limit, keywords, watermark, until
+            )
+            cache.put(url, body, entries, **validators)
+    except (httpx.TimeoutException, TimeoutError):
+        return [{"error": f"RSS 抓取超時 ({timeout:g}s)"}]
     except httpx.HTTPStatusError as e:
         return [{"error": f"HTTP {e.response.status_code}: {e.response.reason_phrase}"}]
     except httpx.RequestError as e:
@@ -202,65 +547,97 @@ async def _fetch_rss(
     except Exception as e:
         return [{"error": f"無法抓取 RSS: {e}"}]
 
-    cutoff_date = datetime.now() - timedelta(days=days)
-    articles = []
+    return articles
 
-    for entry in feed.entries[: limit * 2]:  # 抓多一點再過濾
-        # 解析發布時間
-        published = None
-        if hasattr(entry, "published_parsed") and entry.published_parsed:
-            published = datetime(*entry.published_parsed[:6])
-        elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-            published = datetime(*entry.updated_parsed[:6])
 
-        # 時間過濾
-        if published and published < cutoff_date:
-            continue
-
-        # 關鍵字過濾
-        if keywords:
-            title = entry.get("title", "").lower()
-            summary = entry.get("summary", "").lower()
-            content = title + " " + summary
-            if not any(kw.lower() in content for kw in keywords):
-                continue
+async def _fetch_tracked(
+    source: dict,
+    days: int,
+    limit: int,
+    keywords: list[str] | None = None,
+    stream: bool = False,
+    watermark: dict | None = None,
+    until: datetime | None = None,
+) -> list[dict]:
+    """抓取 RSS 來源，並以來源健康狀態決定逾時及記錄結果
+
+    只有下載完整回應內容的抓取列入延遲樣本（304 與串流提前停止者不計）。
+    """
+    health = get_source_health()
+    source_name = source.get("name", "Unknown")
+    fetch_info: dict = {}
+    started = time.perf_counter()
+    articles = await _fetch_rss(
+        source.get("url", ""),
+        days,
+        limit,
+        keywords,
+        stream=stream,
+        watermark=watermark,
+        timeout=health.timeout_for(source_name),
+        until=until,
+        fetch_info=fetch_info,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    errors = [a["error"] for a in articles if "error" in a]
+    if errors:
+        health.record_failure(source_name, errors[0])
+    else:
+        health.record_success(source_name, elapsed_ms if fetch_info["full_body"] else None)
+    return articles
 
-        articles.append(
-            {
-                "title": entry.get("title", ""),
-                "link": entry.get("link", ""),
-                "published": published.isoformat() if published else None,
-                "summary": entry.get("summary", "")[:500],  # 摘要截斷
-            }
-        )
 
-        if len(articles) >= limit:
-            break
+async def _refresh_source(source: dict) -> list[dict] | None:
+    """背景收集器用：抓取來源並回傳 Feed 快取中解析後的全部文章"""
+    url = source.get("url", "")
+    if not url or not get_source_health().allow(source.get("name")):
+        return None
+    # 只為更新 Feed 快取（不使用串流模式，以取得完整內容）
+    articles = await _fetch_tracked(source, 1, 1)
+    get_source_health().save()
+    if any("error" in a for a in articles):
+        return None
+    cached = get_feed_cache().get(url)
+    return cached["entries"] if cached else None
 
-    return articles
 
+def start_background_collector() -> background.BackgroundCollector:
+    """啟動背景收集器，輪詢所有啟用中的 RSS 來源（需在事件迴圈中呼叫）
 
-async def _fetch_nvd(min_cvss: float, days: int, limit: int) -> list[dict]:
-    """從 NVD 抓取漏洞資料"""
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+    每次排程時重新讀取 sources.yaml（檔案未變更時只需一次 stat）。
+    """
+    return background.start_background_collector(
+        lambda: _load_sources_config().rss_sources, _refresh_source
+    )
 
-    params = {
-        "pubStartDate": start_date.strftime("%Y-%m-%dT00:00:00.000"),
-        "pubEndDate": end_date.strftime("%Y-%m-%dT23:59:59.999"),
-        "cvssV3Severity": "HIGH" if min_cvss >= 7.0 else "MEDIUM",
-        "resultsPerPage": min(limit, 50),
-    }
 
+async def _fetch_nvd(
+    min_cvss: float, days: int, limit: int, period: tuple[date, date] | None = None
+) -> list[dict]:
+    """從 NVD 抓取漏洞資料（分頁並行抓取，依 CVSS 由高至低取前 limit 筆）
+
+    提供 period 時以期間的 pubStartDate / pubEndDate 查詢，取代 days。
+    """
+    if period is not None:
+        start_date, end_date, _ = _period_bounds(period)
+    else:
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+
+    vulnerabilities = {}
+    fetched = []
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.get(
-                "https://services.nvd.nist.gov/rest/json/cves/2.0",
-                params=params,
-                headers={"Accept": "application/json"},
-            )
-            response.raise_for_status()
-            data = response.json()
+        nvd = NvdClient(get_http_client())
+        items = nvd.iter_cves(
+            start_date.replace(hour=0, minute=0, second=0, microsecond=0),
+            end_date.replace(hour=23, minute=59, second=59, microsecond=0),
+            severities=severities_for(min_cvss),
+        )
+        async for batch in iter_normalized(items):
+            fetched.extend(batch)
+            for vuln in batch:
+                if vuln["cvss"] >= min_cvss:
+                    vulnerabilities[vuln["cve_id"]] = vuln
     except httpx.TimeoutException:
         return [{"error": "NVD API 超時 (60s)"}]
     except httpx.HTTPStatusError as e:
@@ -272,111 +649,265 @@ async def _fetch_nvd(min_cvss: float, days: int, limit: int) -> list[dict]:
     except Exception as e:
         return [{"error": f"NVD API 錯誤: {e}"}]
 
-    vulnerabilities = []
-    for item in data.get("vulnerabilities", []):
-        cve = item.get("cve", {})
-        cve_id = cve.get("id", "")
-
-        # 取得 CVSS 分數
-        cvss_score = 0.0
-        cvss_vector = ""
-        metrics = cve.get("metrics", {})
-        if "cvssMetricV31" in metrics:
-            cvss_data = metrics["cvssMetricV31"][0].get("cvssData", {})
-            cvss_score = cvss_data.get("baseScore", 0.0)
-            cvss_vector = cvss_data.get("vectorString", "")
-        elif "cvssMetricV30" in metrics:
-            cvss_data = metrics["cvssMetricV30"][0].get("cvssData", {})
-            cvss_score = cvss_data.get("baseScore", 0.0)
-            cvss_vector = cvss_data.get("vectorString", "")
-
-        if cvss_score < min_cvss:
-            continue
+    # 順帶寫入本地鏡像（寫入失敗不影響結果）
+    try:
+        await asyncio.to_thread(get_nvd_mirror().upsert, fetched)
+    except sqlite3.Error:
+        pass
 
-        # 取得描述
-        descriptions = cve.get("descriptions", [])
-        description = ""
-        for desc in descriptions:
-            if desc.get("lang") == "en":
-                description = desc.get("value", "")
-                break
+    ranked = sorted(
+        vulnerabilities.values(), key=lambda v: (v["cvss"], v["published"]), reverse=True
+    )
+    return ranked[:limit]
 
-        vulnerabilities.append(
-            {
-                "cve_id": cve_id,
-                "cvss": cvss_score,
-                "cvss_vector": cvss_vector,
-                "description": description[:500],
-                "published": cve.get("published", ""),
-                "url": f"https://nvd.nist.gov/vuln/detail/{cve_id}",
-            }
-        )
 
-    return vulnerabilities[:limit]
+def _archive_articles(all_articles: dict[str, list[dict]]) -> int:
+    """將各來源文章寫入本地封存（同步，於工作執行緒執行）
+
+    Returns:
+        實際新增或更新的文章數
+    """
+    archive = get_article_archive()
+    return sum(archive.add_articles(source, articles) for source, articles in all_articles.items())
 
 
-async def _fetch_cisa_kev(days: int, limit: int) -> list[dict]:
-    """從 CISA KEV 抓取已知被利用漏洞"""
+async def _lookup_live_cve(nvd: NvdClient, cve_id: str) -> dict | None:
+    """向 NVD API 查詢單一 CVE"""
+    page = await nvd.get_page({"cveId": cve_id}, 0)
+    items = page.get("vulnerabilities", [])
+    return normalize_cve(items[0]) if items else None
+
+
+async def get_cves(cve_ids: list[str], fetch_missing: bool = False) -> dict:
+    """由本地 NVD 鏡像查詢多個 CVE（依請求順序回傳）"""
+    normalized = {raw: normalize_cve_id(raw) for raw in cve_ids[:MAX_CVE_LOOKUP]}
+    invalid = [raw for raw, cve_id in normalized.items() if cve_id is None]
+    wanted = list(dict.fromkeys(cve_id for cve_id in normalized.values() if cve_id))
+
+    mirror = get_nvd_mirror()
+    found = await asyncio.to_thread(mirror.get_many, wanted)
+    missing = [cve_id for cve_id in wanted if cve_id not in found]
+
+    errors = {}
+    if fetch_missing and missing:
+        nvd = NvdClient(get_http_client())
+        lookups = missing[:MAX_LIVE_LOOKUPS]
+        outcomes = await asyncio.gather(
+            *(_lookup_live_cve(nvd, cve_id) for cve_id in lookups), return_exceptions=True
+        )
+        live = []
+        for cve_id, outcome in zip(lookups, outcomes):
+            if isinstance(outcome, Exception):
+                errors[cve_id] = f"{type(outcome).__name__}: {outcome}"
+            elif outcome is not None:
+                live.append(outcome)
+        await asyncio.to_thread(mirror.upsert, live)
+        found.update((v["cve_id"], v) for v in live)
+        missing = [cve_id for cve_id in missing if cve_id not in found]
+
+    kev_mirror = get_kev_mirror()
+    results = []
+    for cve_id in wanted:
+        if cve_id in found:
+            results.append({**found[cve_id], "in_kev": cve_id in kev_mirror})
+
+    status = await asyncio.to_thread(mirror.status)
+    response = {"results": results, "missing": missing, "mirror": status}
+    if invalid:
+        response["invalid"] = invalid
+    if errors:
+        response["errors"] = errors
+    if len(cve_ids) > MAX_CVE_LOOKUP:
+        response["truncated"] = len(cve_ids) - MAX_CVE_LOOKUP
+    return response
+
+
+def _format_kev_entry(vuln: dict) -> dict:
+    """將 KEV 目錄項目轉為工具輸出格式"""
+    cve_id = vuln.get("cveID", "")
+    return {
+        "cve_id": cve_id,
+        "vendor": vuln.get("vendorProject", ""),
+        "product": vuln.get("product", ""),
+        "name": vuln.get("vulnerabilityName", ""),
+        "description": vuln.get("shortDescription", ""),
+        "date_added": vuln.get("dateAdded", ""),
+        "due_date": vuln.get("dueDate", ""),
+        "in_kev": True,
+        "url": f"https://nvd.nist.gov/vuln/detail/{cve_id}",
+    }
+
+
+async def _fetch_cisa_kev(
+    days: int, limit: int, force_refresh: bool = False, period: tuple[date, date] | None = None
+) -> list[dict]:
+    """從 CISA KEV 本地鏡像取得已知被利用漏洞（鏡像過期時自動更新）
+
+    提供 period 時只取 dateAdded 落在期間內的項目，取代 days。
+    更新失敗但已有舊鏡像時沿用舊資料，並附上一筆 warning 紀錄
+    （含錯誤與鏡像的 refreshed_at），由 _run_providers 轉為提供者狀態 stale。
+    """
+    mirror = get_kev_mirror()
+    error = None
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                "https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json"
-            )
-            response.raise_for_status()
-            data = response.json()
+        await mirror.refresh(get_http_client(), force=force_refresh)
     except httpx.TimeoutException:
-        return [{"error": "CISA KEV 超時 (30s)"}]
+        error = "CISA KEV 超時 (30s)"
     except httpx.HTTPStatusError as e:
-        return [{"error": f"CISA KEV HTTP {e.response.status_code}"}]
+        error = f"CISA KEV HTTP {e.response.status_code}"
     except httpx.RequestError as e:
-        return [{"error": f"CISA KEV 網路錯誤: {type(e).__name__}"}]
+        error = f"CISA KEV 網路錯誤: {type(e).__name__}"
     except json.JSONDecodeError:
-        return [{"error": "CISA KEV 回傳非 JSON 格式"}]
+        error = "CISA KEV 回傳非 JSON 格式"
     except Exception as e:
-        return [{"error": f"CISA KEV API 錯誤: {e}"}]
-
-    cutoff_date = datetime.now() - timedelta(days=days)
-    vulnerabilities = []
+        error = f"CISA KEV API 錯誤: {e}"
+
+    if error and not len(mirror):
+        return [{"error": error}]
+
+    if period is not None:
+        # since 的起始日期不含當日
+        recent = mirror.since((period[0] - timedelta(days=1)).isoformat(), period[1].isoformat())
+    else:
+        cutoff_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        recent = mirror.since(cutoff_date)
+    entries = [_format_kev_entry(v) for v in reversed(recent[-limit:])]
+    if error:
+        # 更新失敗但已有舊鏡像時，沿用舊資料並標示資料時間
+        entries.append({"warning": error, "refreshed_at": mirror.meta.get("refreshed_at")})
+    return entries
+
+
+async def _fetch_ghsa(
+    min_cvss: float, days: int, limit: int, period: tuple[date, date] | None = None
+) -> list[dict]:
+    """從 GitHub Security Advisories 抓取漏洞資料（提供 period 時以期間查詢，取代 days）"""
+    if period is not None:
+        since, until, _ = _period_bounds(period)
+    else:
+        since, until = datetime.now() - timedelta(days=days), None
+    try:
+        vulnerabilities = await fetch_advisories(
+            get_http_client(), since, until=until, cache=get_api_cache()
+        )
+    except httpx.TimeoutException:
+        return [{"error": "GHSA API 超時 (30s)"}]
+    except httpx.HTTPStatusError as e:
+        return [{"error": f"GHSA API HTTP {e.response.status_code}"}]
+    except httpx.RequestError as e:
+        return [{"error": f"GHSA API 網路錯誤: {type(e).__name__}"}]
+    except json.JSONDecodeError:
+        return [{"error": "GHSA API 回傳非 JSON 格式"}]
+    except Exception as e:
+        return [{"error": f"GHSA API 錯誤: {e}"}]
 
-    for vuln in data.get("vulnerabilities", []):
-        # 解析加入日期
-        date_added = vuln.get("dateAdded", "")
-        try:
-            added_date = datetime.strptime(date_added, "%Y-%m-%d")
-            if added_date < cutoff_date:
-                continue
-        except ValueError:
-            continue
+    vulnerabilities = [v for v in vulnerabilities if v["cvss"] >= min_cvss]
+    vulnerabilities.sort(key=lambda v: (v["cvss"], v["published"]), reverse=True)
+    return vulnerabilities[:limit]
 
-        vulnerabilities.append(
-            {
-                "cve_id": vuln.get("cveID", ""),
-                "vendor": vuln.get("vendorProject", ""),
-                "product": vuln.get("product", ""),
-                "name": vuln.get("vulnerabilityName", ""),
-                "description": vuln.get("shortDescription", ""),
-                "date_added": date_added,
-                "due_date": vuln.get("dueDate", ""),
-                "in_kev": True,
-                "url": f"https://nvd.nist.gov/vuln/detail/{vuln.get('cveID', '')}",
-            }
-        )
 
-        if len(vulnerabilities) >= limit:
+# api 類型來源的漏洞提供者（依 sources.yaml 來源名稱對應）
+providers.register(
+    "nvd", "NVD", lambda q: _fetch_nvd(q["min_cvss"], q["days"], q["limit"], q.get("period"))
+)
+providers.register(
+    "kev",
+    "CISA KEV",
+    lambda q: _fetch_cisa_kev(q["days"], q["limit"], q["force_refresh"], q.get("period")),
+)
+providers.register(
+    "ghsa",
+    "GitHub Security Advisories",
+    lambda q: _fetch_ghsa(q["min_cvss"], q["days"], q["limit"], q.get("period")),
+)
+
+# GHSA 併入 NVD 同 CVE 紀錄時複製的欄位
+GHSA_JOIN_FIELDS = ("ghsa_id", "packages")
+
+
+async def _run_providers(
+    providers: dict[str, Callable[[], Awaitable[list[dict]]]], deadline: float | None
+) -> tuple[dict[str, list[dict]], dict[str, dict]]:
+    """並行執行多個資料提供者並合併結果
+
+    提供者依 dict 順序排程；每完成一個即送出 MCP 進度通知。
+    結果中帶 warning 的紀錄會移出結果，提供者狀態標記為 stale 並附上該紀錄的欄位。
+    回傳結果一律依排程順序排列（而非完成順序），以確保輸出穩定。
+    超過整體時限（None 表示不限）仍未完成的提供者會被取消並標記為 timeout。
+
+    Returns:
+        (各提供者結果, 各提供者的狀態、筆數與耗時)
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks = {asyncio.create_task(factory()): name for name, factory in providers.items()}
+    results: dict[str, list[dict]] = {}
+    meta: dict[str, dict] = {}
+
+    pending = set(tasks)
+    while pending:
+        remaining = None if deadline is None else deadline - (loop.time() - started)
+        if remaining is not None and remaining <= 0:
             break
-
-    return vulnerabilities
+        done, pending = await asyncio.wait(
+            pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            name = tasks[task]
+            elapsed_ms = round((loop.time() - started) * 1000)
+            if task.exception() is not None:
+                exc = task.exception()
+                results[name] = []
+                meta[name] = {
+                    "status": "error",
+                    "count": 0,
+                    "elapsed_ms": elapsed_ms,
+                    "error": f"{type(exc).__name__}: {exc}",
+                }
+                continue
+            items = task.result()
+            errors = [item["error"] for item in items if "error" in item]
+            # warning 紀錄（如沿用舊鏡像）不列入結果，改記錄在狀態中
+            warnings = [item for item in items if "warning" in item]
+            if warnings:
+                items = [item for item in items if "warning" not in item]
+            results[name] = items
+            meta[name] = {
+                "status": "error" if errors else "stale" if warnings else "ok",
+                "count": len(items) - len(errors),
+                "elapsed_ms": elapsed_ms,
+            }
+            if errors:
+                meta[name]["error"] = errors[0]
+            if warnings:
+                meta[name].update(warnings[0])
+
+        completed = len(meta) - len(done)
+        for task in done:
+            name = tasks[task]
+            completed += 1
+            await report_progress(completed, len(tasks), f"{name}: {meta[name]['status']}")
+
+    for task in pending:
+        task.cancel()
+        name = tasks[task]
+        results[name] = []
+        meta[name] = {"status": "timeout", "count": 0, "elapsed_ms": round(deadline * 1000)}
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    # 依排程順序輸出，相同輸入不因完成順序不同而產生不同結果
+    return (
+        {name: results[name] for name in providers},
+        {name: meta[name] for name in providers},
+    )
 
 
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     """執行新聞收集工具"""
 
     if name == "list_news_sources":
-        config = _load_sources_config()
-        sources = config.get("sources", [])
-
         result = []
-        for source in sources:
+        for source in _load_sources_config().sources:
             item = {
                 "name": source.get("name"),
                 "type": source.get("type"),
@@ -389,93 +920,344 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
                 item["status"] = source.get("status")
             if source.get("note"):
                 item["note"] = source.get("note")
+            health = get_source_health().summary(source.get("name"))
+            if health:
+                item["health"] = health
             result.append(item)
 
         return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
 
+    elif name == "get_source_health":
+        health = get_source_health()
+        requested_sources = arguments.get("sources", [])
+        unhealthy_only = arguments.get("unhealthy_only", False)
+
+        if requested_sources:
+            by_name = _load_sources_config().by_name
+            known = SourceIndex([by_name.get(n, {"name": n}) for n in health.sources()])
+            names = [s["name"] for s in known.resolve(requested_sources)]
+        else:
+            names = health.sources()
+
+        result = {}
+        for source_name in names:
+            summary = health.summary(source_name)
+            if summary and (not unhealthy_only or summary["state"] != "healthy"):
+                result[source_name] = summary
+
+        if not result:
+            return [TextContent(type="text", text="尚無符合的來源健康紀錄")]
+        return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+
     elif name == "fetch_security_news":
         config = _load_sources_config()
-        all_sources = config.get("sources", [])
         days = arguments.get("days", 7)
         limit = arguments.get("limit", 10)
         keywords = arguments.get("keywords")
         requested_sources = arguments.get("sources", [])
+        dedup = arguments.get("dedup", True)
+        since_last_run = arguments.get("since_last_run", False)
+        deadline = arguments.get("deadline")
+        force_refresh = arguments.get("force_refresh", False)
+        watermarks = get_watermark_store() if since_last_run else None
+        try:
+            period = _parse_period(arguments)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"❌ {e}")]
+        # 指定期間時回推到期間開始，並排除期間結束後的文章
+        until = None
+        if period is not None:
+            _, until, days = _period_bounds(period)
 
-        # 過濾 RSS 類型的來源（排除 disabled 的來源）
-        rss_sources = [
-            s for s in all_sources if s.get("type") == "rss" and s.get("status") != "disabled"
-        ]
+        # 啟用中的 RSS 來源（已依優先級排序）
+        rss_sources = config.rss_sources
 
         # 如果有指定來源，進行比對
         if requested_sources:
-            matched_sources = []
-            for query in requested_sources:
-                matched_sources.extend(_match_source(query, rss_sources))
-            rss_sources = matched_sources
+            matched_sources = config.rss_index.resolve(requested_sources)
+            # 依優先級排程，critical 來源最先發出請求
+            rss_sources = sorted(
+                matched_sources, key=lambda s: config.weights[s["name"]], reverse=True
+            )
 
         if not rss_sources:
             return [TextContent(type="text", text="找不到符合的 RSS 來源")]
 
-        # 並行抓取所有來源的新聞（大幅提升效能）
-        import asyncio
+        # 背景收集器執行中時，優先由本地資料回應
+        collector = None if force_refresh else background.get_background_collector()
+        freshness: dict[str, str] = {}
+        # 由本地資料回應的來源（即時抓取後才同步到收集器者不計入）
+        from_store: set[str] = set()
+
+        # 斷路中且無本地資料的來源直接略過，冷卻結束後才再試
+        health = get_source_health()
+        total_sources = len(rss_sources)
+
+        def skip(source: dict) -> bool:
+            source_name = source.get("name")
+            if collector is not None and collector.get(source_name) is not None:
+                return False
+            return not health.allow(source_name)
+
+        # allow() 在半開狀態會佔用唯一的試探名額，每個來源只判斷一次
+        skipped = [skip(s) for s in rss_sources]
+        skipped_sources = [
+            {
+                "source": s.get("name"),
+                "reason": "circuit_open",
+                "retry_after_s": health.retry_after(s.get("name")),
+            }
+            for s, is_skipped in zip(rss_sources, skipped, strict=True)
+            if is_skipped
+        ]
+        rss_sources = [
+            s for s, is_skipped in zip(rss_sources, skipped, strict=True) if not is_skipped
+        ]
 
-        async def fetch_source(source: dict) -> tuple[str, list[dict]]:
+        # 並行抓取所有來源的新聞（大幅提升效能）
+        async def fetch_source(source: dict) -> list[dict]:
             source_name = source.get("name", "Unknown")
             url = source.get("url", "")
             if not url:
-                return source_name, []
-            articles = await _fetch_rss(url, days, limit, keywords)
-            return source_name, articles
+                return []
+            # 增量模式下尚無水位的來源以空水位處理（退回 days 範圍）
+            watermark = (
+                (watermarks.get(watermark_key(source_name, days, keywords, period)) or {})
+                if watermarks
+                else None
+            )
 
-        # 使用 asyncio.gather 並行抓取
-        tasks = [fetch_source(s) for s in rss_sources]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            snapshot = collector.get(source_name) if collector else None
+            if snapshot is not None:
+                from_store.add(source_name)
+                freshness[source_name] = snapshot["fetched_at"]
+                return filter_entries(snapshot["entries"], days, limit, keywords, watermark, until)
+
+            articles = await _fetch_tracked(
+                source,
+                days,
+                limit,
+                keywords,
+                stream=source.get("parse") == "stream",
+                watermark=watermark,
+                until=until,
+            )
+            freshness[source_name] = datetime.now().isoformat(timespec="seconds")
+            # 強制重新抓取的結果同步到背景收集器
+            running = background.get_background_collector()
+            if running is not None and not any("error" in a for a in articles):
+                running.load(source)
+            return articles
+
+        # 並行抓取，每完成一個來源即送出進度通知；逾時未完成者列為 pending
+        fetchers = {
+            s.get("name", "Unknown"): functools.partial(fetch_source, s) for s in rss_sources
+        }
+        results, source_meta = await _run_providers(fetchers, deadline)
+        if rss_sources:
+            health.save()
 
         all_articles = {}
         failed_sources = []
-        for i, result in enumerate(results):
-            source_name = rss_sources[i].get("name", f"來源 {i + 1}")
-            if isinstance(result, Exception):
-                failed_sources.append(
-                    {"source": source_name, "error": f"{type(result).__name__}: {result}"}
+        pending_sources = []
+        for source_name, meta in source_meta.items():
+            if meta["status"] == "timeout":
+                pending_sources.append(source_name)
+            elif meta["status"] == "error" and not results[source_name]:
+                # 抓取過程拋出例外（一般錯誤會以 error 紀錄回傳）
+                failed_sources.append({"source": source_name, "error": meta["error"]})
+            else:
+                all_articles[source_name] = results[source_name]
+
+        # 寫入本地封存（合併重複前，保留每個來源的紀錄）
+        archived = 0
+        archive_error = None
+        try:
+            archived = await asyncio.to_thread(_archive_articles, all_articles)
+        except sqlite3.Error as e:
+            archive_error = f"文章封存失敗: {e}"
+
+        # 推進各來源水位（合併重複前，避免被合併的來源重複回傳）
+        watermarks_updated = 0
+        if watermarks is not None:
+            for source_name, articles in all_articles.items():
+                watermarks_updated += watermarks.advance(
+                    watermark_key(source_name, days, keywords, period), articles
                 )
-                continue
-            name, articles = result
-            all_articles[name] = articles
+            if watermarks_updated:
+                watermarks.save()
+
+        # 合併跨來源的重複文章，代表文章取自優先級最高的來源
+        duplicates = 0
+        if dedup:
+            all_articles, duplicates = collapse_duplicates(all_articles, config.weights)
 
         # 在結果中加入統計和失敗資訊
         response = {
             "_meta": {
-                "total_sources": len(rss_sources),
+                "total_sources": total_sources,
                 "success": len(all_articles),
                 "failed": len(failed_sources),
             }
         }
+        if skipped_sources:
+            response["_meta"]["skipped"] = len(skipped_sources)
+        if collector is not None:
+            response["_meta"]["from_store"] = sum(1 for name in all_articles if name in from_store)
+        response["_meta"]["freshness"] = {
+            name: freshness[name] for name in all_articles if name in freshness
+        }
+        if deadline is not None:
+            response["_meta"]["deadline"] = deadline
+            response["_meta"]["partial"] = bool(pending_sources)
+            response["_meta"]["pending"] = len(pending_sources)
+        if dedup:
+            response["_meta"]["duplicates_collapsed"] = duplicates
+        response["_meta"]["archived"] = archived
+        if since_last_run:
+            response["_meta"]["since_last_run"] = True
+            response["_meta"]["watermarks_updated"] = watermarks_updated
+        if archive_error:
+            response["_meta"]["archive_error"] = archive_error
+        if keywords:
+            # 各關鍵字命中文章數，方便依關鍵字排序或分組
+            keyword_hits = Counter(
+                kw
+                for articles in all_articles.values()
+                for article in articles
+                for kw in article.get("matched_keywords", [])
+            )
+            response["_meta"]["keyword_hits"] = dict(keyword_hits.most_common())
         response.update(all_articles)
         if failed_sources:
             response["_failed"] = failed_sources
+        if skipped_sources:
+            response["_skipped"] = skipped_sources
+        if pending_sources:
+            response["_pending"] = pending_sources
 
         return [TextContent(type="text", text=json.dumps(response, ensure_ascii=False, indent=2))]
 
+    elif name == "search_articles":
+        query = arguments.get("query", "").strip()
+        if not query:
+            return [TextContent(type="text", text="請提供搜尋關鍵字")]
+
+        try:
+            results = await asyncio.to_thread(
+                get_article_archive().search,
+                query,
+                days=arguments.get("days"),
+                sources=arguments.get("sources"),
+                limit=min(MAX_ARTICLE_LIMIT, max(1, arguments.get("limit", DEFAULT_ARTICLE_LIMIT))),
+                sort=arguments.get("sort", "date"),
+            )
+        except sqlite3.Error as e:
+            return [TextContent(type="text", text=f"搜尋文章失敗：{e}")]
+
+        result = {"query": query, "total": len(results), "results": results}
+        return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+
+    elif name == "get_cve":
+        try:
+            result = await get_cves(
+                arguments.get("cve_ids", []), fetch_missing=arguments.get("fetch_missing", False)
+            )
+        except sqlite3.Error as e:
+            return [TextContent(type="text", text=f"查詢 NVD 鏡像失敗：{e}")]
+        return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+
+    elif name == "search_cves":
+        vendor = arguments.get("vendor", "").strip()
+        if not vendor:
+            return [TextContent(type="text", text="請指定廠商名稱")]
+        try:
+            for key in ("since", "until"):
+                if arguments.get(key):
+                    date.fromisoformat(arguments[key])
+        except ValueError:
+            return [TextContent(type="text", text="日期格式錯誤，請使用 YYYY-MM-DD")]
+        try:
+            mirror = get_nvd_mirror()
+            results = await asyncio.to_thread(
+                mirror.search,
+                vendor,
+                product=arguments.get("product"),
+                min_cvss=arguments.get("min_cvss", 0.0),
+                since=arguments.get("since"),
+                until=arguments.get("until"),
+                limit=arguments.get("limit", DEFAULT_SEARCH_LIMIT),
+            )
+            status = await asyncio.to_thread(mirror.status)
+        except sqlite3.Error as e:
+            return [TextContent(type="text", text=f"查詢 NVD 鏡像失敗：{e}")]
+        kev_mirror = get_kev_mirror()
+        result = {
+            "vendor": vendor,
+            "count": len(results),
+            "results": [{**v, "in_kev": v["cve_id"] in kev_mirror} for v in results],
+            "mirror": status,
+        }
+        if status["index_incomplete"]:
+            result["hint"] = (
+                "鏡像含有建立廠商索引前的紀錄，查詢結果可能不完整；"
+                "請執行 python scripts/sync_nvd_mirror.py --full 重新批次載入"
+            )
+        return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+
     elif name == "fetch_vulnerabilities":
         min_cvss = arguments.get("min_cvss", 7.0)
         days = arguments.get("days", 7)
         include_kev = arguments.get("include_kev", True)
+        include_ghsa = arguments.get("include_ghsa", True)
         limit = arguments.get("limit", 20)
+        deadline = arguments.get("deadline", VULN_DEADLINE)
+        force_refresh = arguments.get("force_refresh", False)
+        try:
+            period = _parse_period(arguments)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"❌ {e}")]
+
+        # 並行收集所有未停用的 api 來源
+        query = {
+            "min_cvss": min_cvss,
+            "days": days,
+            "limit": limit,
+            "force_refresh": force_refresh,
+            "period": period,
+        }
+        included = {"kev": include_kev, "ghsa": include_ghsa}
+        by_name = _load_sources_config().by_name
+        selected = {
+            p.kind: functools.partial(p.fetch, query)
+            for p in providers.get_providers()
+            if included.get(p.kind, True) and by_name.get(p.source, {}).get("status") != "disabled"
+        }
 
-        result = {"nvd": [], "kev": []}
+        results, provider_meta = await _run_providers(selected, deadline)
+        result = {"nvd": [], "kev": [], **results}
 
-        # 從 NVD 抓取
-        result["nvd"] = await _fetch_nvd(min_cvss, days, limit)
+        # GHSA 與 NVD 同 CVE 的紀錄合併為一筆（NVD 紀錄附上 ghsa_id 與套件）
+        merged = providers.merge_by_cve(result["nvd"], result.get("ghsa", []), GHSA_JOIN_FIELDS)
 
-        # 從 CISA KEV 抓取
-        if include_kev:
-            result["kev"] = await _fetch_cisa_kev(days, limit)
+        # 以 KEV 鏡像索引標記 KEV 狀態（不受回顧天數限制，不需連線）
+        kev_mirror = get_kev_mirror()
+        for vuln in result["nvd"] + result.get("ghsa", []):
+            if "cve_id" in vuln:
+                vuln["in_kev"] = bool(vuln["cve_id"]) and vuln["cve_id"] in kev_mirror
 
-        # 合併並標記 KEV 狀態
-        kev_cves = {v["cve_id"] for v in result["kev"] if "cve_id" in v}
-        for vuln in result["nvd"]:
-            vuln["in_kev"] = vuln["cve_id"] in kev_cves
+        result["_meta"] = {
+            "deadline": deadline,
+            "partial": any(m["status"] != "ok" for m in provider_meta.values()),
+            "providers": provider_meta,
+            "merged_into_nvd": merged,
+        }
+        stale = {
+            n: m.get("refreshed_at") for n, m in provider_meta.items() if m["status"] == "stale"
+        }
+        if stale:
+            # 沿用舊資料的提供者與其資料時間
+            result["_meta"]["stale"] = stale
 
         return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
 
@@ -488,7 +1270,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
 
         # 載入搜尋模板
         search_templates = _load_search_templates()
-        if not search_templates:
+        if not search_templates.data:
             return [TextContent(type="text", text="找不到搜尋模板配置檔")]
 
         # 解析時間範圍
@@ -509,117 +1291,22 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
         else:
             end_date = now
 
-        # 準備動態變數
-        variables = {
-            "year": str(start_date.year),
-            "month": start_date.strftime("%B"),
-            "month_zh": _month_to_chinese(start_date.month),
-            "start_date": start_date.strftime("%Y-%m-%d"),
-            "end_date": end_date.strftime("%Y-%m-%d"),
-            "date_range": f"{start_date.strftime('%Y/%m/%d')}~{end_date.strftime('%Y/%m/%d')}",
-            **context,
-        }
-
         # 判斷是否為歷史搜尋
         is_historical = (now - end_date).days > 7
 
-        result = {
-            "web_searches": [],
-            "fetch_targets": [],
-            "period": {
-                "start": start_date.strftime("%Y-%m-%d"),
-                "end": end_date.strftime("%Y-%m-%d"),
-                "is_historical": is_historical,
-            },
-        }
-
-        # 收集搜尋建議
-        categories_to_process = (
-            [category]
-            if category != "all"
-            else ["taiwan_news", "vulnerabilities", "threat_intel", "industry_specific"]
+        text = _render_suggestions(
+            search_templates,
+            category,
+            start_date.date(),
+            end_date.date(),
+            is_historical,
+            tuple(sorted((str(k), str(v)) for k, v in context.items())),
+            include_fetch_targets,
         )
-
-        for cat in categories_to_process:
-            cat_data = search_templates.get(cat, {})
-            queries = cat_data.get("queries", [])
-            for q in queries:
-                query_template = q.get("query", "")
-                # 替換變數
-                try:
-                    query = query_template.format(**variables)
-                except KeyError:
-                    # 如果有未提供的變數，跳過此查詢
-                    continue
-
-                # 對於歷史搜尋，加入時間範圍限定
-                if is_historical:
-                    # 加入 Google 時間過濾語法
-                    date_filter = f" after:{start_date.strftime('%Y-%m-%d')} before:{end_date.strftime('%Y-%m-%d')}"
-                    query = query + date_filter
-
-                result["web_searches"].append(
-                    {
-                        "query": query,
-                        "priority": q.get("priority", "medium"),
-                        "category": q.get("category", cat),
-                        "note": q.get("note"),
-                    }
-                )
-
-        # 對於歷史搜尋，加入額外的時間限定搜尋
-        if is_historical:
-            historical_queries = [
-                {
-                    "query": f"台灣 資安事件 {start_date.strftime('%Y年%m月')}",
-                    "priority": "high",
-                    "category": "news",
-                    "note": "歷史時間範圍搜尋",
-                },
-                {
-                    "query": f"cybersecurity incident {start_date.strftime('%B %Y')}",
-                    "priority": "high",
-                    "category": "news",
-                    "note": "歷史時間範圍搜尋 (英文)",
-                },
-                {
-                    "query": f"CVE {start_date.strftime('%Y-%m')} critical",
-                    "priority": "high",
-                    "category": "vulnerability",
-                    "note": "該月份重大漏洞",
-                },
-            ]
-            result["web_searches"].extend(historical_queries)
-
-        # 收集 WebFetch 目標（歷史搜尋時不包含，因為網頁內容會是最新的）
-        if include_fetch_targets and not is_historical:
-            fetch_data = search_templates.get("fetch_targets", {})
-            urls = fetch_data.get("urls", [])
-            for target in urls:
-                result["fetch_targets"].append(
-                    {
-                        "name": target.get("name"),
-                        "url": target.get("url"),
-                        "type": target.get("type"),
-                        "priority": target.get("priority", "medium"),
-                        "prompt": target.get("prompt"),
-                    }
-                )
-        elif is_historical:
-            result["fetch_targets_note"] = (
-                "歷史週報不使用 WebFetch，因為網頁內容是最新的。請依賴 WebSearch 結果。"
-            )
-
-        # 按優先級排序
-        priority_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
-        result["web_searches"].sort(key=lambda x: priority_order.get(x["priority"], 99))
-        if result["fetch_targets"]:
-            result["fetch_targets"].sort(key=lambda x: priority_order.get(x["priority"], 99))
-
-        return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+        return [TextContent(type="text", text=text)]
 
     elif name == "list_weekly_data":
-        raw_dir = Path(__file__).parent.parent.parent.parent.parent.parent / "output" / "raw"
+        raw_dir = get_raw_dir()
 
         if not raw_dir.exists():
             return [
@@ -628,57 +1315,81 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
                 )
             ]
 
-        files = sorted(raw_dir.glob("*.json"), reverse=True)
+        files = weekly.list_snapshots(raw_dir)
         if not files:
             return [TextContent(type="text", text="尚無已保存的週報資料。")]
 
         result = {"available_weeks": [], "total_files": len(files), "storage_path": str(raw_dir)}
 
-        for f in files:
-            try:
-                data = json.loads(f.read_text(encoding="utf-8"))
-                meta = data.get("metadata", {})
+        # 由清單取得摘要，只有新增或變更的快照才需讀取
+        manifest = get_manifest("raw", raw_dir)
+        manifest.retain(files)
+        for f, entry in zip(files, manifest.refresh(files, weekly.summarize_snapshot)):
+            if "error" in entry:
                 result["available_weeks"].append(
-                    {
-                        "week": meta.get("week", f.stem),
-                        "filename": f.name,
-                        "collected_at": meta.get("collected_at", "unknown"),
-                        "stats": meta.get("stats", {}),
-                    }
-                )
-            except Exception:
-                result["available_weeks"].append(
-                    {"week": f.stem, "filename": f.name, "error": "無法解析檔案"}
+                    {"week": weekly.week_of(f), "filename": f.name, "error": entry["error"]}
                 )
+                continue
+            result["available_weeks"].append(
+                {
+                    "week": entry["week"],
+                    "filename": f.name,
+                    "period": entry["period"],
+                    "collected_at": entry["collected_at"],
+                    "stats": entry["stats"],
+                }
+            )
 
         return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
 
+    elif name == "collect_weekly_data":
+        try:
+            summary = await collect_weekly_data(
+                arguments.get("week"),
+                min_cvss=arguments.get("min_cvss", 7.0),
+                limit=arguments.get("limit", 50),
+            )
+        except ValueError as e:
+            return [TextContent(type="text", text=f"❌ {e}")]
+        return [TextContent(type="text", text=json.dumps(summary, ensure_ascii=False, indent=2))]
+
     elif name == "load_weekly_data":
-        raw_dir = Path(__file__).parent.parent.parent.parent.parent.parent / "output" / "raw"
+        raw_dir = get_raw_dir()
         week = arguments.get("week")
+        state = None
+        if arguments.get("cursor"):
+            try:
+                state = weekly.decode_cursor(arguments["cursor"])
+            except ValueError as e:
+                return [TextContent(type="text", text=f"❌ {e}")]
+            week = state["week"]
 
         if not raw_dir.exists():
             return [TextContent(type="text", text="❌ 尚無已保存的週報資料。")]
 
         if week:
             # 載入指定週數
-            target_file = raw_dir / f"{week}.json"
+            target_file = weekly.find_snapshot(raw_dir, week)
+            if target_file is None:
+                return [TextContent(type="text", text=f"❌ 找不到週報資料：{week}")]
         else:
             # 載入最新一週
-            files = sorted(raw_dir.glob("*.json"), reverse=True)
+            files = weekly.list_snapshots(raw_dir)
             if not files:
                 return [TextContent(type="text", text="❌ 尚無已保存的週報資料。")]
             target_file = files[0]
 
-        if not target_file.exists():
-            return [TextContent(type="text", text=f"❌ 找不到週報資料：{target_file.name}")]
+        if state is not None or any(key in arguments for key in PAGE_ARGUMENTS):
+            try:
+                return _load_weekly_page(target_file, arguments, state)
+            except ValueError as e:
+                return [TextContent(type="text", text=f"❌ {e}")]
 
         try:
-            data = json.loads(target_file.read_text(encoding="utf-8"))
-            meta = data.get("metadata", {})
+            meta = weekly.read_metadata(target_file)
 
             # 回傳摘要 + 資料
-            summary = f"""## 📊 週報原始資料：{meta.get("week", target_file.stem)}
+            summary = f"""## 📊 週報原始資料：{meta.get("week", weekly.week_of(target_file))}
 
 **收集時間**: {meta.get("collected_at", "unknown")}
 **資料期間**: {meta.get("period", {}).get("start")} ~ {meta.get("period", {}).get("end")}
@@ -697,11 +1408,28 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
 3. 使用 `generate_report_draft` 產生週報
 
 ---
-### 完整資料
 """
+            # 全文大小以未壓縮內容計算（清單或 metadata 記錄，缺少時串流計算）
+            entry = get_manifest("raw", raw_dir).refresh([target_file], weekly.summarize_snapshot)
+            size = entry[0].get("content_bytes")
+            if size is None:
+                size = weekly.content_size(target_file)
+            if size > weekly.FULL_TEXT_MAX_BYTES:
+                # 全文需在記憶體中組成完整字串，大型快照改回傳第一頁與 next_cursor
+                page = _load_weekly_page(target_file, {"limit": weekly.MAX_PAGE_SIZE}, None)
+                note = (
+                    f"### 資料（第一頁，每頁 {weekly.MAX_PAGE_SIZE} 項）\n"
+                    "資料量較大，請以 next_cursor 呼叫 load_weekly_data 取得後續頁面。\n"
+                )
+                return [TextContent(type="text", text=summary + note + page[0].text)]
+
+            # 小型快照回傳全文（整份 JSON 文字會組成單一字串）
             return [
                 TextContent(
-                    type="text", text=summary + json.dumps(data, ensure_ascii=False, indent=2)
+                    type="text",
+                    text=summary
+                    + "### 完整資料\n"
+                    + "".join(weekly.iter_snapshot_json(target_file)),
                 )
             ]
 
@@ -709,6 +1437,321 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
             return [TextContent(type="text", text=f"❌ 載入資料失敗：{e}")]
 
 
+def _resolve_snapshot_groups(requested: list[str]) -> list[str]:
+    """將要求的來源名稱解析為快照分組名稱
+
+    與 fetch_security_news 相同以 SourceIndex 比對（別名、子字串、選擇器），
+    漏洞分組為 nvd / kev / ghsa；原始名稱一併保留，已移出設定檔的來源仍可完全比對。
+    """
+    known = SourceIndex(
+        [*_load_sources_config().sources, *({"name": kind} for kind in ("nvd", "kev", "ghsa"))]
+    )
+    return list(dict.fromkeys([*requested, *(s["name"] for s in known.resolve(requested))]))
+
+
+def _clamp_page(offset, limit) -> tuple[int, int]:
+    """限制分頁位置與筆數（offset ≥ 0，limit 介於 1 與 MAX_PAGE_SIZE）
+
+    Raises:
+        ValueError: 不是整數
+    """
+    try:
+        return max(0, int(offset)), min(weekly.MAX_PAGE_SIZE, max(1, int(limit)))
+    except (TypeError, ValueError):
+        raise ValueError("分頁參數錯誤") from None
+
+
+def _load_weekly_page(path: Path, arguments: dict, state: dict | None) -> list[TextContent]:
+    """分頁載入週報原始資料（state 為 cursor 解碼後的分頁狀態）"""
+    stat = path.stat()
+    version = [stat.st_mtime_ns, stat.st_size]
+    if state is None:
+        offset, limit = _clamp_page(
+            arguments.get("offset", 0), arguments.get("limit", weekly.DEFAULT_PAGE_SIZE)
+        )
+        sources = arguments.get("sources")
+        state = {
+            "week": weekly.week_of(path),
+            "sections": arguments.get("sections"),
+            "sources": _resolve_snapshot_groups(sources) if sources else None,
+            "fields": arguments.get("fields"),
+            "offset": offset,
+            "limit": limit,
+        }
+    elif state.get("version") != version:
+        raise ValueError("週報資料已更新，cursor 已失效，請重新載入")
+    else:
+        # cursor 內容可被任意構造，解碼後重新限制範圍
+        offset, limit = _clamp_page(
+            state.get("offset", 0), state.get("limit", weekly.DEFAULT_PAGE_SIZE)
+        )
+        state = {**state, "offset": offset, "limit": limit}
+
+    page, has_more = weekly.select_items(
+        path,
+        state.get("sections"),
+        state.get("sources"),
+        state.get("fields"),
+        state["offset"],
+        state["limit"],
+    )
+    returned = sum(
+        len(items) for section in weekly.GROUPED_KEYS for items in page.get(section, {}).values()
+    ) + ("suggested_searches" in page)
+
+    result = {
+        "week": state["week"],
+        "offset": state["offset"],
+        "limit": state["limit"],
+        "returned": returned,
+        "has_more": has_more,
+        "data": page,
+    }
+    if has_more:
+        next_state = {**state, "offset": result["offset"] + returned, "version": version}
+        result["next_cursor"] = weekly.encode_cursor(next_state)
+    return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
+
+
+async def _tool_json(name: str, arguments: dict[str, Any]) -> dict:
+    """呼叫本模組的工具並解析 JSON 結果（非 JSON 回應放入 _error）"""
+    result = await call_tool(name, arguments)
+    try:
+        return json.loads(result[0].text)
+    except json.JSONDecodeError:
+        return {"_error": result[0].text}
+
+
+async def collect_weekly_data(
+    week: str | None = None, min_cvss: float = 7.0, limit: int = 50
+) -> dict:
+    """收集一週的新聞、漏洞與搜尋建議並寫入 output/raw/YYYY-WNN.json
+
+    三類資料並行收集，只保留發布日期落在該週的項目；
+    既有快照會與本次結果合併，內容未變更時不重寫檔案。
+
+    Returns:
+        week、path、status（created / updated / unchanged）、stats、timing 與錯誤摘要
+
+    Raises:
+        ValueError: 週數格式錯誤
+    """
+    week = week or weekly.default_week()
+    start, end = weekly.week_period(week)
+    # 各來源依期間查詢，先篩選到該週再套用 limit（補收過去週次不會被較新的資料擠掉）
+    period = {"period_start": start.isoformat(), "period_end": end.isoformat()}
+    started = time.perf_counter()
+
+    async def timed(name: str, arguments: dict[str, Any]) -> tuple[dict, int]:
+        t0 = time.perf_counter()
+        data = await _tool_json(name, arguments)
+        return data, round((time.perf_counter() - t0) * 1000)
+
+    (news_data, news_ms), (vuln_data, vuln_ms), (search_data, search_ms) = await asyncio.gather(
+        timed("fetch_security_news", {"limit": limit, **period}),
+        timed("fetch_vulnerabilities", {"min_cvss": min_cvss, "limit": limit, **period}),
+        timed("suggest_searches", period),
+    )
+
+    errors = [f"{f['source']}: {f['error']}" for f in news_data.get("_failed", [])]
+    collected_news = {}
+    for source_name, articles in news_data.items():
+        if source_name.startswith("_") or not isinstance(articles, list):
+            continue
+        errors.extend(f"{source_name}: {a['error']}" for a in articles if "error" in a)
+        collected_news[source_name] = [
+            a
+            for a in articles
+            if "error" not in a and weekly.in_period(a.get("published"), start, end)
+        ]
+
+    for provider, meta in vuln_data.get("_meta", {}).get("providers", {}).items():
+        if meta["status"] != "ok":
+            errors.append(f"{provider}: {meta.get('error') or meta.get('warning', meta['status'])}")
+    collected_vulns = {
+        kind: [
+            v
+            for v in vuln_data.get(kind, [])
+            if "error" not in v
+            and weekly.in_period(v.get("date_added" if kind == "kev" else "published"), start, end)
+        ]
+        for kind in ("nvd", "kev", "ghsa")
+        if kind in vuln_data
+    }
+    for key, data in (
+        ("news", news_data),
+        ("vulnerabilities", vuln_data),
+        ("searches", search_data),
+    ):
+        if "_error" in data:
+            errors.append(f"{key}: {data['_error']}")
+
+    collected = {
+        "news": collected_news,
+        "vulnerabilities": collected_vulns,
+        "suggested_searches": {} if "_error" in search_data else search_data,
+    }
+
+    raw_dir = get_raw_dir()
+    path = weekly.snapshot_path(raw_dir, week)
+    existing_path = weekly.find_snapshot(raw_dir, week)
+    # 先掃描一次取得合併後的統計與大小（寫入 metadata），再串流寫入
+    try:
+        scan = weekly.scan_merge(existing_path, collected)
+    except weekly.SNAPSHOT_ERRORS:
+        # 既有快照損毀時視為不存在
+        existing_path = None
+        scan = weekly.scan_merge(None, collected)
+    timing = {
+        "news_ms": news_ms,
+        "vulnerabilities_ms": vuln_ms,
+        "searches_ms": search_ms,
+        "total_ms": round((time.perf_counter() - started) * 1000),
+    }
+
+    if existing_path == path and not scan["changed"]:
+        # 內容未變更，保留既有檔案（冪等）
+        status = "unchanged"
+        stats = weekly.read_metadata(path).get("stats", scan["stats"])
+    else:
+        status = "updated" if existing_path else "created"
+        stats = scan["stats"]
+        metadata = {
+            "week": week,
+            "collected_at": datetime.now().isoformat(timespec="seconds"),
+            "period": {"start": start.isoformat(), "end": end.isoformat()},
+            "stats": stats,
+            "content_bytes": scan["content_bytes"],
+            "timing": timing,
+        }
+        if errors:
+            metadata["errors"] = errors
+        weekly.write_snapshot(path, metadata, weekly.merge_records(existing_path, collected))
+        if existing_path is not None and existing_path != path:
+            # 舊版未壓縮快照已轉為新格式
+            existing_path.unlink()
+        manifest = get_manifest("raw", raw_dir)
+        manifest.record(path, weekly.summarize_metadata(metadata, path))
+        manifest.save()
+
+    summary = {"week": week, "path": str(path), "status": status, "stats": stats, "timing": timing}
+    if errors:
+        summary["errors"] = errors
+    return summary
+
+
+@functools.lru_cache(maxsize=SUGGESTION_CACHE_SIZE)
+def _render_suggestions(
+    templates: SearchTemplates,
+    category: str,
+    start_date: date,
+    end_date: date,
+    is_historical: bool,
+    context: tuple[tuple[str, str], ...],
+    include_fetch_targets: bool,
+) -> str:
+    """產生搜尋建議 JSON（依模板版本與參數快取，設定檔重新載入後自然失效）"""
+    # 準備動態變數
+    variables = {
+        "year": str(start_date.year),
+        "month": start_date.strftime("%B"),
+        "month_zh": _month_to_chinese(start_date.month),
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "date_range": f"{start_date.strftime('%Y/%m/%d')}~{end_date.strftime('%Y/%m/%d')}",
+        **dict(context),
+    }
+
+    result = {
+        "web_searches": [],
+        "fetch_targets": [],
+        "period": {
+            "start": start_date.strftime("%Y-%m-%d"),
+            "end": end_date.strftime("%Y-%m-%d"),
+            "is_historical": is_historical,
+        },
+    }
+
+    # 對於歷史搜尋，加入 Google 時間過濾語法
+    date_filter = (
+        f" after:{start_date.strftime('%Y-%m-%d')} before:{end_date.strftime('%Y-%m-%d')}"
+        if is_historical
+        else ""
+    )
+
+    # 收集搜尋建議
+    categories_to_process = (
+        [category]
+        if category != "all"
+        else ["taiwan_news", "vulnerabilities", "threat_intel", "industry_specific"]
+    )
+
+    for cat in categories_to_process:
+        for compiled in templates.queries.get(cat, []):
+            # 缺少所需變數的查詢直接略過
+            query = compiled.render(variables)
+            if query is None:
+                continue
+            q = compiled.options
+            result["web_searches"].append(
+                {
+                    "query": query + date_filter,
+                    "priority": q.get("priority", "medium"),
+                    "category": q.get("category", cat),
+                    "note": q.get("note"),
+                }
+            )
+
+    # 對於歷史搜尋，加入額外的時間限定搜尋
+    if is_historical:
+        historical_queries = [
+            {
+                "query": f"台灣 資安事件 {start_date.strftime('%Y年%m月')}",
+                "priority": "high",
+                "category": "news",
+                "note": "歷史時間範圍搜尋",
+            },
+            {
+                "query": f"cybersecurity incident {start_date.strftime('%B %Y')}",
+                "priority": "high",
+                "category": "news",
+                "note": "歷史時間範圍搜尋 (英文)",
+            },
+            {
+                "query": f"CVE {start_date.strftime('%Y-%m')} critical",
+                "priority": "high",
+                "category": "vulnerability",
+                "note": "該月份重大漏洞",
+            },
+        ]
+        result["web_searches"].extend(historical_queries)
+
+    # 收集 WebFetch 目標（歷史搜尋時不包含，因為網頁內容會是最新的）
+    if include_fetch_targets and not is_historical:
+        for target in templates.fetch_targets:
+            result["fetch_targets"].append(
+                {
+                    "name": target.get("name"),
+                    "url": target.get("url"),
+                    "type": target.get("type"),
+                    "priority": target.get("priority", "medium"),
+                    "prompt": target.get("prompt"),
+                }
+            )
+    elif is_historical:
+        result["fetch_targets_note"] = (
+            "歷史週報不使用 WebFetch，因為網頁內容是最新的。請依賴 WebSearch 結果。"
+        )
+
+    # 按優先級排序
+    priority_order = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+    result["web_searches"].sort(key=lambda x: priority_order.get(x["priority"], 99))
+    if result["fetch_targets"]:
+        result["fetch_targets"].sort(key=lambda x: priority_order.get(x["priority"], 99))
+
+    return json.dumps(result, ensure_ascii=False, indent=2)
+
+
 def _month_to_chinese(month: int) -> str:
     """將月份數字轉換為中文"""
     months = [
@@ -7,6 +7,8 @@ from typing import Any
 
 from mcp.types import TextContent, Tool
 
+from ..storage.manifest import get_manifest
+
 # 專案根目錄
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent.parent
 OUTPUT_DIR = PROJECT_ROOT / "output" / "reports"
@@ -164,20 +166,27 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
             return [TextContent(type="text", text="尚無已產生的週報")]
 
         # 列出 JSON 檔案
-        json_files = sorted(OUTPUT_DIR.glob("SEC-WEEKLY-*.json"), reverse=True)[:limit]
+        all_files = sorted(OUTPUT_DIR.glob("SEC-WEEKLY-*.json"), reverse=True)
+        json_files = all_files[:limit]
 
         if not json_files:
             return [TextContent(type="text", text="尚無已產生的週報")]
 
+        # 由清單取得摘要，只有新增或變更的週報才需解析
+        manifest = get_manifest("reports", OUTPUT_DIR)
+        manifest.retain(all_files)
         reports = []
-        for json_file in json_files:
-            data = json.loads(json_file.read_text(encoding="utf-8"))
+        for json_file, entry in zip(json_files, manifest.refresh(json_files, _report_summary)):
+            if "error" in entry:
+                reports.append({"filename": json_file.name, "error": entry["error"]})
+                continue
             reports.append(
                 {
                     "filename": json_file.name,
-                    "report_id": data.get("report_id", json_file.stem),
-                    "period": data.get("period", {}),
-                    "publish_date": data.get("publish_date", ""),
+                    "report_id": entry["report_id"],
+                    "period": entry["period"],
+                    "publish_date": entry["publish_date"],
+                    "sha256": entry["sha256"],
                 }
             )
 
@@ -186,6 +195,16 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     return [TextContent(type="text", text=f"未知工具：{name}")]
 
 
+def _report_summary(json_file: Path) -> dict:
+    """清單用的週報摘要欄位"""
+    data = json.loads(json_file.read_text(encoding="utf-8"))
+    return {
+        "report_id": data.get("report_id", json_file.stem),
+        "period": data.get("period", {}),
+        "publish_date": data.get("publish_date", ""),
+    }
+
+
 def _calculate_threat_level(arguments: dict) -> str:
     """計算威脅等級"""
     events = arguments.get("events", [])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""RSS 解析事件迴圈阻塞基準測試
+
+比較 feedparser 直接在協程內解析（舊做法）與交給工作池解析時，
+事件迴圈的最大停頓時間。以 1ms 心跳任務量測迴圈延遲。
+
+用法：
+    python scripts/bench_feed_parsing.py --items 2000 --feeds 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 加入 mcp-server 套件路徑
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "mcp-server" / "src"))
+
+from security_weekly_mcp.collectors import feeds  # noqa: E402
+
+
+def build_feed(items: int) -> str:
+    """產生大型測試 RSS"""
+    pub_date = datetime.now().strftime("%a, %d %b %Y %H:%M:%S +0000")
+    body = "".join(
+        f"<item><title>Advisory {i}</title><link>https://example.com/{i}</link>"
+        f"<pubDate>{pub_date}</pubDate>"
+        f"<description>{'Vulnerability details ' * 20}{i}</description></item>"
+        for i in range(items)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{body}</channel></rss>'
+
+
+async def measure(label: str, work) -> None:
+    """執行工作並量測事件迴圈最大停頓"""
+    stalls = []
+    running = True
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stalls.append(now - last - 0.001)
+            last = now
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    running = False
+    await beat
+
+    print(
+        f"{label:<14} 總耗時 {elapsed * 1000:8.1f} ms   "
+        f"最大迴圈停頓 {max(stalls) * 1000:8.1f} ms   "
+        f"p99 停頓 {sorted(stalls)[int(len(stalls) * 0.99)] * 1000:6.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark feed parsing event-loop stalls")
+    parser.add_argument("--items", type=int, default=2000, help="Items per feed")
+    parser.add_argument("--feeds", type=int, default=8, help="Number of feeds parsed concurrently")
+    args = parser.parse_args()
+
+    text = build_feed(args.items)
+    print(f"=== RSS 解析基準：{args.feeds} 個 feed × {args.items} 則（{len(text) // 1024} KB/feed）===")
+
+    async def inline():
+        # 舊做法：在協程內直接解析
+        for _ in range(args.feeds):
+            feeds.parse_and_filter(text, 7, 10)
+
+    async def pooled():
+        await asyncio.gather(
+            *(
+                feeds.run_in_parse_pool(feeds.parse_and_filter, text, 7, 10)
+                for _ in range(args.feeds)
+            )
+        )
+
+    await measure("inline", inline)
+
+    for kind in ("thread", "process"):
+        os.environ["SECURITY_WEEKLY_PARSE_POOL"] = kind
+        feeds.shutdown_parse_executor()
+        # 預熱工作池（行程池需要啟動子行程）
+        await feeds.run_in_parse_pool(feeds.parse_and_filter, build_feed(1), 7, 10)
+        await measure(f"{kind} pool", pooled)
+        feeds.shutdown_parse_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
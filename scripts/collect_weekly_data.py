@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""週報原始資料收集腳本
+
+並行收集一週的新聞、漏洞與搜尋建議，寫入 output/raw/YYYY-WNN.json。
+供 GitHub Actions 或手動執行；同一週重複執行會合併既有資料。
+
+用法：
+    python scripts/collect_weekly_data.py
+    python scripts/collect_weekly_data.py --week 2026-W07 --min-cvss 8.0
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 加入 mcp-server 套件路徑
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "mcp-server" / "src"))
+
+from security_weekly_mcp.collectors.feeds import shutdown_parse_executor  # noqa: E402
+from security_weekly_mcp.http_client import aclose_http_client  # noqa: E402
+from security_weekly_mcp.tools.news import collect_weekly_data  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Collect weekly raw security data")
+    parser.add_argument("--week", help="ISO week (YYYY-WNN), defaults to yesterday's week")
+    parser.add_argument("--min-cvss", type=float, default=7.0, help="Minimum CVSS score")
+    parser.add_argument("--limit", type=int, default=50, help="Max items per source")
+    args = parser.parse_args()
+
+    try:
+        summary = await collect_weekly_data(args.week, min_cvss=args.min_cvss, limit=args.limit)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    finally:
+        await aclose_http_client()
+        shutdown_parse_executor()
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
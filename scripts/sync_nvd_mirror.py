@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""NVD 本地鏡像同步腳本
+
+首次執行時依發布日期批次載入 NVD 全部 CVE（未設定 NVD_API_KEY 時需時較久），
+中斷後再次執行會從最後完成的區段接續；之後只抓取上次同步後修改過的 CVE。鏡像供 get_cve 工具離線查詢。
+
+用法：
+    python scripts/sync_nvd_mirror.py
+    python scripts/sync_nvd_mirror.py --full --since 2020-01-01
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 加入 mcp-server 套件路徑
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "mcp-server" / "src"))
+
+from security_weekly_mcp.collectors.nvd import NvdClient  # noqa: E402
+from security_weekly_mcp.http_client import aclose_http_client, get_http_client  # noqa: E402
+from security_weekly_mcp.storage.nvd_mirror import BULK_START, get_nvd_mirror  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync the local NVD mirror")
+    parser.add_argument("--full", action="store_true", help="Reload instead of delta sync")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=BULK_START,
+        help="Earliest publish date for the bulk load (YYYY-MM-DD)",
+    )
+    args = parser.parse_args()
+
+    mirror = get_nvd_mirror()
+    try:
+        stats = await mirror.sync(NvdClient(get_http_client()), full=args.full, start=args.since)
+    except Exception as e:
+        print(f"❌ NVD 同步失敗：{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        await aclose_http_client()
+
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,10 +1,100 @@
 """pytest 配置"""
 
+from datetime import UTC, datetime, timedelta
+from xml.sax.saxutils import escape
+
+import httpx
 import pytest
 
+from security_weekly_mcp import http_client
+
 
 def pytest_configure(config):
     """註冊自定義 marker"""
     config.addinivalue_line(
         "markers", "slow: marks tests as slow (deselect with '-m \"not slow\"')"
     )
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """將本地快取目錄導向暫存目錄，避免測試寫入 output/cache"""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("SECURITY_WEEKLY_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def mock_http(monkeypatch):
+    """以 httpx.MockTransport 取代共用 HTTP 客戶端
+
+    用法：mock_http(handler)，handler 接收 httpx.Request 並回傳 httpx.Response。
+    """
+
+    def install(handler):
+        monkeypatch.setattr(
+            http_client,
+            "create_http_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        http_client.reset_http_client()
+
+    yield install
+    http_client.reset_http_client()
+
+
+def build_feed(items: list[str | dict], atom: bool = False) -> str:
+    """產生測試用 RSS 2.0（或 Atom）原文
+
+    每個項目可為標題字串，或包含下列欄位的 dict（皆可省略）：
+    title、link（預設 https://example.com/<序號>）、guid、
+    hours（發布於幾小時前，預設 1；None 表示不附日期）、summary。
+    """
+    now = datetime.now(UTC)
+    entries = []
+    for i, item in enumerate(items):
+        if isinstance(item, str):
+            item = {"title": item}
+        title = escape(item.get("title", f"Item {i}"))
+        link = escape(item.get("link", f"https://example.com/{i}"))
+        hours = item.get("hours", 1)
+        published = now - timedelta(hours=hours) if hours is not None else None
+        summary = escape(item["summary"]) if item.get("summary") else None
+        guid = item.get("guid")
+        if atom:
+            parts = [
+                f"<title>{title}</title>",
+                f'<link rel="alternate" href="{link}"/>',
+                f"<id>{escape(guid or link)}</id>",
+            ]
+            if published:
+                parts.append(f"<updated>{published.isoformat(timespec='seconds')}</updated>")
+            if summary:
+                parts.append(f"<summary>{summary}</summary>")
+            entries.append(f"<entry>{''.join(parts)}</entry>")
+        else:
+            parts = [f"<title>{title}</title>", f"<link>{link}</link>"]
+            if guid:
+                parts.append(f"<guid>{escape(guid)}</guid>")
+            if published:
+                parts.append(
+                    f"<pubDate>{published.strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate>"
+                )
+            if summary:
+                parts.append(f"<description>{summary}</description>")
+            entries.append(f"<item>{''.join(parts)}</item>")
+    if atom:
+        return (
+            '<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"{''.join(entries)}</feed>"
+        )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{"".join(entries)}</channel></rss>'
+
+
+@pytest.fixture
+def rss_feed():
+    """測試用 feed 產生器
+
+    用法：rss_feed(["標題", {"title": ..., "hours": 2}], atom=False)，詳見 build_feed。
+    """
+    return build_feed
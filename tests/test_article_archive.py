@@ -0,0 +1,147 @@
+"""文章封存與 search_articles 工具測試"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from security_weekly_mcp.storage.article_archive import ArticleArchive, get_article_archive
+from security_weekly_mcp.tools import news
+
+
+def _iso(days_ago: int) -> str:
+    return (datetime.now() - timedelta(days=days_ago)).isoformat(timespec="seconds")
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ArticleArchive(tmp_path / "articles.sqlite3")
+    archive.add_articles(
+        "The Hacker News",
+        [
+            {
+                "title": "Ivanti Connect Secure flaw exploited",
+                "link": "https://thehackernews.com/ivanti?utm_source=rss",
+                "summary": "Attackers exploit Ivanti VPN.",
+                "published": _iso(3),
+            },
+            {
+                "title": "Old Ivanti bug",
+                "link": "https://thehackernews.com/old-ivanti",
+                "summary": "",
+                "published": _iso(200),
+            },
+        ],
+    )
+    archive.add_articles(
+        "iThome 資安",
+        [
+            {
+                "title": "台灣金融業遭勒索軟體攻擊",
+                "link": "https://www.ithome.com.tw/news/1",
+                "summary": "Ivanti 設備成為入侵點",
+                "published": _iso(1),
+            }
+        ],
+    )
+    return archive
+
+
+class TestArticleArchive:
+    """SQLite 封存測試"""
+
+    def test_wal_mode(self, archive):
+        """資料庫使用 WAL 模式"""
+        conn = sqlite3.connect(archive.path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_upsert_by_canonical_url_and_source(self, archive):
+        """相同來源與標準化 URL 只保留一筆"""
+        archive.add_articles(
+            "The Hacker News",
+            [
+                {
+                    "title": "Ivanti Connect Secure flaw exploited (updated)",
+                    "link": "https://www.thehackernews.com/ivanti",
+                    "published": _iso(3),
+                }
+            ],
+        )
+        assert archive.count() == 3
+        assert archive.search("updated")[0]["title"].endswith("(updated)")
+
+    def test_add_counts_actual_changes(self, archive):
+        """重複寫入相同內容不計數，內容變更才計入"""
+        article = {
+            "title": "台灣金融業遭勒索軟體攻擊",
+            "link": "https://www.ithome.com.tw/news/1",
+            "summary": "Ivanti 設備成為入侵點",
+            "published": _iso(1),
+        }
+        new = {"title": "New", "link": "https://www.ithome.com.tw/news/2", "published": _iso(0)}
+        assert archive.add_articles("iThome 資安", [article]) == 0
+        assert archive.add_articles("iThome 資安", [{**article, "summary": "更新"}, new]) == 2
+
+    def test_search_limit_clamped(self, archive):
+        """搜尋筆數限制在 1 至上限之間"""
+        assert len(archive.search("ivanti", limit=0)) == 1
+        assert len(archive.search("ivanti", limit=10**9)) == 3
+
+    def test_search_with_window(self, archive):
+        """限定天數的全文搜尋"""
+        results = archive.search("ivanti", days=90)
+        assert [r["source"] for r in results] == ["iThome 資安", "The Hacker News"]
+        assert len(archive.search("ivanti")) == 3
+
+    def test_search_short_cjk_terms(self, archive):
+        """少於 3 字的中文詞以 LIKE 比對"""
+        results = archive.search("台灣 勒索軟體")
+        assert [r["title"] for r in results] == ["台灣金融業遭勒索軟體攻擊"]
+
+    def test_search_source_filter(self, archive):
+        """限定來源"""
+        results = archive.search("ivanti", sources=["iThome 資安"])
+        assert len(results) == 1
+
+    def test_concurrent_reader_during_write(self, archive):
+        """寫入交易進行中仍可讀取"""
+        writer = archive.connect()
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute(
+            "INSERT INTO articles (canonical_url, source, title, fetched_at) "
+            "VALUES ('x', 'y', 'pending ivanti', '2026-01-01')"
+        )
+        assert len(archive.search("ivanti")) == 3
+        writer.rollback()
+        writer.close()
+
+
+class TestSearchArticlesTool:
+    """search_articles 工具測試"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_then_search(self, mock_http, rss_feed):
+        """收集的文章寫入封存後可被搜尋，重複收集不重複計入封存數"""
+        rss = rss_feed(
+            [{"title": "Fortinet FortiGate zero-day", "link": "https://example.com/forti"}]
+        )
+        mock_http(lambda request: httpx.Response(200, text=rss))
+        fetched = await news.call_tool("fetch_security_news", {"sources": ["krebs"]})
+        assert json.loads(fetched[0].text)["_meta"]["archived"] == 1
+        again = await news.call_tool("fetch_security_news", {"sources": ["krebs"]})
+        assert json.loads(again[0].text)["_meta"]["archived"] == 0
+
+        result = await news.call_tool("search_articles", {"query": "fortigate", "days": 90})
+        data = json.loads(result[0].text)
+        assert data["total"] == 1
+        assert data["results"][0]["source"] == "Krebs on Security"
+        assert get_article_archive().count() == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_query(self):
+        """空白查詢回傳提示"""
+        result = await news.call_tool("search_articles", {"query": " "})
+        assert "請提供" in result[0].text
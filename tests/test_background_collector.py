@@ -0,0 +1,176 @@
+"""背景收集器測試"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import background
+from security_weekly_mcp.collectors.background import BackgroundCollector, poll_interval
+from security_weekly_mcp.tools import news
+
+
+def _entries(hours: list[float]) -> list[dict]:
+    now = datetime.now()
+    return [{"title": f"t{h}", "published": (now - timedelta(hours=h)).isoformat()} for h in hours]
+
+
+class TestPollInterval:
+    """輪詢間隔推算測試"""
+
+    def test_half_median_gap(self):
+        """取發布間隔中位數的一半"""
+        assert poll_interval(_entries([0, 2, 4, 6])) == 3600
+
+    def test_clamped(self):
+        """限制在上下限之間"""
+        assert poll_interval(_entries([0, 0.01, 0.02])) == background.MIN_INTERVAL
+        assert poll_interval(_entries([0, 72, 144])) == background.MAX_INTERVAL
+
+    def test_default_without_dates(self):
+        """無日期時使用預設值"""
+        assert poll_interval([{"title": "a"}]) == background.DEFAULT_INTERVAL
+
+
+class TestBackgroundCollector:
+    """排程與快照測試"""
+
+    @pytest.mark.asyncio
+    async def test_only_due_sources_refreshed(self, mock_http):
+        """只抓取到期的來源"""
+        mock_http(lambda request: httpx.Response(503))
+        now = [0.0]
+        calls = []
+
+        async def refresh(source):
+            calls.append(source["name"])
+            return _entries([0, 2])
+
+        collector = BackgroundCollector(
+            lambda: [{"name": "a"}, {"name": "b"}], refresh, clock=lambda: now[0]
+        )
+        await collector.run_once()
+        assert calls == ["a", "b"]
+
+        await collector.run_once()
+        assert calls == ["a", "b"]
+
+        now[0] += collector.store["a"]["interval"]
+        await collector.run_once()
+        assert calls == ["a", "b", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_follows_source_list_changes(self, mock_http):
+        """每次排程重新取得來源列表：新來源開始輪詢，停用來源停止輪詢"""
+        mock_http(lambda request: httpx.Response(503))
+        sources = [{"name": "a"}]
+        calls = []
+
+        async def refresh(source):
+            calls.append(source["name"])
+            return _entries([0, 2])
+
+        collector = BackgroundCollector(lambda: sources, refresh, clock=lambda: 0.0)
+        await collector.run_once()
+        sources = [{"name": "b"}]
+        await collector.run_once()
+
+        assert calls == ["a", "b"]
+        assert collector.get("a") is None
+        assert collector.get("b") is not None
+
+    @pytest.mark.asyncio
+    async def test_mirrors_follow_own_schedule(self, mock_http):
+        """KEV 鏡像依存活時間排程，不在每次循環都更新；失敗時隔一段時間重試"""
+        requests = []
+
+        def handler(request):
+            requests.append(request.url.host)
+            if "cisa.gov" in request.url.host and len(requests) > 1:
+                vuln = {"cveID": "CVE-2026-0001", "dateAdded": "2026-10-01"}
+                return httpx.Response(200, json={"vulnerabilities": [vuln]})
+            return httpx.Response(503)
+
+        mock_http(handler)
+        now = [0.0]
+        collector = BackgroundCollector(lambda: [], lambda source: None, clock=lambda: now[0])
+        await collector.run_once()
+        await collector.run_once()
+        assert requests == ["www.cisa.gov"]
+        assert collector.seconds_until_next() == background.MIRROR_CHECK_INTERVAL
+
+        now[0] += background.MIRROR_CHECK_INTERVAL
+        await collector.run_once()
+        await collector.run_once()
+        assert requests == ["www.cisa.gov", "www.cisa.gov"]
+        assert collector._mirror_due["kev"] > now[0] + background.MIRROR_CHECK_INTERVAL
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_previous_snapshot(self):
+        """抓取失敗保留舊快照並記錄錯誤"""
+        results = [_entries([0]), None]
+
+        async def refresh(source):
+            return results.pop(0)
+
+        collector = BackgroundCollector(lambda: [{"name": "a"}], refresh)
+        await collector.refresh_source({"name": "a"})
+        await collector.refresh_source({"name": "a"})
+        assert len(collector.get("a")["entries"]) == 1
+        assert collector.store["a"]["last_error"] == "抓取失敗"
+
+
+class TestNewsFromStore:
+    """fetch_security_news 由本地資料回應測試"""
+
+    @pytest.mark.asyncio
+    async def test_answers_from_store_until_force_refresh(self, mock_http, monkeypatch, rss_feed):
+        """背景收集器執行中時不連線，force_refresh 才重新抓取"""
+        feed = {"title": "first", "requests": 0}
+
+        def handler(request):
+            feed["requests"] += 1
+            return httpx.Response(
+                200,
+                text=rss_feed(
+                    [{"title": feed["title"], "link": f"https://x.com/{feed['title']}", "hours": 0}]
+                ),
+            )
+
+        async def idle(self):
+            await asyncio.Event().wait()
+
+        # 背景任務保持閒置，由測試手動驅動抓取
+        monkeypatch.setattr(BackgroundCollector, "_run", idle)
+        mock_http(handler)
+        collector = news.start_background_collector()
+        try:
+            krebs = next(s for s in collector.sources if s["name"] == "Krebs on Security")
+            await collector.refresh_source(krebs)
+            feed["title"] = "second"
+            requests_before = feed["requests"]
+
+            args = {"sources": ["krebs"], "dedup": False}
+            data = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+            assert feed["requests"] == requests_before
+            assert data["Krebs on Security"][0]["title"] == "first"
+            assert data["_meta"]["from_store"] == 1
+            assert "Krebs on Security" in data["_meta"]["freshness"]
+
+            # 沒有快照的來源即時抓取後同步到收集器，但不算由本地資料回應
+            args_live = {"sources": ["ithome"], "dedup": False}
+            live = json.loads((await news.call_tool("fetch_security_news", args_live))[0].text)
+            assert live["_meta"]["from_store"] == 0
+            assert collector.get("iThome 資安") is not None
+
+            requests_before = feed["requests"]
+            args["force_refresh"] = True
+            data = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+            assert feed["requests"] == requests_before + 1
+            assert data["Krebs on Security"][0]["title"] == "second"
+            assert collector.get("Krebs on Security")["entries"][0]["title"] == "second"
+        finally:
+            await background.stop_background_collector()
+        assert background.get_background_collector() is None
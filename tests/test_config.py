@@ -0,0 +1,169 @@
+"""設定檔自動重新載入測試"""
+
+import os
+
+import pytest
+
+from security_weekly_mcp.config import ConfigFile, SourceIndex, build_sources_config
+from security_weekly_mcp.tools import news
+
+SOURCES = """
+priorities:
+  high: 75
+  low: 25
+sources:
+  - name: "Low Feed"
+    type: rss
+    url: "https://low.example/feed"
+    priority: low
+  - name: "High Feed"
+    type: rss
+    url: "https://high.example/feed"
+    priority: high
+  - name: "Off Feed"
+    type: rss
+    url: "https://off.example/feed"
+    priority: high
+    status: disabled
+"""
+
+
+def _write(path, text):
+    """寫入並推進 mtime，確保檔案系統時間解析度不影響變更偵測"""
+    old = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, max(stat.st_mtime_ns, old + 1_000_000)))
+
+
+@pytest.fixture
+def sources_file(tmp_path):
+    path = tmp_path / "sources.yaml"
+    _write(path, SOURCES)
+    return path
+
+
+class TestSourcesConfig:
+    """來源設定驗證與衍生索引"""
+
+    def test_derived_indexes(self, sources_file):
+        """預先計算 RSS 來源、優先級順序與標準化名稱"""
+        config = ConfigFile(sources_file, build_sources_config).get()
+        assert [s["name"] for s in config.rss_sources] == ["High Feed", "Low Feed"]
+        assert config.weights["Low Feed"] == 25
+        assert config.by_name["High Feed"]["url"] == "https://high.example/feed"
+        assert [s["name"] for s in config.rss_index.sources] == ["High Feed", "Low Feed"]
+
+    @pytest.mark.parametrize(
+        "text, message",
+        [
+            ("- a\n- b\n", "最上層"),
+            ("sources:\n  - type: rss\n", "缺少 name"),
+            ("sources:\n  - name: A\n  - name: A\n", "重複"),
+            ("sources:\n  - name: A\n    type: rss\n", "缺少 url"),
+            ("sources:\n  - name: A\n    priority: urgent\n", "未定義的優先級"),
+        ],
+    )
+    def test_validation(self, tmp_path, text, message):
+        """格式錯誤的設定無法載入"""
+        path = tmp_path / "sources.yaml"
+        _write(path, text)
+        with pytest.raises(ValueError, match=message):
+            ConfigFile(path, build_sources_config).get()
+
+    def test_missing_file(self, tmp_path):
+        """檔案不存在時回傳空設定"""
+        config = ConfigFile(tmp_path / "none.yaml", build_sources_config).get()
+        assert config.sources == []
+
+
+class TestHotReload:
+    """變更偵測與替換"""
+
+    def test_unchanged_file_not_reparsed(self, sources_file):
+        """檔案未變更時沿用同一份設定"""
+        config_file = ConfigFile(sources_file, build_sources_config)
+        assert config_file.get() is config_file.get()
+
+    def test_reload_on_change(self, sources_file):
+        """檔案變更後重新載入"""
+        config_file = ConfigFile(sources_file, build_sources_config)
+        first = config_file.get()
+        _write(sources_file, SOURCES.replace("Low Feed", "Renamed Feed"))
+
+        second = config_file.get()
+        assert second is not first
+        assert "Renamed Feed" in second.weights
+
+    def test_invalid_change_keeps_previous(self, sources_file):
+        """新設定驗證失敗時沿用舊設定並記錄錯誤"""
+        config_file = ConfigFile(sources_file, build_sources_config)
+        first = config_file.get()
+        _write(sources_file, "sources: [\n")
+
+        assert config_file.get() is first
+        assert config_file.last_error.startswith("sources.yaml")
+
+        _write(sources_file, SOURCES.replace("Low Feed", "Fixed Feed"))
+        assert "Fixed Feed" in config_file.get().weights
+        assert config_file.last_error is None
+
+    @pytest.mark.asyncio
+    async def test_tool_picks_up_edit(self, sources_file, monkeypatch):
+        """編輯 sources.yaml 後工具不需重啟即可看到變更"""
+        monkeypatch.setattr(news, "CONFIG_DIR", sources_file.parent)
+        news.reset_config_cache()
+        try:
+            result = await news.call_tool("list_news_sources", {})
+            assert "Low Feed" in result[0].text
+
+            _write(sources_file, SOURCES.replace("Low Feed", "Renamed Feed"))
+            result = await news.call_tool("list_news_sources", {})
+            assert "Renamed Feed" in result[0].text
+        finally:
+            news.reset_config_cache()
+
+
+class TestSourceIndex:
+    """來源名稱索引"""
+
+    SOURCES = [
+        {"name": "The Hacker News", "aliases": ["THN"], "category": "news", "language": "en"},
+        {"name": "TWCERT/CC 資安新聞", "category": "news", "language": "zh-TW"},
+        {"name": "TWCERT/CC 漏洞公告", "category": "advisory", "language": "zh-TW"},
+        {"name": "CISA Alerts", "category": "advisory", "language": "en"},
+    ]
+
+    def _names(self, queries):
+        return [s["name"] for s in SourceIndex(self.SOURCES).resolve(queries)]
+
+    def test_exact_and_alias(self):
+        """名稱與別名完全相符"""
+        assert self._names(["the-hacker_news"]) == ["The Hacker News"]
+        assert self._names(["thn"]) == ["The Hacker News"]
+
+    def test_substring(self):
+        """部分名稱以子字串比對"""
+        assert self._names(["twcert"]) == ["TWCERT/CC 資安新聞", "TWCERT/CC 漏洞公告"]
+        assert self._names(["CISA Alerts feed"]) == ["CISA Alerts"]
+
+    def test_deduplicated_in_query_order(self):
+        """多個查詢符合同一來源時不重複，依查詢順序回傳"""
+        names = self._names(["cisa", "language:en", "thn"])
+        assert names == ["CISA Alerts", "The Hacker News"]
+
+    def test_selectors(self):
+        """category / language 選擇器，逗號串接取交集"""
+        assert self._names(["category:advisory"]) == ["TWCERT/CC 漏洞公告", "CISA Alerts"]
+        assert self._names(["language:zh-TW"]) == ["TWCERT/CC 資安新聞", "TWCERT/CC 漏洞公告"]
+        assert self._names(["category:advisory,language:zh-tw"]) == ["TWCERT/CC 漏洞公告"]
+        assert self._names(["category:unknown"]) == []
+
+    def test_no_match(self):
+        """無符合或空白查詢"""
+        assert self._names(["nothing-here", "  "]) == []
+
+    def test_alias_validation(self):
+        """別名必須是字串列表"""
+        with pytest.raises(ValueError, match="aliases"):
+            build_sources_config({"sources": [{"name": "A", "aliases": "B"}]})
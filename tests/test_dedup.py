@@ -0,0 +1,121 @@
+"""跨來源重複文章合併測試"""
+
+import random
+import time
+
+from security_weekly_mcp.collectors.dedup import canonicalize_url, collapse_duplicates
+
+
+def _article(title: str, link: str, summary: str = "", published: str = "2026-10-10T00:00:00"):
+    return {"title": title, "link": link, "summary": summary, "published": published}
+
+
+class TestCanonicalizeUrl:
+    """URL 標準化測試"""
+
+    def test_strips_tracking_and_fragment(self):
+        """移除追蹤參數、fragment 與 www"""
+        assert canonicalize_url(
+            "http://www.Example.com/news/story/?utm_source=rss&id=3&fbclid=x#top"
+        ) == "https://example.com/news/story?id=3"
+
+    def test_query_order_normalized(self):
+        """查詢參數順序不影響結果"""
+        assert canonicalize_url("https://a.com/p?b=2&a=1") == canonicalize_url(
+            "https://a.com/p?a=1&b=2"
+        )
+
+
+class TestCollapseDuplicates:
+    """重複文章合併測試"""
+
+    def test_same_url_across_sources(self):
+        """不同來源的相同 URL 合併，代表文章取自優先級最高的來源"""
+        articles = {
+            "SecurityWeek": [_article("Story", "https://x.com/a?utm_medium=feed")],
+            "The Hacker News": [_article("Story (repost)", "https://www.x.com/a")],
+        }
+        collapsed, dropped = collapse_duplicates(
+            articles, {"The Hacker News": 75, "SecurityWeek": 50}
+        )
+        assert dropped == 1
+        assert collapsed["SecurityWeek"] == []
+        rep = collapsed["The Hacker News"][0]
+        assert rep["alternates"] == [
+            {"source": "SecurityWeek", "title": "Story", "link": "https://x.com/a?utm_medium=feed"}
+        ]
+
+    def test_near_duplicate_titles(self):
+        """改寫過的標題與摘要被判定為同一則新聞"""
+        articles = {
+            "The Hacker News": [
+                _article(
+                    "Ivanti Connect Secure Zero-Day CVE-2026-1234 Exploited by Chinese Hackers",
+                    "https://thehackernews.com/ivanti",
+                    "Ivanti warned customers that CVE-2026-1234 in Connect Secure VPN "
+                    "appliances is under active exploitation by a China-nexus group.",
+                )
+            ],
+            "Dark Reading": [
+                _article(
+                    "Chinese Hackers Exploited Ivanti Connect Secure Zero-Day CVE-2026-1234",
+                    "https://darkreading.com/ivanti-zero-day",
+                    "Ivanti warned customers CVE-2026-1234 in Connect Secure VPN appliances "
+                    "is under active exploitation by China-nexus attackers.",
+                )
+            ],
+            "Krebs on Security": [
+                _article(
+                    "Patch Tuesday fixes Windows kernel bugs",
+                    "https://krebsonsecurity.com/patch-tuesday",
+                    "Microsoft released fixes for dozens of vulnerabilities in Windows.",
+                )
+            ],
+        }
+        collapsed, dropped = collapse_duplicates(articles)
+        assert dropped == 1
+        remaining = [a for items in collapsed.values() for a in items]
+        assert len(remaining) == 2
+        rep = next(a for a in remaining if "alternates" in a)
+        assert "ivanti" in rep["title"].lower()
+
+    def test_same_source_not_merged(self):
+        """同一來源的相似文章不合併"""
+        articles = {
+            "TWCERT": [
+                _article("Fortinet FortiOS 重大漏洞通報", "https://twcert.org.tw/1"),
+                _article("Fortinet FortiOS 重大漏洞通報", "https://twcert.org.tw/2"),
+            ]
+        }
+        _, dropped = collapse_duplicates(articles)
+        assert dropped == 0
+
+    def test_error_records_untouched(self):
+        """錯誤紀錄不參與合併"""
+        articles = {"A": [{"error": "HTTP 500"}], "B": [{"error": "HTTP 500"}]}
+        collapsed, dropped = collapse_duplicates(articles)
+        assert dropped == 0
+        assert collapsed == articles
+
+    def test_scales_linearly(self):
+        """大量來源時維持接近線性時間"""
+        rng = random.Random(1)
+        words = [f"word{i}" for i in range(5000)]
+
+        def build(n):
+            return {
+                f"source{s}": [
+                    _article(" ".join(rng.sample(words, 10)), f"https://s{s}.com/{i}")
+                    for i in range(10)
+                ]
+                for s in range(n // 10)
+            }
+
+        small, large = build(500), build(2000)
+        started = time.perf_counter()
+        collapse_duplicates(small)
+        small_time = time.perf_counter() - started
+        started = time.perf_counter()
+        collapse_duplicates(large)
+        large_time = time.perf_counter() - started
+        assert large_time < small_time * 4 * 2.5
@@ -0,0 +1,104 @@
+"""RSS Feed 條件式請求快取測試"""
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import feeds
+from security_weekly_mcp.storage import feed_cache
+from security_weekly_mcp.storage.feed_cache import get_feed_cache
+from security_weekly_mcp.tools import news
+
+FEED_URL = "https://example.com/feed"
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    """計算 feed 解析次數"""
+    calls = []
+    original = feeds.parse_feed_entries
+
+    def counting(text):
+        calls.append(1)
+        return original(text)
+
+    monkeypatch.setattr(feeds, "parse_feed_entries", counting)
+    return calls
+
+
+class TestConditionalGet:
+    """ETag / Last-Modified 條件式請求測試"""
+
+    @pytest.mark.asyncio
+    async def test_first_fetch_populates_cache(self, mock_http, rss_feed):
+        """首次抓取寫入快取"""
+        mock_http(
+            lambda request: httpx.Response(
+                200, text=rss_feed(["Alpha", "Beta"]), headers={"ETag": '"v1"'}
+            )
+        )
+        articles = await news._fetch_rss(FEED_URL, 7, 10)
+        assert [a["title"] for a in articles] == ["Alpha", "Beta"]
+
+        record = get_feed_cache().get(FEED_URL)
+        assert record["etag"] == '"v1"'
+        assert len(record["entries"]) == 2
+        assert get_feed_cache().get_body(FEED_URL).startswith(b"<?xml")
+
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_entries(self, mock_http, count_parses, rss_feed):
+        """收到 304 時沿用已解析文章，不重新解析"""
+        seen_headers = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(dict(request.headers))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                text=rss_feed(["Alpha"]),
+                headers={"ETag": '"v1"', "Last-Modified": "Mon, 02 Feb 2026 00:00:00 GMT"},
+            )
+
+        mock_http(handler)
+        first = await news._fetch_rss(FEED_URL, 7, 10)
+        second = await news._fetch_rss(FEED_URL, 7, 10)
+
+        assert first == second
+        assert count_parses == [1]
+        assert seen_headers[1]["if-none-match"] == '"v1"'
+        assert seen_headers[1]["if-modified-since"] == "Mon, 02 Feb 2026 00:00:00 GMT"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_body_skips_parse(self, mock_http, count_parses, rss_feed):
+        """伺服器不支援條件式請求但內容相同時，不重新解析"""
+        body = rss_feed(["Alpha"])
+        mock_http(lambda request: httpx.Response(200, text=body))
+        await news._fetch_rss(FEED_URL, 7, 10)
+        await news._fetch_rss(FEED_URL, 7, 10)
+        assert count_parses == [1]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_body_not_rewritten(self, mock_http, monkeypatch, rss_feed):
+        """內容相同時不重寫原文，只更新驗證標頭與檢查時間"""
+        body = rss_feed(["Alpha"])
+        etags = ['"v1"', '"v2"']
+        mock_http(lambda request: httpx.Response(200, text=body, headers={"ETag": etags.pop(0)}))
+        await news._fetch_rss(FEED_URL, 7, 10)
+
+        writes = []
+        original = feed_cache.atomic_write_bytes
+        monkeypatch.setattr(
+            feed_cache, "atomic_write_bytes", lambda *args: writes.append(1) or original(*args)
+        )
+        await news._fetch_rss(FEED_URL, 7, 10)
+        assert writes == []
+        assert get_feed_cache().get(FEED_URL)["etag"] == '"v2"'
+
+    @pytest.mark.asyncio
+    async def test_changed_body_reparsed(self, mock_http, rss_feed):
+        """內容變更時重新解析並更新快取"""
+        bodies = [rss_feed(["Alpha"]), rss_feed(["Alpha", "Gamma"])]
+        mock_http(lambda request: httpx.Response(200, text=bodies.pop(0)))
+        await news._fetch_rss(FEED_URL, 7, 10)
+        articles = await news._fetch_rss(FEED_URL, 7, 10)
+        assert [a["title"] for a in articles] == ["Alpha", "Gamma"]
@@ -0,0 +1,87 @@
+"""RSS 解析工作池測試"""
+
+import threading
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import feeds
+from security_weekly_mcp.tools import news
+
+
+def _items(count: int) -> list[dict]:
+    """產生測試用 feed 項目"""
+    return [{"title": f"Item {i}", "summary": f"Ivanti {i}"} for i in range(count)]
+
+
+@pytest.fixture
+def parse_pool(monkeypatch):
+    """切換解析工作池類型"""
+
+    def use(kind: str):
+        monkeypatch.setenv("SECURITY_WEEKLY_PARSE_POOL", kind)
+        feeds.shutdown_parse_executor()
+
+    yield use
+    feeds.shutdown_parse_executor()
+
+
+class TestParseAndFilter:
+    """解析與過濾函式測試"""
+
+    def test_compact_records(self, rss_feed):
+        """解析結果為可序列化的精簡紀錄"""
+        entries, articles = feeds.parse_and_filter(rss_feed(_items(3)), 7, 2)
+        assert len(entries) == 3
+        assert set(entries[0]) == {"id", "title", "link", "published", "summary"}
+        assert [a["title"] for a in articles] == ["Item 0", "Item 1"]
+
+    def test_keyword_filter(self, rss_feed):
+        """關鍵字過濾在工作池函式內完成"""
+        _, articles = feeds.parse_and_filter(rss_feed(_items(5)), 7, 10, ["ivanti 3"])
+        assert [a["title"] for a in articles] == ["Item 3"]
+
+    def test_until_applied_before_limit(self, rss_feed):
+        """指定上限時先排除較新的文章再套用 limit"""
+        items = [{"title": f"Item {i}", "hours": i * 24} for i in range(10)]
+        until = datetime.now() - timedelta(days=5, hours=12)
+        _, articles = feeds.parse_and_filter(rss_feed(items), 30, 2, until=until)
+        assert [a["title"] for a in articles] == ["Item 6", "Item 7"]
+
+    def test_atom_feed(self, rss_feed):
+        """Atom feed 解析為相同欄位"""
+        entries, articles = feeds.parse_and_filter(rss_feed(_items(2), atom=True), 7, 10)
+        assert [e["link"] for e in entries] == ["https://example.com/0", "https://example.com/1"]
+        assert [a["title"] for a in articles] == ["Item 0", "Item 1"]
+
+
+class TestParsePool:
+    """工作池執行測試"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_parses_off_event_loop(self, mock_http, monkeypatch, parse_pool, rss_feed):
+        """_fetch_rss 在工作執行緒中解析 feed"""
+        parse_pool("thread")
+        threads = []
+        original = feeds.parse_feed_entries
+
+        def recording(text):
+            threads.append(threading.current_thread().name)
+            return original(text)
+
+        monkeypatch.setattr(feeds, "parse_feed_entries", recording)
+        mock_http(lambda request: httpx.Response(200, text=rss_feed(_items(3))))
+        articles = await news._fetch_rss("https://example.com/feed", 7, 10)
+
+        assert len(articles) == 3
+        assert threads and threads[0].startswith("feed-parse")
+
+    @pytest.mark.asyncio
+    @pytest.mark.slow
+    async def test_process_pool(self, parse_pool, rss_feed):
+        """行程池模式回傳相同結果"""
+        parse_pool("process")
+        text = rss_feed(_items(20))
+        entries, articles = await feeds.run_in_parse_pool(feeds.parse_and_filter, text, 7, 5)
+        assert (entries, articles) == feeds.parse_and_filter(text, 7, 5)
@@ -0,0 +1,164 @@
+"""RSS/Atom 串流解析測試"""
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import feeds
+from security_weekly_mcp.storage.feed_cache import get_feed_cache
+from security_weekly_mcp.tools import news
+
+FEED_URL = "https://example.com/advisories.xml"
+
+
+def _advisories(ages_in_days: list[int]) -> list[dict]:
+    """依文章天數產生 feed 項目（順序即為列表順序）"""
+    return [
+        {"title": f"Advisory {i}", "hours": age * 24, "summary": "x" * 200}
+        for i, age in enumerate(ages_in_days)
+    ]
+
+
+async def _chunks(data: bytes, size: int = 256, consumed: list | None = None):
+    """將資料切成串流區塊，並記錄已送出的區塊數"""
+    for start in range(0, len(data), size):
+        if consumed is not None:
+            consumed.append(start)
+        yield data[start : start + size]
+
+
+class TestStreamingParser:
+    """增量解析器測試"""
+
+    def test_atom_entry(self):
+        """解析 Atom entry 的連結、日期與摘要"""
+        parser = feeds.StreamingFeedParser()
+        entries = parser.feed(
+            b'<feed xmlns="http://www.w3.org/2005/Atom"><entry><id>urn:a</id><title>A</title>'
+            b'<link rel="alternate" href="https://example.com/a"/>'
+            b"<updated>2026-10-01T08:00:00+08:00</updated><summary>S</summary></entry></feed>"
+        )
+        assert entries == [
+            {
+                "id": "urn:a",
+                "title": "A",
+                "link": "https://example.com/a",
+                "published": "2026-10-01T00:00:00",
+                "summary": "S",
+            }
+        ]
+
+    def test_feedburner_origlink(self):
+        """FeedBurner 轉址連結改用 feedburner:origLink 的原始網址"""
+        parser = feeds.StreamingFeedParser()
+        entries = parser.feed(
+            b'<rss version="2.0" xmlns:feedburner="http://rssnamespace.org/feedburner/ext/1.0">'
+            b"<channel><item><title>A</title>"
+            b"<link>https://feeds.feedburner.com/~r/TheHackersNews/~3/abc/</link>"
+            b"<feedburner:origLink>https://thehackernews.com/2026/10/a.html</feedburner:origLink>"
+            b"</item></channel></rss>"
+        )
+        assert entries[0]["link"] == "https://thehackernews.com/2026/10/a.html"
+
+    @pytest.mark.asyncio
+    async def test_stops_at_cutoff_for_ordered_feed(self, rss_feed):
+        """依時間排序的 feed 超過回顧天數即停止讀取"""
+        data = rss_feed(_advisories([1, 2, 3, 30] + [40 + i for i in range(200)])).encode()
+        consumed = []
+        entries, body = await feeds.stream_entries(_chunks(data, consumed=consumed), 7, 50)
+
+        assert body is None
+        assert [e["title"] for e in entries][-1] == "Advisory 3"
+        assert len(consumed) * 256 < len(data) / 10
+
+    @pytest.mark.asyncio
+    async def test_stops_after_enough_entries(self, rss_feed):
+        """取得 limit * 2 則文章即停止"""
+        data = rss_feed(_advisories([1] * 100)).encode()
+        entries, body = await feeds.stream_entries(_chunks(data), 7, 5)
+        assert body is None
+        assert len(entries) == 10
+
+    @pytest.mark.asyncio
+    async def test_unordered_feed_reads_to_end(self, rss_feed):
+        """未排序的 feed 不因舊文章提前停止"""
+        data = rss_feed(_advisories([5, 1, 30, 2])).encode()
+        entries, body = await feeds.stream_entries(_chunks(data), 7, 50)
+        assert entries is None
+        assert body == data
+
+    @pytest.mark.asyncio
+    async def test_malformed_falls_back(self, rss_feed):
+        """格式錯誤時回傳完整原文交由 feedparser 處理"""
+        data = rss_feed(_advisories([1])).encode().replace(b"<channel>", b"<channel>&nbsp;")
+        entries, body = await feeds.stream_entries(_chunks(data, size=16), 7, 50)
+        assert entries is None
+        assert body == data
+
+
+class TestFetchRssStreaming:
+    """_fetch_rss 串流模式測試"""
+
+    @pytest.mark.asyncio
+    async def test_stream_mode_matches_full_parse(self, mock_http, rss_feed):
+        """串流模式與完整解析結果一致，且提前停止時只快取部分文章（標記 partial）"""
+        data = rss_feed(_advisories([1, 2, 10, 20])).encode()
+        mock_http(lambda request: httpx.Response(200, content=data))
+
+        streamed = await news._fetch_rss(FEED_URL, 7, 10, stream=True)
+        assert get_feed_cache().get(FEED_URL)["partial"] == {"days": 7, "limit": 10}
+        assert get_feed_cache().get_body(FEED_URL) is None
+
+        full = await news._fetch_rss(FEED_URL, 7, 10)
+        assert [a["title"] for a in streamed] == [a["title"] for a in full]
+        assert [a["published"][:16] for a in streamed] == [a["published"][:16] for a in full]
+
+    @pytest.mark.asyncio
+    async def test_stream_mode_keeps_validators(self, mock_http, rss_feed):
+        """提前停止時仍保存驗證標頭：相同條件收到 304，需要更多文章時不送條件式請求"""
+        data = rss_feed(_advisories([1, 2, 10, 20])).encode()
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=data, headers={"ETag": '"v1"'})
+
+        mock_http(handler)
+        first = await news._fetch_rss(FEED_URL, 7, 10, stream=True)
+        second = await news._fetch_rss(FEED_URL, 7, 10, stream=True)
+        assert seen == [None, '"v1"']
+        assert first == second
+
+        await news._fetch_rss(FEED_URL, 30, 10, stream=True)
+        assert seen[-1] is None
+
+    @pytest.mark.asyncio
+    async def test_stream_mode_fallback_caches(self, mock_http, rss_feed):
+        """讀完整份文件時走一般流程並寫入快取"""
+        data = rss_feed(_advisories([5, 1, 30, 2])).encode()
+        mock_http(lambda request: httpx.Response(200, content=data))
+        articles = await news._fetch_rss(FEED_URL, 7, 10, stream=True)
+        assert [a["title"] for a in articles] == ["Advisory 0", "Advisory 1", "Advisory 3"]
+        assert len(get_feed_cache().get(FEED_URL)["entries"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_stream_mode_uses_origlink(self, mock_http):
+        """提前停止的串流結果同樣使用 FeedBurner 原始連結"""
+        items = "".join(
+            f"<item><title>A{i}</title>"
+            f"<link>https://feeds.feedburner.com/~r/TheHackersNews/~3/{i}/</link>"
+            f"<feedburner:origLink>https://thehackernews.com/{i}.html</feedburner:origLink>"
+            "</item>"
+            for i in range(5)
+        )
+        data = (
+            '<?xml version="1.0"?><rss version="2.0" '
+            'xmlns:feedburner="http://rssnamespace.org/feedburner/ext/1.0">'
+            f"<channel>{items}</channel></rss>"
+        ).encode()
+        mock_http(lambda request: httpx.Response(200, content=data))
+
+        articles = await news._fetch_rss(FEED_URL, 7, 1, stream=True)
+        assert get_feed_cache().get(FEED_URL)["partial"]  # 確認走串流提前停止的路徑
+        assert [a["link"] for a in articles] == ["https://thehackernews.com/0.html"]
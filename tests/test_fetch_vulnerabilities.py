@@ -0,0 +1,233 @@
+"""fetch_vulnerabilities 並行收集測試"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import providers
+from security_weekly_mcp.tools import news
+
+NVD_PAGE = {
+    "totalResults": 1,
+    "resultsPerPage": 2000,
+    "vulnerabilities": [
+        {
+            "cve": {
+                "id": "CVE-2026-1000",
+                "published": "2026-10-10T00:00:00.000",
+                "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": 9.8}}]},
+            }
+        }
+    ],
+}
+
+KEV_CATALOG = {
+    "vulnerabilities": [
+        {"cveID": "CVE-2026-2000", "dateAdded": datetime.now().strftime("%Y-%m-%d")}
+    ]
+}
+
+GHSA_ADVISORIES = [
+    {
+        "ghsa_id": "GHSA-aaaa-bbbb-cccc",
+        "cve_id": "CVE-2026-2000",
+        "summary": "RCE in example package",
+        "published_at": "2026-10-11T00:00:00Z",
+        "html_url": "https://github.com/advisories/GHSA-aaaa-bbbb-cccc",
+        "cvss_severities": {"cvss_v3": {"score": 8.8, "vector_string": "CVSS:3.1/AV:N"}},
+        "vulnerabilities": [{"package": {"ecosystem": "npm", "name": "example"}}],
+    },
+    {"ghsa_id": "GHSA-low", "cve_id": None, "cvss": {"score": 3.1}},
+]
+
+
+def _make_handler(delays: dict[str, float] | None = None, failures: set[str] = frozenset()):
+    """依主機回傳各提供者的替身資料"""
+    delays = delays or {}
+    bodies = {
+        "services.nvd.nist.gov": NVD_PAGE,
+        "www.cisa.gov": KEV_CATALOG,
+        "api.github.com": GHSA_ADVISORIES,
+    }
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        await asyncio.sleep(delays.get(host, 0))
+        if host in failures:
+            return httpx.Response(500)
+        return httpx.Response(200, json=bodies[host])
+
+    return handler
+
+
+async def _call(**arguments) -> dict:
+    result = await news.call_tool("fetch_vulnerabilities", arguments)
+    return json.loads(result[0].text)
+
+
+class TestProviderFanOut:
+    """多來源並行收集測試"""
+
+    @pytest.mark.asyncio
+    async def test_all_providers_merged(self, mock_http):
+        """NVD、KEV、GHSA 結果合併並附上提供者資訊"""
+        mock_http(_make_handler())
+        data = await _call(min_cvss=7.0, days=7)
+
+        assert [v["cve_id"] for v in data["nvd"]] == ["CVE-2026-1000"]
+        assert [v["cve_id"] for v in data["kev"]] == ["CVE-2026-2000"]
+        assert [v["ghsa_id"] for v in data["ghsa"]] == ["GHSA-aaaa-bbbb-cccc"]
+        assert data["ghsa"][0]["in_kev"] is True
+        assert data["ghsa"][0]["packages"] == ["npm:example"]
+
+        providers = data["_meta"]["providers"]
+        assert set(providers) == {"nvd", "kev", "ghsa"}
+        assert all(p["status"] == "ok" for p in providers.values())
+        assert all("elapsed_ms" in p for p in providers.values())
+        assert data["_meta"]["partial"] is False
+
+    @pytest.mark.asyncio
+    async def test_providers_run_concurrently(self, mock_http):
+        """各提供者並行執行，總耗時接近最慢者而非總和"""
+        delay = 0.2
+        mock_http(
+            _make_handler(
+                {"services.nvd.nist.gov": delay, "www.cisa.gov": delay, "api.github.com": delay}
+            )
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await _call()
+        assert loop.time() - started < delay * 2
+
+    @pytest.mark.asyncio
+    async def test_deadline_returns_partial(self, mock_http):
+        """超過整體時限時回傳已完成的部分結果"""
+        mock_http(_make_handler({"api.github.com": 5.0}))
+        data = await _call(deadline=0.5)
+
+        assert data["_meta"]["partial"] is True
+        assert data["_meta"]["providers"]["ghsa"]["status"] == "timeout"
+        assert data["_meta"]["providers"]["nvd"]["status"] == "ok"
+        assert data["ghsa"] == []
+        assert len(data["nvd"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_provider_error_metadata(self, mock_http):
+        """單一提供者失敗不影響其他提供者"""
+        mock_http(_make_handler(failures={"api.github.com"}))
+        data = await _call(include_kev=False)
+
+        assert "kev" in data and data["kev"] == []
+        assert data["_meta"]["providers"]["ghsa"] == {
+            "status": "error",
+            "count": 0,
+            "elapsed_ms": data["_meta"]["providers"]["ghsa"]["elapsed_ms"],
+            "error": "GHSA API HTTP 500",
+        }
+        assert len(data["nvd"]) == 1
+
+
+class TestCveJoin:
+    """GHSA 與 NVD 依 CVE 合併"""
+
+    @pytest.mark.asyncio
+    async def test_ghsa_merged_into_nvd(self, mock_http):
+        """同一 CVE 的 GHSA 併入 NVD 紀錄而非重複出現"""
+        advisories = [
+            {**GHSA_ADVISORIES[0], "ghsa_id": "GHSA-join", "cve_id": "CVE-2026-1000"},
+            GHSA_ADVISORIES[0],
+        ]
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "api.github.com":
+                return httpx.Response(200, json=advisories)
+            return await _make_handler()(request)
+
+        mock_http(handler)
+        data = await _call()
+
+        assert len(data["nvd"]) == 1
+        assert data["nvd"][0]["ghsa_id"] == "GHSA-join"
+        assert data["nvd"][0]["packages"] == ["npm:example"]
+        assert [v["ghsa_id"] for v in data["ghsa"]] == ["GHSA-aaaa-bbbb-cccc"]
+        assert data["_meta"]["merged_into_nvd"] == 1
+
+
+class TestProviderRegistry:
+    """api 來源提供者註冊"""
+
+    @pytest.mark.asyncio
+    async def test_registered_provider_runs(self, mock_http, monkeypatch):
+        """新註冊的提供者與內建提供者一起執行"""
+        monkeypatch.setattr(providers, "_providers", dict(providers._providers))
+
+        async def fetch(query):
+            return [{"cve_id": "CVE-2026-9999", "cvss": query["min_cvss"]}]
+
+        providers.register("osv", "OSV", fetch)
+        mock_http(_make_handler())
+        data = await _call(min_cvss=8.0)
+
+        assert data["osv"] == [{"cve_id": "CVE-2026-9999", "cvss": 8.0}]
+        assert data["_meta"]["providers"]["osv"]["status"] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_disabled_source_skipped(self, mock_http, monkeypatch):
+        """sources.yaml 停用的 api 來源不執行"""
+        config = news._load_sources_config()
+        ghsa_source = {**config.by_name["GitHub Security Advisories"], "status": "disabled"}
+        monkeypatch.setitem(config.by_name, "GitHub Security Advisories", ghsa_source)
+        mock_http(_make_handler())
+        data = await _call()
+
+        assert "ghsa" not in data["_meta"]["providers"]
+
+
+class TestPeriodQuery:
+    """指定期間查詢測試"""
+
+    @pytest.mark.asyncio
+    async def test_period_passed_to_each_provider(self, mock_http):
+        """期間轉為 NVD pubStartDate/pubEndDate、GHSA published 範圍與 KEV dateAdded 區間"""
+        requests = []
+        kev = {
+            "vulnerabilities": [
+                {"cveID": "CVE-2026-3000", "dateAdded": "2026-10-04"},
+                {"cveID": "CVE-2026-3001", "dateAdded": "2026-10-05"},
+                {"cveID": "CVE-2026-3002", "dateAdded": "2026-10-11"},
+                {"cveID": "CVE-2026-3003", "dateAdded": "2026-10-12"},
+            ]
+        }
+        bodies = {
+            "services.nvd.nist.gov": NVD_PAGE,
+            "www.cisa.gov": kev,
+            "api.github.com": GHSA_ADVISORIES,
+        }
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=bodies[request.url.host])
+
+        mock_http(handler)
+        data = await _call(period_start="2026-10-05", period_end="2026-10-11", min_cvss=9.0)
+
+        nvd_params = [r.url.params for r in requests if r.url.host == "services.nvd.nist.gov"]
+        assert {p["pubStartDate"] for p in nvd_params} == {"2026-10-05T00:00:00.000"}
+        assert {p["pubEndDate"] for p in nvd_params} == {"2026-10-11T23:59:59.999"}
+        ghsa = next(r for r in requests if r.url.host == "api.github.com")
+        assert ghsa.url.params["published"] == "2026-10-05..2026-10-11"
+        assert [v["cve_id"] for v in data["kev"]] == ["CVE-2026-3002", "CVE-2026-3001"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_period(self):
+        """期間參數不完整或格式錯誤時回傳錯誤"""
+        result = await news.call_tool("fetch_vulnerabilities", {"period_start": "2026-10-05"})
+        assert "❌" in result[0].text
+        result = await news.call_tool(
+            "fetch_vulnerabilities", {"period_start": "2026-10-12", "period_end": "2026-10-05"}
+        )
+        assert "❌" in result[0].text
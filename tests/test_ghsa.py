@@ -0,0 +1,164 @@
+"""GitHub Security Advisories 收集器測試"""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import ghsa
+from security_weekly_mcp.storage.feed_cache import get_api_cache
+
+SINCE = datetime(2026, 10, 1)
+
+
+def _advisory(n: int) -> dict:
+    return {
+        "ghsa_id": f"GHSA-{n:04d}",
+        "cve_id": f"CVE-2026-{n:04d}",
+        "published_at": f"2026-10-{10 - n % 5:02d}T00:00:00Z",
+        "cvss_severities": {"cvss_v3": {"score": 9.1}},
+    }
+
+
+def _paged_handler(pages: list[list[dict]], calls: list[httpx.Request], etag: str = '"v1"'):
+    """依 after cursor 回傳分頁，最後一頁不附 next 連結"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        index = int(request.url.params.get("after", "0"))
+        headers = {"ETag": etag} if index == 0 else {}
+        if index + 1 < len(pages):
+            next_url = request.url.copy_set_param("after", str(index + 1))
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return httpx.Response(200, json=pages[index], headers=headers)
+
+    return handler
+
+
+class TestCursorPagination:
+    """依 Link 標頭的 cursor 分頁"""
+
+    @pytest.mark.asyncio
+    async def test_follows_next_links(self):
+        """逐頁抓取直到沒有 next 連結"""
+        calls = []
+        pages = [[_advisory(1), _advisory(2)], [_advisory(3)], [_advisory(4)]]
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(_paged_handler(pages, calls))
+        ) as client:
+            result = await ghsa.fetch_advisories(client, SINCE, per_page=2)
+
+        assert [v["ghsa_id"] for v in result] == [
+            "GHSA-0001",
+            "GHSA-0002",
+            "GHSA-0003",
+            "GHSA-0004",
+        ]
+        assert result[0]["cve_id"] == "CVE-2026-0001"
+        assert len(calls) == 3
+        assert calls[0].url.params["published"] == ">=2026-10-01"
+
+    @pytest.mark.asyncio
+    async def test_max_pages(self):
+        """超過頁數上限時停止"""
+        calls = []
+        pages = [[_advisory(n)] for n in range(1, 6)]
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(_paged_handler(pages, calls))
+        ) as client:
+            result = await ghsa.fetch_advisories(client, SINCE, max_pages=2)
+
+        assert len(result) == 2
+        assert len(calls) == 2
+
+
+class TestConditionalCache:
+    """第一頁條件式請求"""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_all_pages(self):
+        """第一頁回傳 304 時沿用快取的全部結果"""
+        calls = []
+        pages = [[_advisory(1)], [_advisory(2)]]
+        cache = get_api_cache()
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(_paged_handler(pages, calls))
+        ) as client:
+            first = await ghsa.fetch_advisories(client, SINCE, cache=cache)
+            second = await ghsa.fetch_advisories(client, SINCE, cache=cache)
+
+        assert second == first
+        assert len(calls) == 3
+        assert calls[2].headers["If-None-Match"] == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_changed_etag_refetches(self):
+        """ETag 變更時重新抓取"""
+        cache = get_api_cache()
+        calls = []
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(_paged_handler([[_advisory(1)]], calls))
+        ) as client:
+            await ghsa.fetch_advisories(client, SINCE, cache=cache)
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(_paged_handler([[_advisory(2)]], calls, etag='"v2"'))
+        ) as client:
+            result = await ghsa.fetch_advisories(client, SINCE, cache=cache)
+
+        assert [v["ghsa_id"] for v in result] == ["GHSA-0002"]
+
+
+class TestConcurrencyLimit:
+    """請求並行上限"""
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrent_requests(self):
+        """同時進行的請求不超過上限"""
+        active = peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            return httpx.Response(200, json=[])
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await asyncio.gather(*(ghsa.fetch_advisories(client, SINCE) for _ in range(5)))
+
+        assert peak == ghsa.MAX_CONCURRENT_REQUESTS
+
+
+class TestNormalizeAdvisory:
+    """GHSA 紀錄欄位與 NVD 紀錄一致"""
+
+    def test_same_shape_as_nvd_record(self):
+        """欄位包含 NVD 紀錄的所有欄位"""
+        from security_weekly_mcp.collectors import nvd
+
+        record = ghsa.normalize_advisory(_advisory(1))
+        assert set(nvd.normalize_cve({"cve": {"id": "CVE-2026-0001"}})) <= set(record)
+
+    def test_packages_and_version_ranges(self):
+        """受影響套件與版本範圍轉為 affected_products"""
+        advisory = {
+            **_advisory(1),
+            "updated_at": "2026-10-12T08:00:00Z",
+            "vulnerabilities": [
+                {
+                    "package": {"ecosystem": "npm", "name": "example"},
+                    "vulnerable_version_range": "< 1.2.3",
+                },
+                {"package": {"ecosystem": "pip", "name": "other"}},
+                {"package": None},
+            ],
+        }
+        record = ghsa.normalize_advisory(advisory)
+        assert record["affected_products"] == ["npm example < 1.2.3", "pip other"]
+        assert record["packages"] == ["npm:example", "pip:other"]
+        assert record["last_modified"] == "2026-10-12T08:00:00Z"
+        assert record["cpes"] == []
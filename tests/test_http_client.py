@@ -0,0 +1,99 @@
+"""共用 HTTP 連線池測試"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from security_weekly_mcp import http_client
+from security_weekly_mcp.tools import news
+
+
+@pytest.fixture(autouse=True)
+def fresh_client():
+    """每個測試使用新的共用客戶端"""
+    http_client.reset_http_client()
+    yield
+    http_client.reset_http_client()
+
+
+class TestSharedClient:
+    """共用客戶端生命週期測試"""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused(self):
+        """同一事件迴圈內重複取得同一客戶端"""
+        client = http_client.get_http_client()
+        assert http_client.get_http_client() is client
+        await http_client.aclose_http_client()
+
+    def test_client_pool_settings(self, monkeypatch):
+        """客戶端套用連線池與 HTTP/2 設定"""
+        created = []
+        monkeypatch.setattr(
+            http_client.httpx, "AsyncClient", lambda **kwargs: created.append(kwargs)
+        )
+        http_client.create_http_client()
+        assert created[0]["http2"] == http_client.HTTP2_ENABLED
+        assert created[0]["limits"] == httpx.Limits(
+            max_connections=http_client.MAX_CONNECTIONS,
+            max_keepalive_connections=http_client.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=http_client.KEEPALIVE_EXPIRY,
+        )
+
+    def test_old_client_closed_on_loop_change(self, mock_http):
+        """事件迴圈變更時關閉舊客戶端（例如腳本多次呼叫 asyncio.run）"""
+        mock_http(lambda request: httpx.Response(200))
+
+        async def fetch():
+            client = http_client.get_http_client()
+            await client.get("https://example.com/")
+            return client
+
+        async def fetch_again():
+            client = await fetch()
+            await asyncio.sleep(0)
+            return client
+
+        first = asyncio.run(fetch())
+        second = asyncio.run(fetch_again())
+        assert second is not first
+        assert first.is_closed
+        assert not second.is_closed
+
+    @pytest.mark.asyncio
+    async def test_close_and_recreate(self):
+        """關閉後再取得會建立新的客戶端"""
+        client = http_client.get_http_client()
+        await http_client.aclose_http_client()
+        assert client.is_closed
+        assert http_client.get_http_client() is not client
+        await http_client.aclose_http_client()
+
+
+class TestFetchersUseSharedClient:
+    """新聞收集函式使用共用客戶端"""
+
+    @pytest.mark.asyncio
+    async def test_rss_and_kev_share_client(self, mock_http):
+        """RSS 與 KEV 抓取都經由共用客戶端"""
+        hosts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hosts.append(request.url.host)
+            if request.url.host == "www.cisa.gov":
+                return httpx.Response(200, json={"vulnerabilities": []})
+            return httpx.Response(200, text="<rss><channel></channel></rss>")
+
+        mock_http(handler)
+        await news._fetch_rss("https://feeds.feedburner.com/TheHackersNews", 7, 5)
+        await news._fetch_cisa_kev(7, 5)
+        assert hosts == ["feeds.feedburner.com", "www.cisa.gov"]
+
+    @pytest.mark.asyncio
+    async def test_http_error_reported(self, mock_http):
+        """HTTP 錯誤轉為錯誤訊息"""
+        mock_http(lambda request: httpx.Response(503))
+        result = await news._fetch_rss("https://example.com/feed", 7, 5)
+        assert "HTTP 503" in json.dumps(result)
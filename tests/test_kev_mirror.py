@@ -0,0 +1,185 @@
+"""CISA KEV 本地鏡像測試"""
+
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from security_weekly_mcp.storage.kev_mirror import KevMirror, get_kev_mirror
+from security_weekly_mcp.tools import news
+
+
+def _days_ago(days: int) -> str:
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _kev(cve_id: str, date_added: str, **extra) -> dict:
+    return {
+        "cveID": cve_id,
+        "vendorProject": "Ivanti",
+        "product": "Connect Secure",
+        "vulnerabilityName": f"{cve_id} name",
+        "shortDescription": "desc",
+        "dateAdded": date_added,
+        "dueDate": date_added,
+        **extra,
+    }
+
+
+CATALOG = {
+    "catalogVersion": "2026.10.01",
+    "vulnerabilities": [
+        _kev("CVE-2026-0003", _days_ago(1)),
+        _kev("CVE-2020-0001", "2020-01-01"),
+        _kev("CVE-2026-0002", _days_ago(3)),
+        _kev("CVE-2025-0001", _days_ago(60)),
+    ],
+}
+
+
+class TestKevMirrorIndex:
+    """鏡像排序與索引測試"""
+
+    def test_window_query_uses_sorted_dates(self, tmp_path):
+        """日期區間查詢回傳遞增排序的切片"""
+        mirror = KevMirror(tmp_path)
+        mirror.merge(CATALOG["vulnerabilities"])
+        recent = mirror.since(_days_ago(7))
+        assert [v["cveID"] for v in recent] == ["CVE-2026-0002", "CVE-2026-0003"]
+        assert [v["cveID"] for v in mirror.since("2019-12-31", "2020-01-01")] == ["CVE-2020-0001"]
+
+    def test_cve_lookup(self, tmp_path):
+        """CVE ID 索引查詢"""
+        mirror = KevMirror(tmp_path)
+        mirror.merge(CATALOG["vulnerabilities"])
+        assert "CVE-2025-0001" in mirror
+        assert "CVE-1999-0001" not in mirror
+        assert mirror.get("CVE-2026-0002")["product"] == "Connect Secure"
+
+    def test_incremental_merge(self, tmp_path):
+        """只新增項目時插入到正確位置"""
+        mirror = KevMirror(tmp_path)
+        mirror.merge(CATALOG["vulnerabilities"])
+        stats = mirror.merge(CATALOG["vulnerabilities"] + [_kev("CVE-2026-0010", _days_ago(2))])
+        assert stats == {"added": 1, "updated": 0, "removed": 0}
+        assert [v["cveID"] for v in mirror.since(_days_ago(7))] == [
+            "CVE-2026-0002",
+            "CVE-2026-0010",
+            "CVE-2026-0003",
+        ]
+
+    def test_merge_handles_removal(self, tmp_path):
+        """項目被移除時重建索引"""
+        mirror = KevMirror(tmp_path)
+        mirror.merge(CATALOG["vulnerabilities"])
+        stats = mirror.merge(CATALOG["vulnerabilities"][:2])
+        assert stats["removed"] == 2
+        assert "CVE-2026-0002" not in mirror
+        assert len(mirror) == 2
+
+
+class TestKevRefresh:
+    """鏡像更新測試"""
+
+    @pytest.mark.asyncio
+    async def test_refresh_persists_and_skips_when_fresh(self, mock_http):
+        """更新後寫入磁碟，存活時間內不再連線"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=CATALOG, headers={"ETag": '"kev1"'})
+
+        mock_http(handler)
+        first = await news._fetch_cisa_kev(7, 10)
+        second = await news._fetch_cisa_kev(30, 10)
+        assert len(requests) == 1
+        assert [v["cve_id"] for v in first] == ["CVE-2026-0003", "CVE-2026-0002"]
+        assert len(second) == 2
+
+        reloaded = KevMirror(get_kev_mirror().cache_dir)
+        assert len(reloaded) == 4
+        assert reloaded.meta["etag"] == '"kev1"'
+
+    @pytest.mark.asyncio
+    async def test_forced_refresh_sends_conditional_headers(self, mock_http):
+        """強制更新時送出條件式請求，304 保留既有資料"""
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"kev1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=CATALOG, headers={"ETag": '"kev1"'})
+
+        mock_http(handler)
+        mirror = get_kev_mirror()
+        await mirror.refresh(news.get_http_client())
+        stats = await mirror.refresh(news.get_http_client(), force=True)
+        assert seen == [None, '"kev1"']
+        assert stats["added"] == 0
+        assert len(mirror) == 4
+
+    @pytest.mark.asyncio
+    async def test_refresh_error_without_mirror(self, mock_http):
+        """無鏡像且更新失敗時回傳錯誤"""
+        mock_http(lambda request: httpx.Response(500))
+        result = await news._fetch_cisa_kev(7, 10)
+        assert result == [{"error": "CISA KEV HTTP 500"}]
+
+    @pytest.mark.asyncio
+    async def test_refresh_error_with_stale_mirror(self, mock_http):
+        """更新失敗時沿用舊鏡像，並在提供者狀態標示 stale 與資料時間"""
+        mock_http(lambda request: httpx.Response(200, json=CATALOG))
+        mirror = get_kev_mirror()
+        await mirror.refresh(news.get_http_client())
+        refreshed_at = mirror.meta["refreshed_at"]
+
+        mock_http(lambda request: httpx.Response(500))
+        result = await news.call_tool(
+            "fetch_vulnerabilities",
+            {"include_ghsa": False, "force_refresh": True, "limit": 10},
+        )
+        data = json.loads(result[0].text)
+        assert [v["cve_id"] for v in data["kev"]] == ["CVE-2026-0003", "CVE-2026-0002"]
+        kev_meta = data["_meta"]["providers"]["kev"]
+        assert kev_meta["status"] == "stale"
+        assert kev_meta["warning"] == "CISA KEV HTTP 500"
+        assert kev_meta["refreshed_at"] == refreshed_at
+        assert data["_meta"]["stale"] == {"kev": refreshed_at}
+        assert data["_meta"]["partial"] is True
+
+
+class TestFetchVulnerabilitiesKevTag:
+    """fetch_vulnerabilities 以鏡像標記 in_kev"""
+
+    @pytest.mark.asyncio
+    async def test_nvd_tagged_from_mirror(self, mock_http):
+        """NVD 結果以鏡像索引標記，不受 KEV 回顧天數限制"""
+        get_kev_mirror().merge(CATALOG["vulnerabilities"])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.host == "services.nvd.nist.gov"
+            return httpx.Response(
+                200,
+                json={
+                    "vulnerabilities": [
+                        {
+                            "cve": {
+                                "id": cve_id,
+                                "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": 9.8}}]},
+                            }
+                        }
+                        for cve_id in ["CVE-2025-0001", "CVE-2026-9999"]
+                    ]
+                },
+            )
+
+        mock_http(handler)
+        result = await news.call_tool(
+            "fetch_vulnerabilities", {"days": 7, "include_kev": False, "limit": 5}
+        )
+        data = json.loads(result[0].text)
+        tags = {v["cve_id"]: v["in_kev"] for v in data["nvd"]}
+        assert tags == {"CVE-2025-0001": True, "CVE-2026-9999": False}
@@ -0,0 +1,77 @@
+"""多關鍵字比對器測試"""
+
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import feeds
+from security_weekly_mcp.collectors.keywords import KeywordMatcher, compile_keywords
+from security_weekly_mcp.tools import news
+
+
+class TestKeywordMatcher:
+    """Aho-Corasick 比對測試"""
+
+    def test_finds_all_matches_case_insensitive(self):
+        """不分大小寫找出所有命中關鍵字，依清單順序回傳"""
+        matcher = KeywordMatcher(["Fortinet", "ivanti", "Lazarus", "CVE-2026"])
+        assert matcher.find("LAZARUS exploits Ivanti and CVE-2026-1234") == [
+            "ivanti",
+            "Lazarus",
+            "CVE-2026",
+        ]
+
+    def test_overlapping_patterns(self):
+        """重疊與互為前後綴的關鍵字都能命中"""
+        matcher = KeywordMatcher(["he", "she", "his", "hers"])
+        assert matcher.find("ushers") == ["he", "she", "hers"]
+
+    def test_cjk_keywords(self):
+        """中文關鍵字"""
+        matcher = KeywordMatcher(["勒索軟體", "台灣", "金融"])
+        assert matcher.find("台灣金融業遭勒索軟體攻擊") == ["勒索軟體", "台灣", "金融"]
+
+    def test_matches_substring_semantics(self):
+        """與原本 kw in content 的子字串語意一致"""
+        keywords = [f"vendor{i}" for i in range(150)] + ["apt29", "cisco"]
+        matcher = KeywordMatcher(keywords)
+        text = "APT29 targets Cisco devices and vendor42 / vendor7 appliances"
+        expected = [kw for kw in keywords if kw.lower() in text.lower()]
+        assert matcher.find(text) == expected
+
+    def test_empty_keywords_ignored(self):
+        """空白關鍵字會被忽略"""
+        assert not KeywordMatcher(["", "  "])
+
+    def test_compiled_matcher_cached(self):
+        """同一組關鍵字重複使用已編譯的比對器"""
+        assert compile_keywords(["a", "b"]) is compile_keywords(("a", "b"))
+
+
+class TestKeywordFilter:
+    """文章關鍵字過濾測試"""
+
+    def test_filter_reports_matches(self):
+        """過濾結果附上命中的關鍵字"""
+        now = datetime.now().isoformat()
+        entries = [
+            {"title": "Ivanti zero-day", "link": "a", "published": now, "summary": "Lazarus"},
+            {"title": "Weather", "link": "b", "published": now, "summary": "sunny"},
+        ]
+        articles = feeds.filter_entries(entries, 7, 10, ["lazarus", "ivanti"])
+        assert len(articles) == 1
+        assert articles[0]["matched_keywords"] == ["lazarus", "ivanti"]
+
+    @pytest.mark.asyncio
+    async def test_keyword_hits_meta(self, mock_http, rss_feed):
+        """fetch_security_news 統計各關鍵字命中數"""
+        rss = rss_feed(["Ivanti flaw", "Ivanti and Fortinet"])
+        mock_http(lambda request: httpx.Response(200, text=rss))
+        result = await news.call_tool(
+            "fetch_security_news",
+            {"sources": ["thehackernews"], "keywords": ["fortinet", "ivanti"]},
+        )
+        data = json.loads(result[0].text)
+        assert data["_meta"]["keyword_hits"] == {"ivanti": 2, "fortinet": 1}
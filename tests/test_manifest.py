@@ -0,0 +1,155 @@
+"""目錄清單（manifest）測試"""
+
+import json
+import os
+
+import pytest
+
+from security_weekly_mcp.collectors import weekly
+from security_weekly_mcp.storage.manifest import Manifest, file_digest, get_manifest
+from security_weekly_mcp.tools import news, report
+
+
+@pytest.fixture
+def counting_extract():
+    calls = []
+
+    def extract(path):
+        calls.append(path.name)
+        return {"title": path.read_text(encoding="utf-8")}
+
+    return extract, calls
+
+
+class TestManifest:
+    """清單驗證與更新"""
+
+    def test_hit_skips_extract(self, tmp_path, counting_extract):
+        """檔案未變更時不重新擷取"""
+        extract, calls = counting_extract
+        f = tmp_path / "a.txt"
+        f.write_text("hello", encoding="utf-8")
+
+        manifest = Manifest(tmp_path / "m.json", tmp_path)
+        first = manifest.refresh([f], extract)
+        assert first[0]["title"] == "hello"
+        assert first[0]["sha256"] == file_digest(f)
+
+        # 新實例由磁碟載入
+        second = Manifest(tmp_path / "m.json", tmp_path).refresh([f], extract)
+        assert second == first
+        assert calls == ["a.txt"]
+
+    def test_changed_file_reextracted(self, tmp_path, counting_extract):
+        """mtime 或大小變更時重新擷取"""
+        extract, calls = counting_extract
+        f = tmp_path / "a.txt"
+        f.write_text("hello", encoding="utf-8")
+        manifest = Manifest(tmp_path / "m.json", tmp_path)
+        manifest.refresh([f], extract)
+
+        f.write_text("hello world", encoding="utf-8")
+        stat = f.stat()
+        os.utime(f, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        result = manifest.refresh([f], extract)
+
+        assert result[0]["title"] == "hello world"
+        assert calls == ["a.txt", "a.txt"]
+
+    def test_extract_error_not_stored(self, tmp_path):
+        """擷取失敗回傳錯誤且不寫入清單"""
+
+        def broken(path):
+            raise ValueError("bad")
+
+        f = tmp_path / "a.txt"
+        f.write_text("x", encoding="utf-8")
+        manifest = Manifest(tmp_path / "m.json", tmp_path)
+
+        assert manifest.refresh([f], broken) == [{"error": "無法解析檔案"}]
+        assert manifest.lookup(f) is None
+
+    def test_retain_prunes_missing(self, tmp_path, counting_extract):
+        """移除已不存在的檔案"""
+        extract, _ = counting_extract
+        a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+        a.write_text("a", encoding="utf-8")
+        b.write_text("b", encoding="utf-8")
+        manifest = Manifest(tmp_path / "m.json", tmp_path)
+        manifest.refresh([a, b], extract)
+
+        manifest.retain([a])
+        stored = json.loads((tmp_path / "m.json").read_text(encoding="utf-8"))
+        assert list(stored["files"]) == ["a.txt"]
+
+    def test_other_directory_rebuilds(self, tmp_path, counting_extract):
+        """清單目錄不同時不沿用舊項目"""
+        extract, calls = counting_extract
+        f = tmp_path / "a.txt"
+        f.write_text("a", encoding="utf-8")
+        Manifest(tmp_path / "m.json", tmp_path).refresh([f], extract)
+
+        Manifest(tmp_path / "m.json", tmp_path / "other").refresh([f], extract)
+        assert calls == ["a.txt", "a.txt"]
+
+
+class TestListingTools:
+    """列出工具使用清單"""
+
+    @pytest.mark.asyncio
+    async def test_list_weekly_data_uses_manifest(self, tmp_path, monkeypatch):
+        """第二次列出時不再讀取快照"""
+        raw_dir = tmp_path / "raw"
+        monkeypatch.setenv("SECURITY_WEEKLY_RAW_DIR", str(raw_dir))
+        metadata = {"week": "2026-W41", "collected_at": "2026-10-12T08:00:00", "stats": {"x": 1}}
+        weekly.write_snapshot(weekly.snapshot_path(raw_dir, "2026-W41"), metadata, {})
+
+        reads = []
+        original = weekly.read_metadata
+
+        def counting(path):
+            reads.append(path.name)
+            return original(path)
+
+        monkeypatch.setattr(weekly, "read_metadata", counting)
+
+        for _ in range(2):
+            result = await news.call_tool("list_weekly_data", {})
+            data = json.loads(result[0].text)
+            assert data["available_weeks"][0]["week"] == "2026-W41"
+            assert data["available_weeks"][0]["stats"] == {"x": 1}
+        assert reads == ["2026-W41.jsonl.gz"]
+
+    @pytest.mark.asyncio
+    async def test_collect_records_manifest(self, tmp_path, monkeypatch):
+        """寫入快照時同步更新清單"""
+        raw_dir = tmp_path / "raw"
+        monkeypatch.setenv("SECURITY_WEEKLY_RAW_DIR", str(raw_dir))
+
+        async def fake(name, arguments):
+            return {}
+
+        monkeypatch.setattr(news, "_tool_json", fake)
+        summary = await news.collect_weekly_data("2026-W41")
+
+        entry = get_manifest("raw", raw_dir).lookup(raw_dir / "2026-W41.jsonl.gz")
+        assert entry is not None
+        assert entry["stats"] == summary["stats"]
+        assert entry["sha256"] == file_digest(raw_dir / "2026-W41.jsonl.gz")
+
+    @pytest.mark.asyncio
+    async def test_list_reports_uses_manifest(self, tmp_path, monkeypatch):
+        """週報清單由清單提供，檔案變更後更新"""
+        monkeypatch.setattr(report, "OUTPUT_DIR", tmp_path)
+        f = tmp_path / "SEC-WEEKLY-2026-41.json"
+        f.write_text(json.dumps({"report_id": "SEC-WEEKLY-2026-41"}), encoding="utf-8")
+        (tmp_path / "SEC-WEEKLY-2026-40.json").write_text("{broken", encoding="utf-8")
+
+        result = await report.call_tool("list_reports", {})
+        reports = json.loads(result[0].text)
+        assert reports[0]["report_id"] == "SEC-WEEKLY-2026-41"
+        assert reports[1] == {"filename": "SEC-WEEKLY-2026-40.json", "error": "無法解析檔案"}
+
+        f.write_text(json.dumps({"report_id": "SEC-WEEKLY-2026-41b"}), encoding="utf-8")
+        result = await report.call_tool("list_reports", {})
+        assert json.loads(result[0].text)[0]["report_id"] == "SEC-WEEKLY-2026-41b"
@@ -0,0 +1,130 @@
+"""fetch_security_news 整體時限、進度通知與排程順序測試"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+
+from security_weekly_mcp.tools import news
+
+EMPTY_RSS = '<?xml version="1.0"?><rss version="2.0"><channel></channel></rss>'
+
+
+class FakeSession:
+    """記錄進度通知的假 session"""
+
+    def __init__(self):
+        self.notifications = []
+
+    async def send_progress_notification(self, token, progress, total=None, message=None, **kw):
+        self.notifications.append((token, progress, total, message))
+
+
+class TestDeadline:
+    """整體時限測試"""
+
+    @pytest.mark.asyncio
+    async def test_partial_results_with_pending(self, mock_http):
+        """逾時回傳已完成的來源，未完成者列於 _pending"""
+
+        async def handler(request):
+            if "krebsonsecurity" in request.url.host:
+                await asyncio.sleep(5)
+            return httpx.Response(200, text=EMPTY_RSS)
+
+        mock_http(handler)
+        result = await news.call_tool(
+            "fetch_security_news", {"sources": ["krebs", "ithome"], "deadline": 0.5}
+        )
+        data = json.loads(result[0].text)
+        assert data["_pending"] == ["Krebs on Security"]
+        assert data["_meta"]["partial"] is True
+        assert "iThome 資安" in data
+        assert "Krebs on Security" not in data
+
+    @pytest.mark.asyncio
+    async def test_no_deadline_meta_by_default(self, mock_http):
+        """未指定時限時不附加時限資訊"""
+        mock_http(lambda request: httpx.Response(200, text=EMPTY_RSS))
+        result = await news.call_tool("fetch_security_news", {"sources": ["krebs"]})
+        data = json.loads(result[0].text)
+        assert "partial" not in data["_meta"]
+        assert "_pending" not in data
+
+
+class TestProgressAndOrder:
+    """進度通知與排程順序測試"""
+
+    @pytest.mark.asyncio
+    async def test_progress_per_source(self, mock_http):
+        """每完成一個來源送出一次進度通知"""
+        mock_http(lambda request: httpx.Response(200, text=EMPTY_RSS))
+        session = FakeSession()
+        ctx = SimpleNamespace(
+            request_id=7, meta=SimpleNamespace(progressToken="tok"), session=session
+        )
+        token = request_ctx.set(ctx)
+        try:
+            await news.call_tool("fetch_security_news", {"sources": ["krebs", "ithome"]})
+        finally:
+            request_ctx.reset(token)
+
+        assert [n[1:3] for n in session.notifications] == [(1, 2), (2, 2)]
+        assert all(n[0] == "tok" for n in session.notifications)
+
+    @pytest.mark.asyncio
+    async def test_critical_sources_first(self, mock_http):
+        """critical 來源最先發出請求"""
+        hosts = []
+
+        def handler(request):
+            hosts.append(request.url.host)
+            return httpx.Response(200, text=EMPTY_RSS)
+
+        mock_http(handler)
+        await news.call_tool("fetch_security_news", {"sources": ["krebs", "cisa alerts"]})
+        assert hosts[0] == "www.cisa.gov"
+
+    @pytest.mark.asyncio
+    async def test_output_in_schedule_order(self):
+        """結果依排程順序輸出，與完成順序無關"""
+
+        def provider(name, delay):
+            async def run():
+                await asyncio.sleep(delay)
+                return [{"title": name}]
+
+            return run
+
+        results, meta = await news._run_providers(
+            {"slow": provider("slow", 0.05), "fast": provider("fast", 0)}, None
+        )
+        assert list(results) == ["slow", "fast"]
+        assert list(meta) == ["slow", "fast"]
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_identical_output(self, mock_http, rss_feed):
+        """相同輸入的兩次呼叫輸出相同（即使來源完成順序不同）"""
+        delays = iter([0.05, 0, 0, 0.05])
+        # 預先產生內容，避免兩次呼叫間的相對發布時間不同
+        feeds = {
+            host: rss_feed([f"{host} news"]) for host in ("www.cisa.gov", "krebsonsecurity.com")
+        }
+
+        async def handler(request):
+            await asyncio.sleep(next(delays))
+            return httpx.Response(200, text=feeds[request.url.host])
+
+        mock_http(handler)
+        args = {"sources": ["krebs", "cisa alerts"], "dedup": False}
+        outputs = []
+        for _ in range(2):
+            data = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+            data.pop("_meta")
+            outputs.append(data)
+        assert list(outputs[0]) == ["CISA Alerts", "Krebs on Security"]
+        assert outputs[0] == outputs[1]
+        assert list(outputs[0]) == list(outputs[1])
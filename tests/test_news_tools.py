@@ -3,6 +3,7 @@
 import json
 import pytest
 
+from security_weekly_mcp.config import CompiledQuery, build_search_templates, template_fields
 from security_weekly_mcp.tools import news
 
 
@@ -170,3 +171,50 @@ class TestSuggestSearches:
         # 歷史搜尋不應該有 fetch_targets
         assert len(data["fetch_targets"]) == 0
         assert "fetch_targets_note" in data
+
+    @pytest.mark.asyncio
+    async def test_missing_context_skipped(self):
+        """未提供變數的查詢直接略過"""
+        result = await news.call_tool("suggest_searches", {"category": "vulnerabilities"})
+        queries = [s["query"] for s in json.loads(result[0].text)["web_searches"]]
+        assert queries
+        assert not any("{" in q for q in queries)
+
+    @pytest.mark.asyncio
+    async def test_repeated_calls_memoized(self):
+        """相同參數重複呼叫由快取回應"""
+        news.reset_config_cache()
+        arguments = {
+            "category": "all",
+            "period_start": "2025-06-01",
+            "period_end": "2025-06-07",
+            "context": {"cve_id": "CVE-2026-1234"},
+        }
+        first = await news.call_tool("suggest_searches", arguments)
+        second = await news.call_tool("suggest_searches", dict(arguments))
+
+        assert first[0].text == second[0].text
+        info = news._render_suggestions.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+
+class TestCompiledTemplates:
+    """搜尋模板預先編譯"""
+
+    def test_template_fields(self):
+        """解析模板所需的變數"""
+        assert template_fields("CVE {year}-{month} {cve_id!r}") == {"year", "month", "cve_id"}
+        assert template_fields("{item.name} {rows[0]:{width}}") == {"item", "rows", "width"}
+        assert template_fields("site:twcert.org.tw") == frozenset()
+
+    @pytest.mark.parametrize("template", ["CVE {} {year}", "broken {year"])
+    def test_invalid_template_rejected(self, template):
+        """位置參數或格式錯誤的模板無法載入"""
+        with pytest.raises(ValueError, match="模板"):
+            build_search_templates({"news": {"queries": [{"query": template}]}})
+
+    def test_render(self):
+        """變數齊全才產生查詢"""
+        query = CompiledQuery({"query": "{cve_id} patch {year}"})
+        assert query.render({"year": "2026"}) is None
+        assert query.render({"year": "2026", "cve_id": "CVE-1"}) == "CVE-1 patch 2026"
@@ -0,0 +1,286 @@
+"""NVD 分頁收集器測試（使用本地替身 HTTP 伺服器）"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors import nvd
+from security_weekly_mcp.collectors.rate_limit import SlidingWindowLimiter
+
+
+def _cve(index: int, score: float) -> dict:
+    return {
+        "cve": {
+            "id": f"CVE-2026-{index:04d}",
+            "published": f"2026-10-{1 + index % 9:02d}T00:00:00.000",
+            "descriptions": [{"lang": "en", "value": f"issue {index}"}],
+            "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": score}}]},
+        }
+    }
+
+
+# 替身資料：CRITICAL 5 筆、HIGH 7 筆
+DATASET = {
+    "CRITICAL": [_cve(i, 9.8) for i in range(5)],
+    "HIGH": [_cve(100 + i, 7.5) for i in range(7)],
+}
+
+
+class StandInNvd:
+    """本地替身 NVD 伺服器"""
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.fail_first: set[int] = set()  # 這些 startIndex 第一次回傳 503
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                stand_in.requests.append(params)
+                start = int(params.get("startIndex", 0))
+                if start in stand_in.fail_first:
+                    stand_in.fail_first.discard(start)
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                per_page = int(params.get("resultsPerPage", 2000))
+                items = DATASET.get(params.get("cvssV3Severity"), [])
+                body = json.dumps(
+                    {
+                        "resultsPerPage": per_page,
+                        "startIndex": start,
+                        "totalResults": len(items),
+                        "vulnerabilities": items[start : start + per_page],
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/rest/json/cves/2.0"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+
+@pytest.fixture
+def stand_in():
+    server = StandInNvd()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _client(stand_in: StandInNvd, client: httpx.AsyncClient, **kwargs) -> nvd.NvdClient:
+    return nvd.NvdClient(
+        client,
+        api_key="",
+        base_url=stand_in.url,
+        limiter=SlidingWindowLimiter(100, 1.0),
+        backoff=0.01,
+        **kwargs,
+    )
+
+
+class TestSlidingWindowLimiter:
+    """滑動視窗速率限制器測試"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_throttle(self):
+        """視窗內額度立即放行，超出後等待最早的請求移出視窗"""
+        limiter = SlidingWindowLimiter(2, 0.2)
+        started = time.monotonic()
+        await limiter.acquire()
+        await limiter.acquire()
+        assert time.monotonic() - started < 0.05
+        await limiter.acquire()
+        assert time.monotonic() - started >= 0.19
+
+    @pytest.mark.asyncio
+    async def test_never_exceeds_limit_in_any_window(self):
+        """任意連續視窗內的放行次數不超過上限（不會有首個週期的加倍突發）"""
+        now = [0.0]
+
+        async def advance(seconds):
+            now[0] += seconds
+
+        limiter = SlidingWindowLimiter(5, 30.0, clock=lambda: now[0])
+        sent = []
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(asyncio, "sleep", advance)
+            for _ in range(20):
+                await limiter.acquire()
+                sent.append(now[0])
+        for t in sent:
+            assert sum(1 for other in sent if t <= other < t + 30.0) <= 5
+        assert sent[5] == 30.0
+
+
+class TestNvdPagination:
+    """分頁與並行抓取測試"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_all_pages(self, stand_in):
+        """讀取 totalResults 後抓取全部分頁"""
+        async with httpx.AsyncClient() as client:
+            collector = _client(stand_in, client, results_per_page=2)
+            params = {"cvssV3Severity": "HIGH"}
+            items = [i async for i in collector.iter_query(params)]
+
+        assert len(items) == 7
+        assert sorted(int(r["startIndex"]) for r in stand_in.requests) == [0, 2, 4, 6]
+
+    @pytest.mark.asyncio
+    async def test_retries_503(self, stand_in):
+        """503 以退避重試"""
+        stand_in.fail_first = {0, 2}
+        async with httpx.AsyncClient() as client:
+            collector = _client(stand_in, client, results_per_page=2)
+            items = [i async for i in collector.iter_query({"cvssV3Severity": "CRITICAL"})]
+
+        assert len(items) == 5
+        assert len(stand_in.requests) == 5  # 3 頁 + 2 次重試
+
+    @pytest.mark.asyncio
+    async def test_retry_exhausted_raises(self, stand_in):
+        """重試用盡後拋出 HTTP 錯誤"""
+        stand_in.fail_first = {0}
+        async with httpx.AsyncClient() as client:
+            collector = _client(stand_in, client, max_retries=0)
+            with pytest.raises(httpx.HTTPStatusError):
+                [i async for i in collector.iter_query({})]
+
+    @pytest.mark.asyncio
+    async def test_retry_backoff_jittered(self, stand_in, monkeypatch):
+        """重試等待在 backoff * 2^n 的 50%～100% 之間隨機抖動"""
+        ranges = []
+
+        def uniform(low, high):
+            ranges.append((low, high))
+            return low
+
+        monkeypatch.setattr(nvd.random, "uniform", uniform)
+        stand_in.fail_first = {0}
+        async with httpx.AsyncClient() as client:
+            collector = _client(stand_in, client, results_per_page=10)
+            [i async for i in collector.iter_query({"cvssV3Severity": "CRITICAL"})]
+
+        assert ranges == [(0.005, 0.01)]
+
+    @pytest.mark.asyncio
+    async def test_severities_fan_out(self, stand_in):
+        """多個嚴重程度分別查詢並合併"""
+        end = datetime(2026, 10, 10)
+        async with httpx.AsyncClient() as client:
+            collector = _client(stand_in, client, results_per_page=3)
+            items = [
+                i
+                async for i in collector.iter_cves(
+                    end - timedelta(days=7), end, severities=nvd.severities_for(7.0)
+                )
+            ]
+
+        assert len({i["cve"]["id"] for i in items}) == 12
+        assert {r["cvssV3Severity"] for r in stand_in.requests} == {"CRITICAL", "HIGH"}
+
+
+class TestHelpers:
+    """輔助函式測試"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limiters_shared_per_key(self):
+        """同一事件迴圈內公開與 API Key 限制器各自共用，不互相捨棄"""
+        public = nvd.get_rate_limiter(None)
+        keyed = nvd.get_rate_limiter("key")
+        assert public is not keyed
+        assert nvd.get_rate_limiter(None) is public
+        assert nvd.get_rate_limiter("other") is keyed
+
+    def test_severities_for(self):
+        """依最低分數選擇嚴重程度"""
+        assert nvd.severities_for(9.0) == ["CRITICAL"]
+        assert nvd.severities_for(7.0) == ["CRITICAL", "HIGH"]
+
+    def test_date_windows_split(self):
+        """超過 120 天的範圍會切段"""
+        start = datetime(2026, 1, 1)
+        windows = nvd.date_windows(start, start + timedelta(days=300))
+        assert len(windows) == 3
+        assert windows[0][1] == windows[1][0]
+        assert all(b - a <= nvd.MAX_DATE_RANGE for a, b in windows)
+
+
+class TestCpeParsing:
+    """CPE 受影響產品解析"""
+
+    def test_parse_cpe(self):
+        """取出廠商與產品，處理跳脫字元與萬用字元"""
+        assert nvd.parse_cpe("cpe:2.3:o:fortinet:fortios:7.2.0:*:*:*:*:*:*:*") == (
+            "fortinet",
+            "fortios",
+        )
+        assert nvd.parse_cpe(r"cpe:2.3:a:acme:web\:admin:1.0:*:*:*:*:*:*:*") == (
+            "acme",
+            "web:admin",
+        )
+        assert nvd.parse_cpe("cpe:2.3:a:*:*:*:*:*:*:*:*:*:*") is None
+        assert nvd.parse_cpe("not-a-cpe") is None
+
+    def test_normalize_cve_affected_products(self):
+        """僅收錄 vulnerable 的 CPE，依出現順序去重"""
+        item = _cve(1, 9.8)
+        item["cve"]["configurations"] = [
+            {
+                "nodes": [
+                    {
+                        "cpeMatch": [
+                            {
+                                "vulnerable": True,
+                                "criteria": "cpe:2.3:o:fortinet:fortios:7.2.0:*:*:*:*:*:*:*",
+                            },
+                            {
+                                "vulnerable": True,
+                                "criteria": "cpe:2.3:o:fortinet:fortios:7.4.0:*:*:*:*:*:*:*",
+                            },
+                            {
+                                "vulnerable": False,
+                                "criteria": "cpe:2.3:h:fortinet:fortigate_100f:-:*:*:*:*:*:*:*",
+                            },
+                            {
+                                "vulnerable": True,
+                                "criteria": "cpe:2.3:a:fortinet:fortiproxy:*:*:*:*:*:*:*:*",
+                            },
+                        ]
+                    }
+                ]
+            }
+        ]
+        vuln = nvd.normalize_cve(item)
+        assert vuln["cpes"] == ["fortinet:fortios", "fortinet:fortiproxy"]
+        assert vuln["affected_products"] == ["fortinet fortios", "fortinet fortiproxy"]
+        assert nvd.normalize_cve(_cve(2, 5.0))["affected_products"] == []
+
+    @pytest.mark.asyncio
+    async def test_iter_normalized_batches(self):
+        """依批次大小分批正規化"""
+
+        async def items():
+            for i in range(5):
+                yield _cve(i, 7.0)
+
+        batches = [batch async for batch in nvd.iter_normalized(items(), batch_size=2)]
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert batches[0][0]["cve_id"] == "CVE-2026-0000"
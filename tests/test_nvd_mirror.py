@@ -0,0 +1,336 @@
+"""NVD 本地鏡像與 get_cve 工具測試"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors.nvd import NvdClient
+from security_weekly_mcp.collectors.rate_limit import SlidingWindowLimiter
+from security_weekly_mcp.storage import nvd_mirror
+from security_weekly_mcp.storage.files import get_cache_dir
+from security_weekly_mcp.storage.nvd_mirror import get_nvd_mirror, normalize_cve_id
+from security_weekly_mcp.tools import news
+
+
+def _item(cve_id: str, score: float = 9.8, modified: str = "2026-10-01T00:00:00.000") -> dict:
+    return {
+        "cve": {
+            "id": cve_id,
+            "published": "2026-09-01T00:00:00.000",
+            "lastModified": modified,
+            "descriptions": [{"lang": "en", "value": f"{cve_id} issue"}],
+            "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": score}}]},
+        }
+    }
+
+
+def _record(
+    cve_id: str,
+    score: float = 9.8,
+    modified: str = "2026-10-01T00:00:00.000",
+    cpes: list[str] | None = None,
+    published: str = "2026-09-01T00:00:00.000",
+) -> dict:
+    return {
+        "cve_id": cve_id,
+        "cvss": score,
+        "published": published,
+        "last_modified": modified,
+        "cpes": cpes or [],
+    }
+
+
+def _nvd_handler(items: list[dict], requests: list[httpx.Request]):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        wanted = request.url.params.get("cveId")
+        page = [i for i in items if wanted is None or i["cve"]["id"] == wanted]
+        return httpx.Response(
+            200, json={"totalResults": len(page), "resultsPerPage": 2000, "vulnerabilities": page}
+        )
+
+    return handler
+
+
+def _client(items: list[dict], requests: list[httpx.Request]) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(_nvd_handler(items, requests)))
+
+
+class TestMirrorStorage:
+    """鏡像寫入與查詢"""
+
+    def test_get_and_get_many(self):
+        """單筆與批次查詢"""
+        mirror = get_nvd_mirror()
+        mirror.upsert([_record(f"CVE-2026-{i:04d}") for i in range(1200)])
+
+        assert mirror.get("CVE-2026-0007")["cvss"] == 9.8
+        assert mirror.get("CVE-2026-9999") is None
+        ids = [f"CVE-2026-{i:04d}" for i in range(0, 1200, 2)] + ["CVE-2026-9999"]
+        found = mirror.get_many(ids)
+        assert len(found) == 600
+        assert "CVE-2026-9999" not in found
+
+    def test_older_record_does_not_overwrite(self):
+        """較舊的 lastModified 不覆蓋較新的紀錄"""
+        mirror = get_nvd_mirror()
+        mirror.upsert([_record("CVE-2026-0001", 9.8, "2026-10-02T00:00:00.000")])
+        mirror.upsert([_record("CVE-2026-0001", 5.0, "2026-10-01T00:00:00.000")])
+        assert mirror.get("CVE-2026-0001")["cvss"] == 9.8
+
+    def test_upsert_counts_changed_rows(self):
+        """只計入實際新增或更新的紀錄"""
+        mirror = get_nvd_mirror()
+        records = [_record("CVE-2026-0001"), _record("CVE-2026-0002")]
+        assert mirror.upsert(records) == 2
+        assert mirror.upsert(records) == 0
+        updated = _record("CVE-2026-0002", 5.0, "2026-10-02T00:00:00.000")
+        assert mirror.upsert([*records, updated]) == 1
+
+    def test_normalize_cve_id(self):
+        """CVE ID 標準化與格式檢查"""
+        assert normalize_cve_id(" cve-2026-12345 ") == "CVE-2026-12345"
+        assert normalize_cve_id("CVE-2026-1") is None
+        assert normalize_cve_id("GHSA-xxxx") is None
+
+
+class TestVendorIndex:
+    """廠商反向索引"""
+
+    def _seed(self):
+        get_nvd_mirror().upsert(
+            [
+                _record("CVE-2026-0001", 9.8, cpes=["fortinet:fortios", "fortinet:fortiproxy"]),
+                _record("CVE-2026-0002", 7.5, cpes=["fortinet:fortios"]),
+                _record(
+                    "CVE-2026-0003", 9.1, cpes=["fortinet:fortiweb"], published="2026-06-01T00:00"
+                ),
+                _record("CVE-2026-0004", 10.0, cpes=["paloaltonetworks:pan-os"]),
+            ]
+        )
+
+    def test_search_by_vendor(self):
+        """依廠商查詢，依 CVSS 排序且不重複"""
+        self._seed()
+        results = get_nvd_mirror().search("Fortinet", min_cvss=9.0)
+        assert [r["cve_id"] for r in results] == ["CVE-2026-0001", "CVE-2026-0003"]
+        assert get_nvd_mirror().search("Palo Alto Networks")[0]["cve_id"] == "CVE-2026-0004"
+
+    def test_vendor_separators_ignored(self):
+        """廠商與產品比對忽略空白、底線與連字號"""
+        self._seed()
+        mirror = get_nvd_mirror()
+        for vendor in ("paloaltonetworks", "palo_alto_networks", "Palo-Alto Networks"):
+            assert [r["cve_id"] for r in mirror.search(vendor, product="PAN OS")] == [
+                "CVE-2026-0004"
+            ]
+
+    def test_search_filters(self):
+        """產品與發布日期篩選"""
+        self._seed()
+        mirror = get_nvd_mirror()
+        assert [r["cve_id"] for r in mirror.search("fortinet", product="FortiOS")] == [
+            "CVE-2026-0001",
+            "CVE-2026-0002",
+        ]
+        assert [r["cve_id"] for r in mirror.search("fortinet", until="2026-06-01")] == [
+            "CVE-2026-0003"
+        ]
+        assert len(mirror.search("fortinet", since="2026-07-01")) == 2
+
+    def test_update_rebuilds_index(self):
+        """CVE 更新後舊的索引列會移除"""
+        self._seed()
+        mirror = get_nvd_mirror()
+        mirror.upsert(
+            [_record("CVE-2026-0002", 7.5, "2026-10-05T00:00:00.000", cpes=["acme:widget"])]
+        )
+        assert "CVE-2026-0002" not in [r["cve_id"] for r in mirror.search("fortinet")]
+        assert mirror.search("acme")[0]["cve_id"] == "CVE-2026-0002"
+
+        # 較舊的紀錄不會改動索引
+        mirror.upsert([_record("CVE-2026-0002", 7.5, cpes=["fortinet:fortios"])])
+        assert [r["cve_id"] for r in mirror.search("fortinet", product="fortios")] == [
+            "CVE-2026-0001"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_search_cves_tool(self):
+        """search_cves 工具"""
+        self._seed()
+        result = await news.call_tool(
+            "search_cves", {"vendor": "Fortinet", "min_cvss": 9.0, "since": "2026-07-01"}
+        )
+        data = json.loads(result[0].text)
+        assert data["count"] == 1
+        assert data["results"][0]["cve_id"] == "CVE-2026-0001"
+        assert data["results"][0]["in_kev"] is False
+
+        result = await news.call_tool("search_cves", {"vendor": "fortinet", "since": "Q3"})
+        assert "日期格式錯誤" in result[0].text
+
+
+class TestSchemaMigration:
+    """舊版鏡像的廠商索引重建"""
+
+    def _legacy_mirror(self, records: list[dict]):
+        """建立尚未記錄資料庫版本的鏡像（索引為舊比對鍵）"""
+        get_cache_dir().mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(get_cache_dir() / "nvd.sqlite3")
+        conn.executescript(nvd_mirror._SCHEMA)
+        with conn:
+            conn.executemany(
+                "INSERT INTO cves (cve_id, published, last_modified, cvss, record) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (r["cve_id"], r["published"], r["last_modified"], r["cvss"], json.dumps(r))
+                    for r in records
+                ],
+            )
+            conn.execute(
+                "INSERT INTO cve_products VALUES ('palo_alto_networks', 'pan-os', 'CVE-2026-0001')"
+            )
+        conn.close()
+
+    def test_rebuilds_index_from_records(self):
+        """開啟舊版鏡像時由紀錄重建索引"""
+        self._legacy_mirror([_record("CVE-2026-0001", cpes=["paloaltonetworks:pan-os"])])
+        mirror = get_nvd_mirror()
+        assert [r["cve_id"] for r in mirror.search("Palo Alto Networks")] == ["CVE-2026-0001"]
+        conn = mirror.connect()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+        conn.close()
+        assert mirror.index_incomplete is False
+
+    @pytest.mark.asyncio
+    async def test_records_without_cpes_need_full_sync(self):
+        """紀錄缺少 cpes 時提示重新批次載入，完成後清除標記"""
+        legacy = _record("CVE-2026-0001")
+        del legacy["cpes"]
+        self._legacy_mirror([legacy])
+
+        result = await news.call_tool("search_cves", {"vendor": "Palo Alto Networks"})
+        data = json.loads(result[0].text)
+        assert data["count"] == 0
+        assert data["mirror"]["index_incomplete"] is True
+        assert "--full" in data["hint"]
+
+        mirror = get_nvd_mirror()
+        limiter = SlidingWindowLimiter(1000, 1.0)
+        async with _client([_item("CVE-2026-0001")], []) as client:
+            nvd = NvdClient(client, base_url="http://nvd.test", limiter=limiter)
+            await mirror.sync(nvd, full=True, start=datetime.now() - timedelta(days=10))
+        assert mirror.index_incomplete is False
+        result = await news.call_tool("search_cves", {"vendor": "fortinet"})
+        assert "hint" not in json.loads(result[0].text)
+
+
+class TestMirrorSync:
+    """批次載入與增量同步"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_then_delta(self):
+        """首次依發布日期載入，之後以 lastModStartDate 增量同步"""
+        mirror = get_nvd_mirror()
+        requests = []
+        limiter = SlidingWindowLimiter(1000, 1.0)
+        async with _client([_item("CVE-2026-0001"), _item("CVE-2026-0002")], requests) as client:
+            nvd = NvdClient(client, base_url="http://nvd.test", limiter=limiter)
+            stats = await mirror.sync(nvd, start=datetime.now() - timedelta(days=10))
+        assert stats == {"mode": "bulk", "stored": 2, "count": 2}
+        assert all("pubStartDate" in r.url.params for r in requests)
+        assert not mirror.is_due()
+
+        requests.clear()
+        updated = _item("CVE-2026-0001", 7.5, "2026-10-05T00:00:00.000")
+        async with _client([updated], requests) as client:
+            stats = await mirror.sync(
+                NvdClient(client, base_url="http://nvd.test", limiter=limiter)
+            )
+        assert stats["mode"] == "delta"
+        assert len(requests) == 1
+        assert "lastModStartDate" in requests[0].url.params
+        assert mirror.get("CVE-2026-0001")["cvss"] == 7.5
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_keeps_last_sync(self):
+        """同步失敗時不更新同步時間"""
+        mirror = get_nvd_mirror()
+
+        async def fail(request):
+            return httpx.Response(500)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(fail)) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await mirror.sync(NvdClient(client, base_url="http://nvd.test", max_retries=0))
+        assert mirror.last_sync is None
+
+    @pytest.mark.asyncio
+    async def test_failed_bulk_resumes_from_last_window(self):
+        """批次載入中途失敗時，下次從最後完成的區段接續"""
+        mirror = get_nvd_mirror()
+        start = datetime.now() - timedelta(days=300)
+        limiter = SlidingWindowLimiter(1000, 1.0)
+        requests = []
+        handler = _nvd_handler([_item("CVE-2026-0001")], requests)
+
+        async def fail_after_first(request):
+            if requests:
+                return httpx.Response(500)
+            return await handler(request)
+
+        transport = httpx.MockTransport(fail_after_first)
+        async with httpx.AsyncClient(transport=transport) as client:
+            nvd = NvdClient(client, base_url="http://nvd.test", limiter=limiter, max_retries=0)
+            with pytest.raises(httpx.HTTPStatusError):
+                await mirror.sync(nvd, start=start)
+        assert mirror.last_sync is None
+        first_window_end = requests[0].url.params["pubEndDate"]
+
+        requests.clear()
+        async with _client([_item("CVE-2026-0001")], requests) as client:
+            nvd = NvdClient(client, base_url="http://nvd.test", limiter=limiter)
+            stats = await mirror.sync(nvd, start=start)
+        assert stats == {"mode": "bulk", "stored": 0, "count": 1}
+        # 300 天分為三個區段，第一段已完成
+        assert len(requests) == 2
+        assert requests[0].url.params["pubStartDate"][:19] == first_window_end[:19]
+        assert mirror.last_sync is not None
+
+
+class TestGetCveTool:
+    """get_cve 工具"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_lookup_offline(self):
+        """由鏡像批次查詢，保留請求順序並標示缺漏與格式錯誤"""
+        get_nvd_mirror().upsert([_record("CVE-2026-0001"), _record("CVE-2026-0002", 7.0)])
+        result = await news.call_tool(
+            "get_cve",
+            {"cve_ids": ["cve-2026-0002", "CVE-2026-0001", "CVE-2026-0404", "nope"]},
+        )
+        data = json.loads(result[0].text)
+
+        assert [r["cve_id"] for r in data["results"]] == ["CVE-2026-0002", "CVE-2026-0001"]
+        assert data["results"][0]["in_kev"] is False
+        assert data["missing"] == ["CVE-2026-0404"]
+        assert data["invalid"] == ["nope"]
+        assert data["mirror"]["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_missing(self, mock_http):
+        """鏡像缺漏時向 NVD 查詢並寫入鏡像"""
+        requests = []
+        mock_http(_nvd_handler([_item("CVE-2026-0404")], requests))
+        result = await news.call_tool(
+            "get_cve", {"cve_ids": ["CVE-2026-0404", "CVE-2026-0500"], "fetch_missing": True}
+        )
+        data = json.loads(result[0].text)
+
+        assert [r["cve_id"] for r in data["results"]] == ["CVE-2026-0404"]
+        assert data["missing"] == ["CVE-2026-0500"]
+        assert get_nvd_mirror().get("CVE-2026-0404") is not None
+        assert {r.url.params["cveId"] for r in requests} == {"CVE-2026-0404", "CVE-2026-0500"}
@@ -0,0 +1,63 @@
+"""MCP Server 工具註冊表測試"""
+
+import pytest
+
+from security_weekly_mcp import server
+from security_weekly_mcp.tools import news
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    """每個測試使用新的註冊表"""
+    server.reset_registry()
+    yield
+    server.reset_registry()
+
+
+class TestToolRegistry:
+    """工具註冊表測試"""
+
+    @pytest.mark.asyncio
+    async def test_registry_covers_all_modules(self):
+        """註冊表包含所有模組的工具"""
+        registry = await server.get_registry()
+        for module in server.TOOL_MODULES:
+            for tool in await module.list_tools():
+                assert registry[tool.name][1] is module
+
+    @pytest.mark.asyncio
+    async def test_registry_built_once(self, monkeypatch):
+        """註冊表只建立一次，後續呼叫不再重建工具定義"""
+        await server.get_registry()
+
+        calls = []
+        original = news.list_tools
+
+        async def counting_list_tools():
+            calls.append(1)
+            return await original()
+
+        monkeypatch.setattr(news, "list_tools", counting_list_tools)
+        await server.list_tools()
+        await server.call_tool("list_news_sources", {})
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_list_tools_matches_registry(self):
+        """list_tools 回傳註冊表中的工具定義"""
+        tools = await server.list_tools()
+        registry = await server.get_registry()
+        assert [t.name for t in tools] == list(registry)
+
+    @pytest.mark.asyncio
+    async def test_call_unknown_tool(self):
+        """呼叫未知工具"""
+        result = await server.call_tool("not_exist_tool", {})
+        assert "未知工具" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_duplicate_tool_name(self, monkeypatch):
+        """重複的工具名稱會被拒絕"""
+        monkeypatch.setattr(server, "TOOL_MODULES", [news, news])
+        with pytest.raises(ValueError, match="工具名稱重複"):
+            await server.build_registry()
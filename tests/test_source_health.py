@@ -0,0 +1,173 @@
+"""來源健康狀態、自適應逾時與斷路器測試"""
+
+import json
+
+import httpx
+import pytest
+
+from security_weekly_mcp.storage import source_health
+from security_weekly_mcp.storage.source_health import SourceHealth, get_source_health
+from security_weekly_mcp.tools import news
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def health(tmp_path):
+    return SourceHealth(tmp_path / "health.json", clock=FakeClock())
+
+
+class TestAdaptiveTimeout:
+    """自適應逾時測試"""
+
+    def test_default_without_samples(self, health):
+        """樣本不足時使用預設逾時"""
+        health.record_success("src", 200)
+        assert health.timeout_for("src") == source_health.DEFAULT_TIMEOUT
+
+    def test_derived_from_p95(self, health):
+        """逾時取 p95 × 倍數，並受上下限約束"""
+        for ms in [100, 200, 300, 400, 2000]:
+            health.record_success("fast", ms)
+        assert health.timeout_for("fast") == 6.0
+
+        for _ in range(5):
+            health.record_success("tiny", 10)
+        assert health.timeout_for("tiny") == source_health.MIN_TIMEOUT
+
+        for _ in range(5):
+            health.record_success("slow", 25_000)
+        assert health.timeout_for("slow") == source_health.MAX_TIMEOUT
+
+
+class TestCircuitBreaker:
+    """斷路器測試"""
+
+    def test_opens_after_threshold_and_recovers(self, health):
+        """連續失敗達門檻後斷路，冷卻結束放行，成功後關閉"""
+        for _ in range(source_health.FAILURE_THRESHOLD - 1):
+            health.record_failure("src", "HTTP 503")
+        assert health.allow("src")
+        assert health.summary("src")["state"] == "degraded"
+
+        health.record_failure("src", "HTTP 503")
+        assert not health.allow("src")
+        assert health.summary("src")["state"] == "open"
+        assert health.retry_after("src") == source_health.BASE_COOLDOWN
+
+        health.clock.now += source_health.BASE_COOLDOWN
+        assert health.allow("src")
+        health.record_success("src", 100)
+        assert health.summary("src")["state"] == "healthy"
+
+    def test_failed_probe_doubles_cooldown(self, health):
+        """試探請求失敗時冷卻時間加倍"""
+        for _ in range(source_health.FAILURE_THRESHOLD):
+            health.record_failure("src", "timeout")
+        health.clock.now += source_health.BASE_COOLDOWN
+        health.record_failure("src", "timeout")
+        assert health.retry_after("src") == source_health.BASE_COOLDOWN * 2
+
+    def test_half_open_admits_single_probe(self, health):
+        """冷卻結束後只放行一個試探請求，回報結果前其他呼叫者一律拒絕"""
+        for _ in range(source_health.FAILURE_THRESHOLD):
+            health.record_failure("src", "timeout")
+        health.clock.now += source_health.BASE_COOLDOWN
+        assert health.allow("src")
+        assert not health.allow("src")
+        assert health.summary("src")["state"] == "open"
+
+        health.record_success("src", 100)
+        assert health.allow("src")
+        assert health.allow("src")
+
+    def test_abandoned_probe_expires(self, health):
+        """試探請求未回報結果時，逾時後再放行下一個"""
+        for _ in range(source_health.FAILURE_THRESHOLD):
+            health.record_failure("src", "timeout")
+        health.clock.now += source_health.BASE_COOLDOWN
+        assert health.allow("src")
+        assert health.retry_after("src") == source_health.PROBE_TIMEOUT
+
+        health.clock.now += source_health.PROBE_TIMEOUT
+        assert health.allow("src")
+        assert not health.allow("src")
+
+    def test_persisted(self, health):
+        """狀態跨執行保存"""
+        health.record_success("src", 120)
+        health.save()
+        reloaded = SourceHealth(health.path)
+        assert reloaded.summary("src")["p95_ms"] == 120
+
+
+class TestHealthInTools:
+    """工具整合測試"""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_source(self, mock_http):
+        """斷路中的來源不發出請求，列於 _skipped"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(503)
+
+        mock_http(handler)
+        args = {"sources": ["krebs"]}
+        for _ in range(source_health.FAILURE_THRESHOLD):
+            await news.call_tool("fetch_security_news", args)
+        assert len(requests) == source_health.FAILURE_THRESHOLD
+
+        result = await news.call_tool("fetch_security_news", args)
+        data = json.loads(result[0].text)
+        assert len(requests) == source_health.FAILURE_THRESHOLD
+        assert data["_skipped"][0]["source"] == "Krebs on Security"
+        assert data["_meta"]["skipped"] == 1
+
+        sources = json.loads((await news.call_tool("list_news_sources", {}))[0].text)
+        krebs = next(s for s in sources if s["name"] == "Krebs on Security")
+        assert krebs["health"]["state"] == "open"
+
+        result = await news.call_tool("get_source_health", {"unhealthy_only": True})
+        assert list(json.loads(result[0].text)) == ["Krebs on Security"]
+
+    @pytest.mark.asyncio
+    async def test_success_recorded(self, mock_http):
+        """成功抓取記錄延遲"""
+        rss = '<?xml version="1.0"?><rss version="2.0"><channel></channel></rss>'
+        mock_http(lambda request: httpx.Response(200, text=rss))
+        await news.call_tool("fetch_security_news", {"sources": ["krebs"]})
+        summary = get_source_health().summary("Krebs on Security")
+        assert summary["state"] == "healthy"
+        assert summary["success_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_not_modified_excluded_from_latency(self, mock_http, rss_feed):
+        """304 回應不列入延遲樣本"""
+        body = rss_feed(["Item"])
+
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=body, headers={"ETag": '"v1"'})
+
+        mock_http(handler)
+        args = {"sources": ["krebs"], "force_refresh": True}
+        for _ in range(3):
+            await news.call_tool("fetch_security_news", args)
+        stats = get_source_health()._load()["Krebs on Security"]
+        assert stats["successes"] == 3
+        assert len(stats["latencies_ms"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_no_records(self):
+        """尚無紀錄時回傳提示"""
+        result = await news.call_tool("get_source_health", {})
+        assert "尚無" in result[0].text
@@ -0,0 +1,171 @@
+"""來源水位與增量收集測試"""
+
+import json
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+
+from security_weekly_mcp.collectors.feeds import filter_entries
+from security_weekly_mcp.storage.watermarks import (
+    WatermarkStore,
+    get_watermark_store,
+    watermark_key,
+)
+from security_weekly_mcp.tools import news
+
+
+def _entry(guid: str, hours_ago: int | None) -> dict:
+    published = (
+        (datetime.now() - timedelta(hours=hours_ago)).isoformat(timespec="seconds")
+        if hours_ago is not None
+        else None
+    )
+    return {"id": guid, "title": guid, "link": f"https://x.com/{guid}", "published": published}
+
+
+def _items(items: list[tuple[str, int]]) -> list[dict]:
+    return [{"guid": g, "title": g, "link": f"https://x.com/{g}", "hours": h} for g, h in items]
+
+
+class TestFilterWithWatermark:
+    """水位過濾測試"""
+
+    def test_only_newer_than_published(self):
+        """只回傳發布時間晚於水位的文章"""
+        entries = [_entry("c", 1), _entry("b", 5), _entry("a", 10)]
+        watermark = {"last_guid": "zzz", "last_published": entries[1]["published"]}
+        articles = filter_entries(entries, 7, 10, watermark=watermark)
+        assert [a["guid"] for a in articles] == ["c"]
+
+    def test_stops_at_last_guid_without_dates(self):
+        """無日期的 feed 以上次的 GUID 為界"""
+        entries = [_entry("c", None), _entry("b", None), _entry("a", None)]
+        articles = filter_entries(entries, 7, 10, watermark={"last_guid": "b"})
+        assert [a["guid"] for a in articles] == ["c"]
+
+    def test_truncated_returns_oldest_new_entries(self):
+        """新文章超過 limit 時回傳緊接水位之後的文章，逐次收集不遺漏"""
+        entries = [_entry(f"n{i:02d}", i + 1) for i in range(30)] + [_entry("old", 40)]
+        store_watermark = {"last_guid": "old", "last_published": entries[-1]["published"]}
+        seen = []
+        for _ in range(4):
+            articles = filter_entries(entries, 7, 10, watermark=store_watermark)
+            seen.extend(a["guid"] for a in articles)
+            if not articles:
+                break
+            newest = articles[0]
+            store_watermark = {"last_guid": newest["guid"], "last_published": newest["published"]}
+        assert sorted(seen) == sorted(f"n{i:02d}" for i in range(30))
+        assert len(seen) == len(set(seen))
+
+    def test_truncated_without_dates(self):
+        """無日期的 feed 截斷時取最接近水位（feed 中較後面）的文章"""
+        entries = [_entry(g, None) for g in ("e", "d", "c", "b", "a")]
+        articles = filter_entries(entries, 7, 2, watermark={"last_guid": "a"})
+        assert [a["guid"] for a in articles] == ["c", "b"]
+
+    def test_no_watermark_keeps_output_shape(self):
+        """未使用增量模式時不附加 guid"""
+        articles = filter_entries([_entry("a", 1)], 7, 10)
+        assert "guid" not in articles[0]
+
+
+class TestWatermarkStore:
+    """水位儲存測試"""
+
+    def test_advance_and_persist(self, tmp_path):
+        """推進水位後寫檔，重新載入可讀回"""
+        store = WatermarkStore(tmp_path / "wm.json")
+        assert store.advance(
+            "src", [_entry("a", 10) | {"guid": "a"}, _entry("b", 1) | {"guid": "b"}]
+        )
+        store.save()
+        reloaded = WatermarkStore(tmp_path / "wm.json")
+        assert reloaded.get("src")["last_guid"] == "b"
+
+    def test_never_moves_backwards(self, tmp_path):
+        """較舊的文章不會讓水位倒退"""
+        store = WatermarkStore(tmp_path / "wm.json")
+        store.advance("src", [_entry("b", 1) | {"guid": "b"}])
+        assert not store.advance("src", [_entry("a", 10) | {"guid": "a"}])
+        assert store.get("src")["last_guid"] == "b"
+
+    def test_key_includes_filters(self):
+        """預設條件沿用來源名稱，其他過濾條件各自一組水位"""
+        assert watermark_key("src") == "src"
+        assert watermark_key("src", 7, ["RCE", "apt"]) == watermark_key("src", 7, ["APT", "rce"])
+        assert watermark_key("src", 7, ["rce"]) != "src"
+        assert watermark_key("src", 30) != "src"
+        period = (date(2026, 10, 5), date(2026, 10, 11))
+        assert watermark_key("src", 3, period=period) == watermark_key("src", 4, period=period)
+
+    def test_errors_ignored(self, tmp_path):
+        """錯誤紀錄不推進水位"""
+        store = WatermarkStore(tmp_path / "wm.json")
+        assert not store.advance("src", [{"error": "HTTP 500"}])
+
+
+class TestSinceLastRun:
+    """fetch_security_news 增量模式測試"""
+
+    @pytest.mark.asyncio
+    async def test_second_run_returns_only_new(self, mock_http, rss_feed):
+        """第二次執行只回傳新文章"""
+        feed = {"body": rss_feed(_items([("a2", 2), ("a1", 5)]))}
+        mock_http(lambda request: httpx.Response(200, text=feed["body"]))
+        args = {"sources": ["krebs"], "since_last_run": True, "dedup": False}
+
+        first = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+        assert [a["guid"] for a in first["Krebs on Security"]] == ["a2", "a1"]
+        assert first["_meta"]["watermarks_updated"] == 1
+
+        again = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+        assert again["Krebs on Security"] == []
+        assert again["_meta"]["watermarks_updated"] == 0
+
+        feed["body"] = rss_feed(_items([("a3", 1), ("a2", 2), ("a1", 5)]))
+        third = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+        assert [a["guid"] for a in third["Krebs on Security"]] == ["a3"]
+        assert get_watermark_store().get("Krebs on Security")["last_guid"] == "a3"
+
+    @pytest.mark.asyncio
+    async def test_backlog_larger_than_limit(self, mock_http, rss_feed):
+        """新文章多於 limit 時分次收集，全部文章都會被回傳"""
+        feed = {"body": rss_feed(_items([("a0", 100)]))}
+        mock_http(lambda request: httpx.Response(200, text=feed["body"]))
+        args = {"sources": ["krebs"], "since_last_run": True, "dedup": False, "limit": 10}
+        await news.call_tool("fetch_security_news", args)
+
+        feed["body"] = rss_feed(_items([(f"b{i:02d}", i + 1) for i in range(30)] + [("a0", 100)]))
+        seen = []
+        for _ in range(4):
+            data = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+            seen.extend(a["guid"] for a in data["Krebs on Security"])
+        assert sorted(seen) == sorted(f"b{i:02d}" for i in range(30))
+
+    @pytest.mark.asyncio
+    async def test_keyword_run_keeps_unfiltered_watermark(self, mock_http, rss_feed):
+        """以關鍵字過濾的增量收集不會推進未過濾的水位，略過的文章之後仍會回傳"""
+        body = rss_feed(_items([("ransomware", 1), ("phishing", 2)]))
+        mock_http(lambda request: httpx.Response(200, text=body))
+        args = {"sources": ["krebs"], "since_last_run": True, "dedup": False}
+
+        filtered = json.loads(
+            (await news.call_tool("fetch_security_news", args | {"keywords": ["phishing"]}))[0].text
+        )
+        assert [a["guid"] for a in filtered["Krebs on Security"]] == ["phishing"]
+        assert get_watermark_store().get("Krebs on Security") is None
+
+        data = json.loads((await news.call_tool("fetch_security_news", args))[0].text)
+        assert [a["guid"] for a in data["Krebs on Security"]] == ["ransomware", "phishing"]
+
+    @pytest.mark.asyncio
+    async def test_default_mode_ignores_watermark(self, mock_http, rss_feed):
+        """一般模式不讀取也不推進水位"""
+        mock_http(lambda request: httpx.Response(200, text=rss_feed(_items([("a1", 1)]))))
+        result = await news.call_tool("fetch_security_news", {"sources": ["krebs"]})
+        data = json.loads(result[0].text)
+        assert len(data["Krebs on Security"]) == 1
+        assert "since_last_run" not in data["_meta"]
+        assert get_watermark_store().get("Krebs on Security") is None
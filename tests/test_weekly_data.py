@@ -0,0 +1,401 @@
+"""collect_weekly_data 週報原始資料收集測試"""
+
+import json
+from datetime import date
+
+import pytest
+
+from security_weekly_mcp.collectors import weekly
+from security_weekly_mcp.tools import news
+
+WEEK = "2026-W41"  # 2026-10-05 ~ 2026-10-11
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    path = tmp_path / "raw"
+    monkeypatch.setenv("SECURITY_WEEKLY_RAW_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def fake_tools(monkeypatch):
+    """以固定資料取代實際收集，可修改 data 模擬下一次執行"""
+    data = {
+        "fetch_security_news": {
+            "_meta": {"total_sources": 2},
+            "Krebs on Security": [
+                {
+                    "title": "A",
+                    "link": "https://krebs.com/a?utm_source=rss",
+                    "published": "2026-10-06T10:00:00",
+                },
+                {
+                    "title": "Too old",
+                    "link": "https://krebs.com/old",
+                    "published": "2026-09-01T10:00:00",
+                },
+            ],
+            "iThome 資安": [{"error": "HTTP 503: Service Unavailable"}],
+        },
+        "fetch_vulnerabilities": {
+            "nvd": [{"cve_id": "CVE-2026-0001", "cvss": 9.8, "published": "2026-10-07T00:00:00"}],
+            "kev": [{"cve_id": "CVE-2026-0002", "date_added": "2026-10-08"}],
+            "ghsa": [],
+            "_meta": {"providers": {"nvd": {"status": "ok"}, "kev": {"status": "ok"}}},
+        },
+        "suggest_searches": {
+            "web_searches": [{"query": "q1"}, {"query": "q2"}],
+            "fetch_targets": [],
+        },
+    }
+    calls = []
+
+    async def fake(name, arguments):
+        calls.append((name, arguments))
+        return json.loads(json.dumps(data[name]))
+
+    monkeypatch.setattr(news, "_tool_json", fake)
+    return data, calls
+
+
+class TestWeekHelpers:
+    """週數工具函式測試"""
+
+    def test_week_period(self):
+        """ISO 週為週一至週日"""
+        assert weekly.week_period(WEEK) == (date(2026, 10, 5), date(2026, 10, 11))
+
+    def test_invalid_week(self):
+        """格式錯誤拋出 ValueError"""
+        with pytest.raises(ValueError):
+            weekly.week_period("2026-41")
+
+    def test_default_week_is_previous_on_monday(self):
+        """週一執行時預設為上一週"""
+        assert weekly.default_week(date(2026, 10, 12)) == WEEK
+
+
+class TestCollectWeeklyData:
+    """收集流程測試"""
+
+    @pytest.mark.asyncio
+    async def test_writes_snapshot_in_loader_schema(self, raw_dir, fake_tools):
+        """寫入 load_weekly_data 可讀取的格式"""
+        result = await news.call_tool("collect_weekly_data", {"week": WEEK})
+        summary = json.loads(result[0].text)
+        assert summary["status"] == "created"
+        assert "iThome 資安: HTTP 503: Service Unavailable" in summary["errors"]
+
+        data = weekly.load_snapshot(raw_dir / f"{WEEK}.jsonl.gz")
+        meta = data["metadata"]
+        assert meta["week"] == WEEK
+        assert meta["period"] == {"start": "2026-10-05", "end": "2026-10-11"}
+        assert meta["stats"]["total_articles"] == 1
+        assert meta["stats"]["news_sources"] == 1
+        assert meta["stats"]["nvd_vulnerabilities"] == 1
+        assert meta["stats"]["kev_vulnerabilities"] == 1
+        assert meta["stats"]["suggested_searches"] == 2
+        assert set(meta["timing"]) == {"news_ms", "vulnerabilities_ms", "searches_ms", "total_ms"}
+        assert [a["title"] for a in data["news"]["Krebs on Security"]] == ["A"]
+
+        loaded = await news.call_tool("load_weekly_data", {"week": WEEK})
+        assert "新聞文章: 1 則" in loaded[0].text
+        listed = json.loads((await news.call_tool("list_weekly_data", {}))[0].text)
+        assert listed["available_weeks"][0]["week"] == WEEK
+
+    @pytest.mark.asyncio
+    async def test_fetches_by_week_period(self, raw_dir, fake_tools):
+        """各來源以該週的起訖日期查詢，而非回推到今天"""
+        _, calls = fake_tools
+        await news.call_tool("collect_weekly_data", {"week": WEEK})
+        period = {"period_start": "2026-10-05", "period_end": "2026-10-11"}
+        for name, arguments in calls:
+            assert {k: arguments[k] for k in period} == period, name
+            assert "days" not in arguments
+
+    @pytest.mark.asyncio
+    async def test_rerun_is_idempotent(self, raw_dir, fake_tools):
+        """相同資料重跑不改寫檔案"""
+        await news.call_tool("collect_weekly_data", {"week": WEEK})
+        before = (raw_dir / f"{WEEK}.jsonl.gz").read_bytes()
+
+        result = await news.call_tool("collect_weekly_data", {"week": WEEK})
+        assert json.loads(result[0].text)["status"] == "unchanged"
+        assert (raw_dir / f"{WEEK}.jsonl.gz").read_bytes() == before
+
+    @pytest.mark.asyncio
+    async def test_rerun_merges_incrementally(self, raw_dir, fake_tools):
+        """重跑時保留已收集的文章並加入新文章"""
+        data, _ = fake_tools
+        await news.call_tool("collect_weekly_data", {"week": WEEK})
+
+        # 第二次執行：舊文章已從 feed 消失，出現新文章與同 URL 的更新
+        data["fetch_security_news"]["Krebs on Security"] = [
+            {"title": "B", "link": "https://krebs.com/b", "published": "2026-10-09T10:00:00"},
+            {
+                "title": "A (updated)",
+                "link": "https://krebs.com/a",
+                "published": "2026-10-06T10:00:00",
+            },
+        ]
+        result = await news.call_tool("collect_weekly_data", {"week": WEEK})
+        assert json.loads(result[0].text)["status"] == "updated"
+
+        saved = weekly.load_snapshot(raw_dir / f"{WEEK}.jsonl.gz")
+        assert [a["title"] for a in saved["news"]["Krebs on Security"]] == ["B", "A (updated)"]
+        assert saved["metadata"]["stats"]["total_articles"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_week(self, raw_dir, fake_tools):
+        """格式錯誤回傳提示"""
+        result = await news.call_tool("collect_weekly_data", {"week": "2026/41"})
+        assert "❌" in result[0].text
+
+
+class TestCompressedSnapshot:
+    """壓縮快照與串流讀取測試"""
+
+    CONTENT = {
+        "news": {"A": [{"title": "一", "link": "https://a.com/1"}], "Empty": []},
+        "vulnerabilities": {"nvd": [{"cve_id": "CVE-2026-1"}], "kev": []},
+        "suggested_searches": {"web_searches": [{"query": "q"}]},
+    }
+
+    def test_roundtrip(self, tmp_path):
+        """寫入後讀回內容一致（含空分組）"""
+        path = tmp_path / f"{WEEK}.jsonl.gz"
+        weekly.write_snapshot(path, {"week": WEEK}, self.CONTENT)
+        assert weekly.load_snapshot(path) == {"metadata": {"week": WEEK}, **self.CONTENT}
+        assert weekly.read_metadata(path) == {"week": WEEK}
+
+    def test_streamed_json_is_valid(self, tmp_path):
+        """逐段產生的 JSON 可完整解析"""
+        path = tmp_path / f"{WEEK}.jsonl.gz"
+        weekly.write_snapshot(path, {"week": WEEK}, self.CONTENT)
+        text = "".join(weekly.iter_snapshot_json(path))
+        assert json.loads(text) == {"metadata": {"week": WEEK}, **self.CONTENT}
+
+    def test_empty_sections(self, tmp_path):
+        """空區塊仍保留鍵"""
+        path = tmp_path / f"{WEEK}.jsonl.gz"
+        content = {"news": {}, "vulnerabilities": {}, "suggested_searches": {}}
+        weekly.write_snapshot(path, {}, content)
+        assert json.loads("".join(weekly.iter_snapshot_json(path))) == {"metadata": {}, **content}
+
+    def test_failed_stream_keeps_existing_file(self, tmp_path):
+        """串流寫入中途失敗時保留原檔且不留下暫存檔"""
+        path = tmp_path / f"{WEEK}.jsonl.gz"
+        weekly.write_snapshot(path, {"week": WEEK}, self.CONTENT)
+        before = path.read_bytes()
+
+        def broken():
+            yield {"s": "news", "k": "A", "i": {"title": "x"}}
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            weekly.write_snapshot(path, {"week": WEEK}, broken())
+        assert path.read_bytes() == before
+        assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+    def test_merge_records_streams_groups(self, tmp_path):
+        """逐組合併既有快照與新資料，結果與統計一致"""
+        path = tmp_path / f"{WEEK}.jsonl.gz"
+        weekly.write_snapshot(path, {"week": WEEK}, self.CONTENT)
+        collected = {
+            "news": {
+                "A": [{"title": "二", "link": "https://a.com/2", "published": "2026-10-07"}],
+                "B": [{"title": "三", "link": "https://b.com/3"}],
+            },
+            "vulnerabilities": {"ghsa": [{"ghsa_id": "GHSA-1"}]},
+        }
+        scan = weekly.scan_merge(path, collected)
+        merged = tmp_path / "merged.jsonl.gz"
+        weekly.write_snapshot(merged, {}, weekly.merge_records(path, collected))
+
+        saved = weekly.load_snapshot(merged)
+        assert [a["title"] for a in saved["news"]["A"]] == ["二", "一"]
+        assert list(saved["news"]) == ["A", "B", "Empty"]
+        assert list(saved["vulnerabilities"]) == ["ghsa", "kev", "nvd"]
+        assert saved["suggested_searches"] == self.CONTENT["suggested_searches"]
+        assert scan["changed"] is True
+        assert scan["stats"]["total_articles"] == 3
+        assert scan["stats"]["news_sources"] == 2
+        assert scan["content_bytes"] == weekly.content_size(merged)
+        assert weekly.scan_merge(merged, collected)["changed"] is False
+
+    @pytest.mark.asyncio
+    async def test_full_text_threshold_uses_uncompressed_size(self, raw_dir, monkeypatch):
+        """全文上限以未壓縮大小判斷，而非壓縮後的檔案大小"""
+        content = {"news": {"A": [{"title": "x" * 5000}]}, "vulnerabilities": {}}
+        path = weekly.snapshot_path(raw_dir, WEEK)
+        weekly.write_snapshot(path, {"week": WEEK}, content)
+        assert path.stat().st_size < 1000 < weekly.content_size(path)
+
+        monkeypatch.setattr(weekly, "FULL_TEXT_MAX_BYTES", 1000)
+        result = await news.call_tool("load_weekly_data", {"week": WEEK})
+        assert "### 完整資料" not in result[0].text
+        assert '"has_more": false' in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_legacy_json_migrated(self, raw_dir, fake_tools):
+        """舊版 JSON 可讀取，重新收集後轉為壓縮格式"""
+        raw_dir.mkdir()
+        legacy = {"metadata": {"week": WEEK, "stats": {"total_articles": 1}}, **self.CONTENT}
+        (raw_dir / f"{WEEK}.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        loaded = await news.call_tool("load_weekly_data", {"week": WEEK})
+        assert "新聞文章: 1 則" in loaded[0].text
+
+        await news.call_tool("collect_weekly_data", {"week": WEEK})
+        assert not (raw_dir / f"{WEEK}.json").exists()
+        saved = weekly.load_snapshot(raw_dir / f"{WEEK}.jsonl.gz")
+        assert saved["news"]["A"] == self.CONTENT["news"]["A"]
+
+
+class TestLoadWeeklyPage:
+    """load_weekly_data 區塊篩選與分頁"""
+
+    CONTENT = {
+        "news": {
+            "A": [{"title": f"a{i}", "link": f"https://a/{i}", "summary": "x"} for i in range(5)],
+            "B": [{"title": "b0", "link": "https://b/0", "summary": "y"}],
+        },
+        "vulnerabilities": {
+            "nvd": [{"cve_id": "CVE-2026-0001", "cvss": 9.8}],
+            "kev": [{"cve_id": "CVE-2026-0002"}, {"cve_id": "CVE-2026-0003"}],
+        },
+        "suggested_searches": {"web_searches": [{"query": "q"}]},
+    }
+
+    @pytest.fixture
+    def snapshot(self, raw_dir):
+        path = weekly.snapshot_path(raw_dir, WEEK)
+        weekly.write_snapshot(path, {"week": WEEK}, self.CONTENT)
+        return path
+
+    async def _load(self, **arguments):
+        result = await news.call_tool("load_weekly_data", {"week": WEEK, **arguments})
+        return json.loads(result[0].text)
+
+    @pytest.mark.asyncio
+    async def test_section_and_source_filter(self, snapshot):
+        """只取 KEV 漏洞"""
+        page = await self._load(sections=["vulnerabilities"], sources=["kev"])
+        assert page["data"] == {"vulnerabilities": {"kev": self.CONTENT["vulnerabilities"]["kev"]}}
+        assert page["returned"] == 2
+        assert page["has_more"] is False
+        assert "next_cursor" not in page
+
+    @pytest.mark.asyncio
+    async def test_field_projection(self, snapshot):
+        """只保留指定欄位"""
+        page = await self._load(sections=["news"], sources=["B"], fields=["title"])
+        assert page["data"] == {"news": {"B": [{"title": "b0"}]}}
+
+    @pytest.mark.asyncio
+    async def test_cursor_walks_all_items(self, snapshot):
+        """以 cursor 逐頁取得全部項目，結果與完整快照一致"""
+        page = await self._load(limit=3)
+        pages = [page]
+        while page["has_more"]:
+            result = await news.call_tool("load_weekly_data", {"cursor": page["next_cursor"]})
+            page = json.loads(result[0].text)
+            pages.append(page)
+
+        assert [p["returned"] for p in pages] == [3, 3, 3, 1]
+        merged = {"news": {}, "vulnerabilities": {}}
+        for p in pages:
+            for section in ("news", "vulnerabilities"):
+                for key, items in p["data"].get(section, {}).items():
+                    merged[section].setdefault(key, []).extend(items)
+            if "suggested_searches" in p["data"]:
+                merged["suggested_searches"] = p["data"]["suggested_searches"]
+        assert merged == self.CONTENT
+
+    @pytest.mark.asyncio
+    async def test_offset(self, snapshot):
+        """offset 略過前面的項目"""
+        page = await self._load(sections=["news"], offset=4, limit=10)
+        news_items = self.CONTENT["news"]
+        assert page["data"] == {"news": {"A": news_items["A"][4:], "B": news_items["B"]}}
+
+    @pytest.mark.asyncio
+    async def test_stale_cursor_rejected(self, snapshot):
+        """快照更新後舊 cursor 失效"""
+        page = await self._load(limit=2)
+        weekly.write_snapshot(snapshot, {"week": WEEK, "v": 2}, self.CONTENT)
+
+        result = await news.call_tool("load_weekly_data", {"cursor": page["next_cursor"]})
+        assert "cursor 已失效" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self, snapshot):
+        """錯誤的區塊與 cursor 回傳錯誤訊息"""
+        result = await news.call_tool("load_weekly_data", {"sections": ["nope"]})
+        assert "未知的區塊" in result[0].text
+        result = await news.call_tool("load_weekly_data", {"cursor": "!!"})
+        assert "cursor 格式錯誤" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_crafted_cursor_clamped(self, snapshot):
+        """cursor 內的 offset 與 limit 解碼後重新限制範圍"""
+        stat = snapshot.stat()
+        cursor = weekly.encode_cursor(
+            {
+                "week": WEEK,
+                "offset": -5,
+                "limit": 10**6,
+                "version": [stat.st_mtime_ns, stat.st_size],
+            }
+        )
+        page = json.loads((await news.call_tool("load_weekly_data", {"cursor": cursor}))[0].text)
+        assert page["offset"] == 0
+        assert page["limit"] == weekly.MAX_PAGE_SIZE
+
+        cursor = weekly.encode_cursor(
+            {"week": WEEK, "limit": "x", "version": [stat.st_mtime_ns, stat.st_size]}
+        )
+        result = await news.call_tool("load_weekly_data", {"cursor": cursor})
+        assert "分頁參數錯誤" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_source_names_resolved(self, raw_dir):
+        """來源名稱以別名與部分名稱比對，分頁後仍沿用解析結果"""
+        content = {
+            "news": {
+                "Krebs on Security": [{"title": f"k{i}"} for i in range(3)],
+                "SecurityWeek": [{"title": "s0"}],
+            },
+            "vulnerabilities": {"kev": [{"cve_id": "CVE-2026-0002"}]},
+        }
+        weekly.write_snapshot(weekly.snapshot_path(raw_dir, WEEK), {"week": WEEK}, content)
+
+        page = await self._load(sources=["krebs", "KEV"], limit=2)
+        assert page["data"] == {"news": {"Krebs on Security": [{"title": "k0"}, {"title": "k1"}]}}
+        result = await news.call_tool("load_weekly_data", {"cursor": page["next_cursor"]})
+        assert json.loads(result[0].text)["data"] == {
+            "news": {"Krebs on Security": [{"title": "k2"}]},
+            "vulnerabilities": {"kev": [{"cve_id": "CVE-2026-0002"}]},
+        }
+
+    @pytest.mark.asyncio
+    async def test_without_paging_arguments_returns_full_text(self, snapshot):
+        """未指定分頁參數時維持原本的完整輸出"""
+        result = await news.call_tool("load_weekly_data", {"week": WEEK})
+        assert "### 完整資料" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_large_snapshot_returns_first_page(self, snapshot, monkeypatch):
+        """快照超過全文大小上限時改回傳第一頁與 next_cursor"""
+        monkeypatch.setattr(weekly, "FULL_TEXT_MAX_BYTES", 10)
+        monkeypatch.setattr(weekly, "MAX_PAGE_SIZE", 3)
+        result = await news.call_tool("load_weekly_data", {"week": WEEK})
+        text = result[0].text
+        assert "### 完整資料" not in text
+        page = json.loads(text[text.index("{") :])
+        assert page["returned"] == 3
+        assert page["has_more"] is True
+
+        result = await news.call_tool("load_weekly_data", {"cursor": page["next_cursor"]})
+        assert json.loads(result[0].text)["offset"] == 3